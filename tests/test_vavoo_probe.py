@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""
+StreamProber against a local stand-in stream server.
+
+vavoo_probe is loaded on its own: vavoo_lib needs a running enigma2, so
+the governor it takes its slots from is replaced by one that never waits,
+and the plugin's session by a plain requests one.
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+import time
+import types
+import unittest
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import requests
+
+PLUGIN = os.path.join(os.path.dirname(__file__), "..", "usr", "lib", "enigma2", "python",
+                      "Plugins", "Extensions", "vavoo-maker")
+PACKAGE = "vavoo_maker_under_test"
+
+
+def load_probe():
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [PLUGIN]
+    sys.modules[PACKAGE] = package
+
+    class Governor(object):
+        @contextmanager
+        def slot(self, url, priority=None):
+            yield
+
+    lib = types.ModuleType(PACKAGE + ".vavoo_lib")
+    lib.BACKGROUND = 2
+    lib.governor = Governor()
+    lib.http = requests.Session()
+    sys.modules[lib.__name__] = lib
+
+    spec = importlib.util.spec_from_file_location(PACKAGE + ".vavoo_probe", os.path.join(PLUGIN, "vavoo_probe.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+probe = load_probe()
+
+PACKET = bytes(bytearray([0x47])) + b"\x00" * 187
+
+
+class StandIn(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/slow"):
+            time.sleep(1.0)
+        if self.path.startswith("/missing"):
+            self.send_error(404)
+            return
+        if self.path.startswith("/html"):
+            body = b"<html><body>channel offline</body></html>" * 10
+        elif self.path.startswith("/shifted"):
+            body = b"\x00" + PACKET * 4
+        else:
+            body = PACKET * 4
+        self.send_response(206 if "Range" in self.headers else 200)
+        self.send_header("Content-Type", "video/mp2t")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StreamProberTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(("127.0.0.1", 0), StandIn)
+        cls.server.daemon_threads = True
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+        cls.base = "http://127.0.0.1:%d" % cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_is_transport_stream(self):
+        self.assertTrue(probe.is_transport_stream(PACKET * 2))
+        self.assertTrue(probe.is_transport_stream(PACKET[:100]))
+        self.assertFalse(probe.is_transport_stream(b""))
+        self.assertFalse(probe.is_transport_stream(b"<html>" + PACKET))
+        self.assertFalse(probe.is_transport_stream(PACKET + b"\x00" * 188))
+
+    def test_verdicts(self):
+        urls = [self.base + x for x in ("/ts", "/html", "/shifted", "/missing")]
+        results = probe.StreamProber(workers=4, timeout=2.0, deadline=10.0).run(urls)
+        self.assertEqual(set(results), set(urls))
+        alive = results[self.base + "/ts"]
+        self.assertTrue(alive[0])
+        self.assertIsNotNone(alive[1])
+        for path in ("/html", "/shifted", "/missing"):
+            self.assertFalse(results[self.base + path][0], path)
+
+    def test_probe_timeout(self):
+        started = time.time()
+        alive, latency = probe.StreamProber(timeout=0.3).probe(self.base + "/slow")
+        # a timeout says nothing about the channel
+        self.assertIsNone(alive)
+        self.assertIsNone(latency)
+        self.assertLess(time.time() - started, 1.0)
+
+    def test_refused_is_unknown(self):
+        listener = HTTPServer(("127.0.0.1", 0), StandIn)
+        url = "http://127.0.0.1:%d/ts" % listener.server_address[1]
+        listener.server_close()
+        self.assertEqual(probe.StreamProber(timeout=1.0).probe(url), (None, None))
+
+    def test_batch_deadline(self):
+        urls = [self.base + "/slow/%d" % i for i in range(6)]
+        started = time.time()
+        results = probe.StreamProber(workers=2, timeout=3.0, deadline=0.5).run(urls)
+        # each worker takes one url before the deadline and none after it
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(alive for alive, latency in results.values()))
+        self.assertLess(time.time() - started, 3.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,11 +2,37 @@ from Components.MenuList import MenuList
 from Tools.Directories import resolveFilename, SCOPE_CURRENT_SKIN
 from Tools.LoadPixmap import LoadPixmap
 from enigma import eListboxPythonMultiContent, gFont, RT_HALIGN_LEFT
+from .SelModel import SelectionModel
 
 # Definizione di default per la posizione e dimensione dei componenti
 SELECTION_LIST_DESC = (50, 3, 650, 50)  # (dx, dy, dw, dh)
 SELECTION_LIST_LOCK = (0, 2, 35, 35)  # (ix, iy, iw, ih)
 
+# Icone (lock_off, lock_on) per skin, caricate una sola volta
+lockPixmapCache = {}
+
+
+def getCurrentSkinName():
+	try:
+		from Components.config import config
+		return config.skin.primary_skin.value
+	except Exception:
+		return None
+
+
+def getLockPixmaps():
+	""" Restituisce le icone (lock_off, lock_on) caricate una volta per skin """
+	skinName = getCurrentSkinName()
+	pixmaps = lockPixmapCache.get(skinName)
+	if pixmaps is None:
+		pixmaps = (
+			LoadPixmap(cached=True, path=resolveFilename(SCOPE_CURRENT_SKIN, "icons/lock_off.png")),
+			LoadPixmap(cached=True, path=resolveFilename(SCOPE_CURRENT_SKIN, "icons/lock_on.png"))
+		)
+		lockPixmapCache.clear()
+		lockPixmapCache[skinName] = pixmaps
+	return pixmaps
+
 
 def SelectionEntryComponent(description, value, index, selected):
 	""" Crea una voce della lista con icona di selezione """
@@ -17,10 +43,7 @@ def SelectionEntryComponent(description, value, index, selected):
 	]
 
 	# Seleziona l'icona giusta in base allo stato
-	if selected:
-		selectionpng = LoadPixmap(cached=True, path=resolveFilename(SCOPE_CURRENT_SKIN, "icons/lock_on.png"))
-	else:
-		selectionpng = LoadPixmap(cached=True, path=resolveFilename(SCOPE_CURRENT_SKIN, "icons/lock_off.png"))
+	selectionpng = getLockPixmaps()[1 if selected else 0]
 
 	ix, iy, iw, ih = SELECTION_LIST_LOCK
 	res.append((eListboxPythonMultiContent.TYPE_PIXMAP_ALPHABLEND, ix, iy, iw, ih, selectionpng))
@@ -32,50 +55,114 @@ class SelectionList(MenuList):
 	""" Lista personalizzata compatibile con Dreambox OE2.5 """
 
 	def __init__(self, list=None, enableWrapAround=False):
+		self.selection = SelectionModel()
+		self.rowIndex = None
 		MenuList.__init__(self, list or [], enableWrapAround, content=eListboxPythonMultiContent)
 		self.l.setFont(0, gFont("Regular", 32))  # Imposta il font di default
 		self.l.setItemHeight(50)  # Altezza dell'elemento della lista
+		# Le righe visibili vengono costruite solo quando servono
+		self.l.setBuildFunc(self.buildSelectionEntry)
+		self.allRows = self.list
+
+	def buildSelectionEntry(self, data):
+		""" Costruisce la riga da visualizzare """
+		description, value, index = data
+		return SelectionEntryComponent(description, value, index, self.selection.isSelected(value))
+
+	def getRowIndex(self, value):
+		""" Posizione della riga con il valore indicato """
+		if self.rowIndex is None:
+			self.rowIndex = dict((row[0][1], idx) for idx, row in enumerate(self.list))
+		return self.rowIndex.get(value)
+
+	def invalidateRow(self, idx=None):
+		""" Ridisegna una riga, o tutte se idx e' None """
+		try:
+			if idx is None:
+				self.l.invalidate()
+			else:
+				self.l.invalidateEntry(idx)
+		except Exception:
+			self.setList(self.list)
+
+	def setSelections(self, selections):
+		""" Imposta tutti gli elementi (description, value, index, selected) in una volta """
+		self.selection.clear()
+		self.allRows = []
+		for description, value, index, selected in selections:
+			self.allRows.append(((description, value, index),))
+			if selected:
+				self.selection.keys.add(value)
+		self.rowIndex = None
+		self.setList(self.allRows)
+
+	def filterSelections(self, values=None):
+		""" Mostra solo le righe con valore in values, o tutte se values e' None """
+		if values is None:
+			rows = self.allRows
+		else:
+			values = set(values)
+			rows = [row for row in self.allRows if row[0][1] in values]
+		self.rowIndex = None
+		self.setList(rows)
+		self.moveToIndex(0)
+
+	def isFiltered(self):
+		return self.list is not self.allRows
 
 	def addSelection(self, description, value, index, selected=True):
 		""" Aggiunge un elemento alla lista """
-		self.list.append(SelectionEntryComponent(description, value, index, selected))
+		row = ((description, value, index),)
+		self.allRows.append(row)
+		if self.isFiltered():
+			self.list.append(row)
+		self.selection.setSelected(value, selected)
+		self.rowIndex = None
 		self.setList(self.list)
 
 	def toggleSelection(self):
 		""" Inverte lo stato dell'elemento selezionato """
 		if len(self.list):
 			idx = self.getSelectedIndex()
-			item = self.list[idx][0]
-			self.list[idx] = SelectionEntryComponent(item[0], item[1], item[2], not item[3])
-			self.setList(self.list)
+			self.selection.toggle(self.list[idx][0][1])
+			self.invalidateRow(idx)
 
 	def getSelectionsList(self):
 		""" Restituisce la lista degli elementi selezionati """
-		return [(item[0][0], item[0][1], item[0][2]) for item in self.list if item[0][3]]
+		isSelected = self.selection.isSelected
+		return [item[0] for item in self.allRows if isSelected(item[0][1])]
+
+	def getSelectedValues(self):
+		""" Restituisce i valori selezionati nell'ordine della lista """
+		return self.selection.selected([item[0][1] for item in self.allRows])
 
 	def toggleAllSelection(self):
 		""" Inverte lo stato di tutti gli elementi della lista """
-		for idx, item in enumerate(self.list):
-			item = self.list[idx][0]
-			self.list[idx] = SelectionEntryComponent(item[0], item[1], item[2], not item[3])
-		self.setList(self.list)
+		if self.isFiltered():
+			# solo le righe visibili con il filtro attivo
+			for row in self.list:
+				self.selection.toggle(row[0][1])
+		else:
+			self.selection.toggleAll()
+		self.invalidateRow()
 
 	def removeSelection(self, item):
 		""" Rimuove un elemento dalla lista """
-		for it in self.list:
-			if it[0][0:3] == item[0:3]:
-				self.list.pop(self.list.index(it))
-				self.setList(self.list)
-				return
+		idx = self.getRowIndex(item[1])
+		if idx is not None:
+			row = self.list.pop(idx)
+			if self.isFiltered():
+				self.allRows.remove(row)
+			self.selection.discard(item[1])
+			self.rowIndex = None
+			self.setList(self.list)
 
 	def toggleItemSelection(self, item):
 		""" Inverte la selezione di un elemento specifico """
-		for idx, i in enumerate(self.list):
-			if i[0][0:3] == item[0:3]:
-				item = self.list[idx][0]
-				self.list[idx] = SelectionEntryComponent(item[0], item[1], item[2], not item[3])
-				self.setList(self.list)
-				return
+		idx = self.getRowIndex(item[1])
+		if idx is not None:
+			self.selection.toggle(item[1])
+			self.invalidateRow(idx)
 
 	def sort(self, sortType=False, flag=False):
 		""" Ordina la lista """
@@ -84,5 +171,12 @@ class SelectionList(MenuList):
 		# 1 - value
 		# 2 - index
 		# 3 - selected
-		self.list.sort(key=lambda x: x[0][sortType], reverse=flag)
+		if sortType == 3:
+			key = lambda x: self.selection.isSelected(x[0][1])
+		else:
+			key = lambda x: x[0][sortType]
+		self.allRows.sort(key=key, reverse=flag)
+		if self.isFiltered():
+			self.list.sort(key=key, reverse=flag)
+		self.rowIndex = None
 		self.setList(self.list)
@@ -3,6 +3,11 @@ from Tools.Directories import resolveFilename, SCOPE_CURRENT_SKIN
 from Tools.LoadPixmap import LoadPixmap
 from enigma import eListboxPythonMultiContent, gFont, RT_HALIGN_LEFT, RT_VALIGN_CENTER
 from skin import getSkinFactor, fonts, parameters
+from .SelModel import SelectionModel
+
+
+# (lock_off, lock_on) pixmaps keyed by the skin they were resolved for
+lockPixmapCache = {}
 
 
 def applySkinFactor(*d):
@@ -15,63 +20,149 @@ def applySkinFactor(*d):
 	return tuple([int(value * getSkinFactor()) if isinstance(value, (int, float)) else value for value in d])
 
 
+def getCurrentSkinName():
+	try:
+		from Components.config import config
+		return config.skin.primary_skin.value
+	except Exception:
+		return None
+
+
+def getLockPixmaps():
+	"""
+	Return the (lock_off, lock_on) pixmaps, resolved and loaded
+	once per skin instead of once per list entry.
+	"""
+	skinName = getCurrentSkinName()
+	pixmaps = lockPixmapCache.get(skinName)
+	if pixmaps is None:
+		pixmaps = (
+			LoadPixmap(cached=True, path=resolveFilename(SCOPE_CURRENT_SKIN, "icons/lock_off.png")),
+			LoadPixmap(cached=True, path=resolveFilename(SCOPE_CURRENT_SKIN, "icons/lock_on.png"))
+		)
+		lockPixmapCache.clear()
+		lockPixmapCache[skinName] = pixmaps
+	return pixmaps
+
+
 def SelectionEntryComponent(description, value, index, selected, selectionListDescr=parameters.get("SelectionListDescr", applySkinFactor(25, 0, 650, 30))):
 	dx, dy, dw, dh = selectionListDescr
 	res = [
 		(description, value, index, selected),
 		(eListboxPythonMultiContent.TYPE_TEXT, dx, dy, dw, dh, 0, RT_HALIGN_LEFT | RT_VALIGN_CENTER, description)
 	]
-	if selected:
-		selectionpng = LoadPixmap(cached=True, path=resolveFilename(SCOPE_CURRENT_SKIN, "icons/lock_on.png"))
-	else:
-		selectionpng = LoadPixmap(cached=True, path=resolveFilename(SCOPE_CURRENT_SKIN, "icons/lock_off.png"))
+	selectionpng = getLockPixmaps()[1 if selected else 0]
 	ix, iy, iw, ih = parameters.get("SelectionListLock", applySkinFactor(0, 2, 25, 24))
 	res.append((eListboxPythonMultiContent.TYPE_PIXMAP_ALPHABLEND, ix, iy, iw, ih, selectionpng))
 	return res
 
 
 class SelectionList(MenuList):
+	"""
+	Rows are stored as ((description, value, index),) and the visible ones
+	are rendered on demand through the listbox build function. The selected
+	state lives in self.selection, keyed by value. self.allRows holds every
+	row while self.list may be narrowed by filterSelections().
+	"""
+
 	def __init__(self, list=None, enableWrapAround=False):
+		self.selection = SelectionModel()
+		self.rowIndex = None
 		MenuList.__init__(self, list or [], enableWrapAround, content=eListboxPythonMultiContent)
 		font = fonts.get("SelectionList", applySkinFactor("Regular", 20, 30))
 		self.l.setFont(0, gFont(font[0], font[1]))
 		self.l.setItemHeight(font[2])
+		self.l.setBuildFunc(self.buildSelectionEntry)
+		self.allRows = self.list
 		self.selectionListDescr = parameters.get("SelectionListDescr", applySkinFactor(25, 0, 650, 30))
 
+	def buildSelectionEntry(self, data):
+		description, value, index = data
+		return SelectionEntryComponent(description, value, index, self.selection.isSelected(value), self.selectionListDescr)
+
+	def getRowIndex(self, value):
+		if self.rowIndex is None:
+			self.rowIndex = dict((row[0][1], idx) for idx, row in enumerate(self.list))
+		return self.rowIndex.get(value)
+
+	def invalidateRow(self, idx=None):
+		try:
+			if idx is None:
+				self.l.invalidate()
+			else:
+				self.l.invalidateEntry(idx)
+		except Exception:
+			self.setList(self.list)
+
+	def setSelections(self, selections):
+		self.selection.clear()
+		self.allRows = []
+		for description, value, index, selected in selections:
+			self.allRows.append(((description, value, index),))
+			if selected:
+				self.selection.keys.add(value)
+		self.rowIndex = None
+		self.setList(self.allRows)
+
+	def filterSelections(self, values=None):
+		if values is None:
+			rows = self.allRows
+		else:
+			values = set(values)
+			rows = [row for row in self.allRows if row[0][1] in values]
+		self.rowIndex = None
+		self.setList(rows)
+		self.moveToIndex(0)
+
+	def isFiltered(self):
+		return self.list is not self.allRows
+
 	def addSelection(self, description, value, index, selected=True):
-		self.list.append(SelectionEntryComponent(description, value, index, selected, self.selectionListDescr))
+		row = ((description, value, index),)
+		self.allRows.append(row)
+		if self.isFiltered():
+			self.list.append(row)
+		self.selection.setSelected(value, selected)
+		self.rowIndex = None
 		self.setList(self.list)
 
 	def toggleSelection(self):
 		if len(self.list):
 			idx = self.getSelectedIndex()
-			item = self.list[idx][0]
-			self.list[idx] = SelectionEntryComponent(item[0], item[1], item[2], not item[3], self.selectionListDescr)
-			self.setList(self.list)
+			self.selection.toggle(self.list[idx][0][1])
+			self.invalidateRow(idx)
 
 	def getSelectionsList(self):
-		return [(item[0][0], item[0][1], item[0][2]) for item in self.list if item[0][3]]
+		isSelected = self.selection.isSelected
+		return [item[0] for item in self.allRows if isSelected(item[0][1])]
+
+	def getSelectedValues(self):
+		return self.selection.selected([item[0][1] for item in self.allRows])
 
 	def toggleAllSelection(self):
-		for idx, item in enumerate(self.list):
-			item = self.list[idx][0]
-			self.list[idx] = SelectionEntryComponent(item[0], item[1], item[2], not item[3], self.selectionListDescr)
-		self.setList(self.list)
+		if self.isFiltered():
+			# only the rows matching the current filter
+			for row in self.list:
+				self.selection.toggle(row[0][1])
+		else:
+			self.selection.toggleAll()
+		self.invalidateRow()
 
 	def removeSelection(self, item):
-		for it in self.list:
-			if it[0][0:3] == item[0:3]:
-				self.list.pop(self.list.index(it))
-				self.setList(self.list)
-				return
+		idx = self.getRowIndex(item[1])
+		if idx is not None:
+			row = self.list.pop(idx)
+			if self.isFiltered():
+				self.allRows.remove(row)
+			self.selection.discard(item[1])
+			self.rowIndex = None
+			self.setList(self.list)
 
 	def toggleItemSelection(self, item):
-		for idx, i in enumerate(self.list):
-			if i[0][0:3] == item[0:3]:
-				item = self.list[idx][0]
-				self.list[idx] = SelectionEntryComponent(item[0], item[1], item[2], not item[3], self.selectionListDescr)
-				self.setList(self.list)
-				return
+		idx = self.getRowIndex(item[1])
+		if idx is not None:
+			self.selection.toggle(item[1])
+			self.invalidateRow(idx)
 
 	def sort(self, sortType=False, flag=False):
 		# sorting by sortType:
@@ -79,7 +170,14 @@ class SelectionList(MenuList):
 		# 1 - value
 		# 2 - index
 		# 3 - selected
-		self.list.sort(key=lambda x: x[0][sortType], reverse=flag)
+		if sortType == 3:
+			key = lambda x: self.selection.isSelected(x[0][1])
+		else:
+			key = lambda x: x[0][sortType]
+		self.allRows.sort(key=key, reverse=flag)
+		if self.isFiltered():
+			self.list.sort(key=key, reverse=flag)
+		self.rowIndex = None
 		self.setList(self.list)
 
 	def applySkin(self, desktop, parent):
@@ -95,9 +193,6 @@ class SelectionList(MenuList):
 			else:
 				self.skinAttributes.remove((attrib, value))
 
-		# recreate the list with the new parameters parsed from skin
-		for x in range(len(self.list)):
-			description, value, index, selected = self.list[x][0]
-			self.list[x] = SelectionEntryComponent(description, value, index, selected, self.selectionListDescr)
+		# rows are built on demand, redraw them with the new parameters parsed from skin
 		self.setList(self.list)
 		return MenuList.applySkin(self, desktop, parent)
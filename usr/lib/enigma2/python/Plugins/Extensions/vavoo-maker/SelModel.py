@@ -0,0 +1,64 @@
+class SelectionModel(object):
+	"""
+	Selection state keyed by item value, kept apart from the rendered rows.
+
+	Only the keys whose state differs from the default are stored, and
+	toggling every item just flips the inversion flag, so toggles and
+	lookups are O(1) whatever the size of the list.
+	"""
+
+	def __init__(self, selected=None, inverted=False):
+		self.keys = set(selected or ())
+		self.inverted = inverted
+
+	def isSelected(self, key):
+		return (key in self.keys) != self.inverted
+
+	def setSelected(self, key, selected):
+		if bool(selected) != self.inverted:
+			self.keys.add(key)
+		else:
+			self.keys.discard(key)
+
+	def toggle(self, key):
+		if key in self.keys:
+			self.keys.discard(key)
+		else:
+			self.keys.add(key)
+
+	def toggleAll(self):
+		self.inverted = not self.inverted
+
+	def discard(self, key):
+		self.keys.discard(key)
+
+	def clear(self):
+		self.keys.clear()
+		self.inverted = False
+
+	def count(self, total):
+		"""Number of selected items out of a list of `total` known items"""
+		return total - len(self.keys) if self.inverted else len(self.keys)
+
+	def selected(self, values):
+		"""Selected keys among `values`, in their order"""
+		keys = self.keys
+		if self.inverted:
+			return [x for x in values if x not in keys]
+		return [x for x in values if x in keys]
+
+	def join(self, values, separator="|"):
+		"""Selected keys joined as stored in the cfg.country / cfg.categories strings"""
+		return separator.join(self.selected(values))
+
+	def dumps(self, separator="|"):
+		"""Compact text form: '-' when inverted, '+' otherwise, then the keys"""
+		return ("-" if self.inverted else "+") + separator.join(sorted(self.keys))
+
+	@classmethod
+	def loads(cls, text, separator="|", inverted=False):
+		"""Rebuild a model from dumps(); `inverted` is the state used for empty text"""
+		if not text:
+			return cls(inverted=inverted)
+		keys = text[1:].split(separator) if len(text) > 1 else ()
+		return cls(keys, text[0] == "-")
@@ -16,8 +16,11 @@ from os.path import exists
 
 def reload_bouquet():
 	from enigma import eDVBDB
-	eDVBDB.getInstance().reloadServicelist()
-	eDVBDB.getInstance().reloadBouquets()
+	from .vavoo_stats import stats
+	with stats.stage("reload"):
+		eDVBDB.getInstance().reloadServicelist()
+		eDVBDB.getInstance().reloadBouquets()
+	stats.count("reloads")
 
 
 try:
@@ -57,7 +60,8 @@ else:
 		if translated:
 			return translated
 		else:
-			print(("[%s] fallback to default translation for %s" % (PluginLanguageDomain, txt)))
+			from .vavoo_log import log
+			log.debug("fallback to default translation for %s", txt)
 			return gettext(txt)
 
 localeInit()
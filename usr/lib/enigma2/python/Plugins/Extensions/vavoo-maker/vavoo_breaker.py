@@ -0,0 +1,177 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Circuit breakers for the upstream endpoints.
+
+After THRESHOLD failures in a row a breaker opens: calls through it fail at
+once with CircuitOpen for COOLDOWN seconds, so a refresh during an outage
+does not wait out every timeout and falls back to the last good data. Then
+a single call is let through as a probe (half open); it closes the breaker
+on success and opens it again on failure. The state is kept in a small
+file, shared with the background refresh process, and guarded by one lock
+as probe and download threads report concurrently.
+"""
+
+import json
+import os
+import time
+from threading import RLock
+
+from .vavoo_log import log
+from .vavoo_stats import stats
+from .vavoo_worker import at_fork
+
+
+STATE_FILE = "/tmp/vavoo_breakers.json"
+THRESHOLD = 3
+COOLDOWN = 300
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker(object):
+    """Breaker of one endpoint, see breaker()"""
+
+    def __init__(self, name, threshold=THRESHOLD, cooldown=COOLDOWN):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened = 0
+        self.probing = False
+
+    def state(self, now=None):
+        if self.failures < self.threshold:
+            return CLOSED
+        if (now or time.time()) - self.opened < self.cooldown:
+            return OPEN
+        return HALF_OPEN
+
+    def allow(self):
+        with _registry.lock:
+            _registry.load()
+            state = self.state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self.probing:
+                # exactly one caller probes the endpoint, the others keep failing fast
+                self.probing = True
+                log.info("%s half open, probing", self.name)
+                return True
+        stats.count("breaker_short_circuits")
+        return False
+
+    def succeeded(self):
+        with _registry.lock:
+            if self.failures:
+                if self.failures >= self.threshold:
+                    log.warning("%s recovered, breaker closed", self.name)
+                self.failures = 0
+                _registry.save()
+            self.probing = False
+
+    def failed(self):
+        with _registry.lock:
+            self.failures += 1
+            self.probing = False
+            if self.failures >= self.threshold:
+                # a failed probe restarts the cool-down
+                self.opened = time.time()
+                if self.failures == self.threshold:
+                    log.warning("%s failed %d times, breaker open for %d s", self.name, self.failures, self.cooldown)
+            _registry.save()
+
+    def call(self, func, *args, **kwargs):
+        """func(*args, **kwargs) through the breaker, CircuitOpen while it is open"""
+        if not self.allow():
+            raise CircuitOpen("%s unavailable, retry in %d s" % (
+                self.name, max(0, self.cooldown - (time.time() - self.opened))))
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.failed()
+            raise
+        self.succeeded()
+        return result
+
+
+class _Registry(object):
+    def __init__(self):
+        self.breakers = {}
+        self.mtime = None
+        # reentrant: failed() saves while holding it
+        self.lock = RLock()
+
+    def get(self, name):
+        with self.lock:
+            self.load()
+            item = self.breakers.get(name)
+            if item is None:
+                item = self.breakers[name] = CircuitBreaker(name)
+            return item
+
+    def load(self):
+        """Pick up changes made by the other process, one stat() when there are none"""
+        try:
+            mtime = os.path.getmtime(STATE_FILE)
+        except OSError:
+            return
+        with self.lock:
+            if mtime == self.mtime:
+                return
+            self.mtime = mtime
+            try:
+                with open(STATE_FILE) as f:
+                    data = json.load(f)
+            except (IOError, OSError, ValueError):
+                return
+            for name, item in self.breakers.items():
+                if name not in data:
+                    # closed by the other process, which saves only breakers with failures
+                    item.failures = 0
+                    item.opened = 0
+                    item.probing = False
+            for name, (failures, opened) in data.items():
+                item = self.breakers.get(name)
+                if item is None:
+                    item = self.breakers[name] = CircuitBreaker(name)
+                item.failures = failures
+                item.opened = opened
+
+    def save(self):
+        with self.lock:
+            data = dict((name, (item.failures, item.opened)) for name, item in self.breakers.items() if item.failures)
+            try:
+                with open(STATE_FILE + ".new", "w") as f:
+                    json.dump(data, f)
+                os.rename(STATE_FILE + ".new", STATE_FILE)
+                self.mtime = os.path.getmtime(STATE_FILE)
+            except (IOError, OSError) as error:
+                log.warning("breaker state not saved: %s", error)
+
+    def after_fork(self):
+        """Fresh lock in a refresh child, a thread of the parent may have held it"""
+        self.lock = RLock()
+        for item in self.breakers.values():
+            item.probing = False
+
+    def report(self):
+        """(name, state, failures) of the breakers that saw failures"""
+        now = time.time()
+        with self.lock:
+            self.load()
+            return [(name, item.state(now), item.failures)
+                    for name, item in sorted(self.breakers.items()) if item.failures]
+
+
+_registry = _Registry()
+at_fork(_registry.after_fork)
+breaker = _registry.get
+report = _registry.report
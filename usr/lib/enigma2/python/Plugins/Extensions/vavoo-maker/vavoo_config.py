@@ -0,0 +1,123 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Vavoo Maker configuration entries.
+
+Kept free of heavy imports: plugin.py loads it at enigma2 boot so the
+autostart timer can read the schedule without pulling in the UI.
+"""
+
+from Components.config import (
+    ConfigInteger,
+    ConfigNumber,
+    ConfigSelection,
+    ConfigSelectionNumber,
+    ConfigClock,
+    ConfigText,
+    config,
+    ConfigYesNo,
+    ConfigSubsection
+)
+
+from . import _
+
+
+# =========================
+# Configurazione - usa cfg.
+# =========================
+config.plugins.vavoomaker = ConfigSubsection()
+cfg = config.plugins.vavoomaker
+
+# Scelte per il tipo di visualizzazione
+choices = {
+    "country": _("Countries"),
+    "categories": _("Categories")
+}
+cfg.current = ConfigSelection(
+    choices=[(x[0], x[1]) for x in choices.items()],
+    default=list(choices.keys())[0]
+)
+
+# Configurazione per ogni tipo
+for ch in choices:
+    setattr(cfg, ch, ConfigText("", False))
+
+# Configurazione timer aggiornamento automatico
+cfg.autobouquetupdate = ConfigYesNo(default=False)
+cfg.timetype = ConfigSelection(
+    default="interval",
+    choices=[("interval", _("interval")), ("fixed time", _("fixed time")), ("adaptive", _("adaptive"))]
+)
+cfg.updateinterval = ConfigSelectionNumber(default=10, min=5, max=3600, stepwidth=5)
+cfg.fixedtime = ConfigClock(default=46800)  # 13:00
+cfg.last_update = ConfigText(default="Never")
+# Minutes before the fixed time to fetch the playlist and signature, 0 disables
+cfg.prewarm = ConfigSelectionNumber(default=10, min=0, max=60, stepwidth=5)
+cfg.jitter = ConfigSelectionNumber(default=120, min=0, max=900, stepwidth=30)
+# Scheduled refreshes in a low priority child process, memory ceiling in MB
+cfg.worker = ConfigYesNo(default=False)
+cfg.worker_memory = ConfigSelectionNumber(default=96, min=32, max=512, stepwidth=32)
+# Mirrors separated by spaces, ranked by round trip time with failover
+cfg.playlist_mirrors = ConfigText(default="https://vavoo.to/channels", fixed_size=False)
+cfg.stream_mirrors = ConfigText(default="https://vavoo.to/live2/play/", fixed_size=False)
+# Second channel list request when the first is slower than usual
+cfg.hedge = ConfigYesNo(default=False)
+# Look up IPv4 and IPv6 addresses of the upstream hosts at the same time
+cfg.dns_parallel = ConfigYesNo(default=False)
+# Check streams during scheduled updates and mark or remove the dead ones
+cfg.probe = ConfigSelection(
+    default="off",
+    choices=[("off", _("off")), ("mark", _("mark offline")), ("drop", _("remove offline"))]
+)
+cfg.probe_workers = ConfigSelectionNumber(default=8, min=2, max=32, stepwidth=2)
+cfg.probe_deadline = ConfigSelectionNumber(default=60, min=15, max=600, stepwidth=15)
+# Bounds (minutes) for the adaptive schedule
+cfg.adaptive_min = ConfigSelectionNumber(default=30, min=5, max=1440, stepwidth=5)
+cfg.adaptive_max = ConfigSelectionNumber(default=720, min=30, max=2880, stepwidth=30)
+
+# Run the next refresh under cProfile and tracemalloc, reset once the report is written
+cfg.profile = ConfigYesNo(default=False)
+# Main loop callbacks running longer than this (ms) are logged with their stack
+cfg.stall_ms = ConfigSelectionNumber(default=300, min=50, max=2000, stepwidth=50)
+# Read-only Prometheus-style endpoint, on localhost unless the LAN is allowed
+cfg.metrics = ConfigYesNo(default=False)
+cfg.metrics_port = ConfigInteger(default=9187, limits=(1024, 65535))
+cfg.metrics_lan = ConfigYesNo(default=False)
+# Level of the plugin log (console and /tmp/vavoomaker.log)
+cfg.loglevel = ConfigSelection(
+    default="warning",
+    choices=[("error", _("errors")), ("warning", _("warnings")), ("info", _("info")), ("debug", _("debug"))]
+)
+
+# Scheduler bookkeeping (epoch seconds), not shown in the setup screen
+cfg.last_run = ConfigNumber(default=0)
+cfg.last_attempt = ConfigNumber(default=0)
+cfg.failures = ConfigNumber(default=0)
+# Adaptive schedule state: learned interval (minutes), runs saved, last playlist digest
+cfg.adaptive_interval = ConfigNumber(default=0)
+cfg.refreshes_avoided = ConfigNumber(default=0)
+cfg.playlist_digest = ConfigText(default="")
+
+
+def check_current_config():
+    """Log the update settings, one record with a field per entry"""
+    # imported here: vavoo_log reads cfg.loglevel while it loads
+    from .vavoo_log import fields, log
+    values = {
+        "autobouquetupdate": cfg.autobouquetupdate.value,
+        "timetype": cfg.timetype.value,
+        "updateinterval": cfg.updateinterval.value,
+        "fixedtime": "%02d:%02d" % tuple(cfg.fixedtime.value),
+        "last_update": cfg.last_update.value,
+        "jitter": cfg.jitter.value,
+        "failures": cfg.failures.value,
+        "worker": cfg.worker.value,
+        "probe": cfg.probe.value,
+    }
+    if cfg.timetype.value == "fixed time":
+        values["prewarm"] = cfg.prewarm.value
+    if cfg.timetype.value == "adaptive":
+        values["adaptive_interval"] = cfg.adaptive_interval.value
+        values["refreshes_avoided"] = cfg.refreshes_avoided.value
+    log.info("config", extra=fields(**values))
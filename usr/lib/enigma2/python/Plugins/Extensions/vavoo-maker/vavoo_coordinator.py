@@ -0,0 +1,148 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Single-flight coordination of bouquet pipeline runs.
+
+Scheduled updates, bouquet creation and removal all rewrite bouquets.tv and
+the vavoo userbouquets, so only one of them may run at a time. A request
+for the run already in progress attaches to it and gets its result, any
+other request waits in a queue. Everything happens on the enigma2 main
+loop: runs report back through the done callback, possibly much later
+when the work happens in a child process.
+"""
+
+import time
+
+from enigma import eTimer
+
+from . import _
+from .vavoo_log import log
+from .vavoo_watchdog import watch
+
+
+STARTED = "started"
+ATTACHED = "attached"
+QUEUED = "queued"
+
+LABELS = {
+    "refresh": _("scheduled update"),
+    "create": _("bouquet creation"),
+    "remove": _("bouquet removal"),
+}
+
+
+class PipelineRun(object):
+    def __init__(self, kind, key, start, callback):
+        self.kind = kind
+        self.key = key
+        self.start = start
+        self.callbacks = [callback] if callback is not None else []
+        self.started = 0
+
+    def same(self, kind, key):
+        return self.kind == kind and self.key == key
+
+    def label(self):
+        return LABELS.get(self.kind, self.kind)
+
+
+class RefreshCoordinator(object):
+    """Run pipeline jobs one at a time, sharing results between identical requests"""
+
+    def __init__(self):
+        self.running = None
+        self.queue = []
+        # callables without arguments, called when the state text changes
+        self.onChange = []
+        self.timer = None
+
+    def submit(self, kind, start, callback=None, key=None):
+        """
+        Request a run. start(done) does the work and calls done(result) once
+        finished; callback(result) is called with that result. Returns
+        STARTED, ATTACHED or QUEUED.
+        """
+        if self.running is not None and self.running.same(kind, key):
+            if callback is not None:
+                self.running.callbacks.append(callback)
+            log.info("%s already running, attached", kind)
+            return ATTACHED
+        for run in self.queue:
+            if run.same(kind, key):
+                if callback is not None:
+                    run.callbacks.append(callback)
+                return QUEUED
+        run = PipelineRun(kind, key, start, callback)
+        if self.running is not None:
+            log.info("%s queued behind %s", kind, self.running.kind)
+            self.queue.append(run)
+            self.changed()
+            return QUEUED
+        self.begin(run)
+        return STARTED
+
+    def withdraw(self, callback):
+        """Forget callback, dropping queued runs nobody waits for any more"""
+        for run in [self.running] + self.queue:
+            if run is not None and callback in run.callbacks:
+                run.callbacks.remove(callback)
+        self.queue = [run for run in self.queue if run.callbacks]
+        self.changed()
+
+    def busy(self):
+        return self.running is not None
+
+    def begin(self, run):
+        self.running = run
+        run.started = time.time()
+        self.changed()
+        try:
+            run.start(lambda result: self.finish(run, result))
+        except Exception as error:
+            log.exception("%s failed: %s", run.kind, error)
+            self.finish(run, False)
+
+    def finish(self, run, result):
+        if self.running is not run:
+            return
+        log.info("%s finished in %.1f s", run.kind, time.time() - run.started)
+        self.running = None
+        for callback in run.callbacks:
+            try:
+                callback(result)
+            except Exception as error:
+                log.exception("%s callback failed: %s", run.kind, error)
+        self.changed()
+        if self.queue:
+            # start the next run from the main loop, so the screens can redraw first
+            if self.timer is None:
+                self.timer = eTimer()
+                try:
+                    self.timer.callback.append(watch("RefreshCoordinator.next", self.next))
+                except BaseException:
+                    self.timer_conn = self.timer.timeout.connect(watch("RefreshCoordinator.next", self.next))
+            self.timer.start(10, True)
+
+    def next(self):
+        if self.running is None and self.queue:
+            self.begin(self.queue.pop(0))
+
+    def describe(self):
+        """State for the screens, empty when idle"""
+        if self.running is None:
+            return ""
+        text = _("Running: %s (%d s)") % (self.running.label(), time.time() - self.running.started)
+        if self.queue:
+            text += " - " + _("waiting: %s") % ", ".join(run.label() for run in self.queue)
+        return text
+
+    def changed(self):
+        for callback in self.onChange[:]:
+            try:
+                callback()
+            except Exception as error:
+                log.error("state listener failed: %s", error)
+
+
+coordinator = RefreshCoordinator()
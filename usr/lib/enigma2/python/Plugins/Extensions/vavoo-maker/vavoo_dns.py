@@ -0,0 +1,239 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+In-process DNS cache for the upstream hosts.
+
+Many receivers have no caching resolver, so every request to vavoo.to or
+GitHub costs a full lookup. The plugin's requests go through session(),
+whose connections take the address of the plugin's hosts from a cache:
+results are kept for TTL seconds, failures for NEGATIVE_TTL seconds. Name
+lookups of enigma2 and other plugins are left alone, nothing global is
+patched. With parallel set, IPv4 and IPv6 addresses are looked up at the
+same time instead of one after the other.
+"""
+
+import socket
+import time
+from threading import Lock, Thread
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+try:
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+    from urllib3.exceptions import NewConnectionError
+except ImportError:
+    # requests releases bundling their own urllib3
+    from requests.packages.urllib3.connection import HTTPConnection, HTTPSConnection
+    from requests.packages.urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+    from requests.packages.urllib3.exceptions import NewConnectionError
+
+from .vavoo_stats import stats
+from .vavoo_worker import at_fork
+
+
+TTL = 300
+NEGATIVE_TTL = 30
+# connections kept per host, enough for a full pool of stream probes
+POOL_SIZE = 32
+UPSTREAM_HOSTS = (
+    "vavoo.to",
+    "www.vavoo.tv",
+    "raw.githubusercontent.com",
+    "v4.ident.me",
+    "api.ipify.org",
+    "api.myip.com",
+    "checkip.amazonaws.com",
+)
+
+
+class ResolverCache(object):
+    def __init__(self, resolve, ttl=TTL, negative_ttl=NEGATIVE_TTL):
+        self.resolve = resolve
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hosts = set()
+        self.parallel = False
+        self.lock = Lock()
+        # (host, port, family, type, proto, flags) -> (expires, addresses or error)
+        self.entries = {}
+        # host -> [lookups made, seconds spent]; gives the time a hit saves
+        self.cost = {}
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.saved = 0.0
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        name = host.lower() if hasattr(host, "lower") else host
+        if name not in self.hosts:
+            return self.resolve(host, port, family, type, proto, flags)
+        key = (name, port, family, type, proto, flags)
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                made, spent = self.cost.get(name, (0, 0.0))
+                if made:
+                    self.saved += spent / made
+                result = entry[1]
+                if isinstance(result, Exception):
+                    self.negative_hits += 1
+            else:
+                result = None
+        if result is not None:
+            stats.count("dns_cache_hits")
+            if isinstance(result, Exception):
+                raise result
+            return list(result)
+
+        started = time.time()
+        try:
+            result = self.lookup(host, port, family, type, proto, flags)
+        except socket.gaierror as error:
+            self.store(key, name, error, self.negative_ttl, started)
+            stats.count("dns_cache_misses")
+            raise
+        self.store(key, name, result, self.ttl, started)
+        stats.count("dns_cache_misses")
+        return list(result)
+
+    def store(self, key, name, result, ttl, started):
+        spent = time.time() - started
+        with self.lock:
+            self.misses += 1
+            self.entries[key] = (time.time() + ttl, result)
+            made, total = self.cost.get(name, (0, 0.0))
+            self.cost[name] = (made + 1, total + spent)
+
+    def lookup(self, host, port, family, type, proto, flags):
+        if not self.parallel or family != socket.AF_UNSPEC or not socket.has_ipv6:
+            return self.resolve(host, port, family, type, proto, flags)
+        answers = {}
+
+        def query(which):
+            try:
+                answers[which] = self.resolve(host, port, which, type, proto, flags)
+            except socket.gaierror as error:
+                answers[which] = error
+
+        threads = [Thread(target=query, args=(which,), name="vavoo-dns") for which in (socket.AF_INET, socket.AF_INET6)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # IPv4 first: many receivers have an IPv6 address but no IPv6 route
+        addresses = []
+        for which in (socket.AF_INET, socket.AF_INET6):
+            if not isinstance(answers.get(which), Exception):
+                addresses.extend(answers.get(which) or [])
+        if not addresses:
+            errors = [x for x in answers.values() if isinstance(x, Exception)]
+            raise errors[0] if errors else socket.gaierror(socket.EAI_NONAME, "no address")
+        return addresses
+
+    def address(self, host, port):
+        """Address to connect to for host, IPv4 first; hosts not cached come back unchanged"""
+        name = host.lower()
+        if name not in self.hosts:
+            return host
+        infos = self.getaddrinfo(name, port, 0, socket.SOCK_STREAM)
+        for info in infos:
+            if info[0] == socket.AF_INET:
+                return info[4][0]
+        return infos[0][4][0]
+
+    def forget(self, host):
+        """Drop the cached addresses of host, e.g. after a failed connect"""
+        name = host.lower()
+        with self.lock:
+            for key in [x for x in self.entries if x[0] == name]:
+                del self.entries[key]
+
+    def add_hosts(self, hosts):
+        for host in hosts:
+            if host:
+                self.hosts.add(host.split(":")[0].lower())
+
+    def after_fork(self):
+        """Fresh lock in a refresh child, a thread of the parent may have held it"""
+        self.lock = Lock()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def report(self):
+        """Lines for the statistics screen"""
+        if not self.hits + self.misses:
+            return []
+        return ["    %d lookups, %d from the cache (%d failures), %d resolved, %.2f s saved" % (
+            self.hits + self.misses, self.hits, self.negative_hits, self.misses, self.saved)]
+
+
+resolver = ResolverCache(socket.getaddrinfo)
+resolver.add_hosts(UPSTREAM_HOSTS)
+at_fork(resolver.after_fork)
+
+
+def _cached(base):
+    class Connection(base):
+        def _new_conn(self):
+            host = self._dns_host
+            name = host.rstrip(".")
+            try:
+                address = resolver.address(name, self.port)
+            except socket.gaierror as error:
+                raise NewConnectionError(self, "Failed to resolve %s: %s" % (name, error))
+            # self.host is derived from _dns_host: swapped for the connect only,
+            # it stays the name for SNI, the Host header and the certificate check
+            self._dns_host = address
+            try:
+                return base._new_conn(self)
+            except Exception:
+                resolver.forget(name)
+                raise
+            finally:
+                self._dns_host = host
+    return Connection
+
+
+class _HTTPPool(HTTPConnectionPool):
+    ConnectionCls = _cached(HTTPConnection)
+
+
+class _HTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _cached(HTTPSConnection)
+
+
+class CachedResolverAdapter(HTTPAdapter):
+    """Transport adapter whose connections resolve through the cache"""
+
+    def __init__(self):
+        HTTPAdapter.__init__(self, pool_maxsize=POOL_SIZE)
+
+    def init_poolmanager(self, *args, **kwargs):
+        HTTPAdapter.init_poolmanager(self, *args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _HTTPPool, "https": _HTTPSPool}
+
+    def after_fork(self):
+        """
+        New, empty pools in a refresh child: the parent keeps using its
+        pooled sockets, and its threads may have held the pool locks
+        """
+        self.init_poolmanager(self._pool_connections, self._pool_maxsize, block=self._pool_block)
+        self.proxy_manager = {}
+
+
+def session():
+    """requests Session for the plugin's own requests"""
+    http = Session()
+    for prefix in ("http://", "https://"):
+        adapter = CachedResolverAdapter()
+        http.mount(prefix, adapter)
+        at_fork(adapter.after_fork)
+    return http
@@ -39,11 +39,14 @@ import base64
 import json
 import ssl
 import types
-from os import listdir, remove, system
-from os.path import exists, getsize, isfile, join, splitext
+from os import listdir, remove, rename, system, utime
+from os.path import exists, getmtime, getsize, isfile, join, splitext
+from contextlib import contextmanager
+from heapq import heappop, heappush
 from random import choice
 from re import search, sub, compile
 from sys import version_info, maxsize
+from threading import Condition, Event, Lock, Thread, local
 from time import time
 from unicodedata import normalize
 
@@ -54,12 +57,21 @@ import requests
 import six
 from six import iteritems, unichr
 from six.moves import html_entities, html_parser
+from six.moves.urllib.parse import urlparse
 
 # =========================
 # Project-specific imports
 # =========================
 from Tools.Directories import SCOPE_PLUGINS, resolveFilename
 
+from .vavoo_breaker import CircuitOpen, breaker
+from .vavoo_config import cfg
+from .vavoo_dns import resolver as dns, session as dns_session
+from .vavoo_log import log
+from .vavoo_stats import monotonic, stats
+from .vavoo_vectors import VectorScores
+from .vavoo_worker import at_fork
+
 # =========================
 # Compatibility shims
 # =========================
@@ -97,15 +109,146 @@ else:
 
 
 def trace_error():
-    """error tracing and logging"""
-    import traceback
-    from sys import stdout, stderr
-    try:
-        traceback.print_exc(file=stdout)
-        with open("/tmp/vavoomaker.log", "a", encoding='utf-8') as log_file:
-            traceback.print_exc(file=log_file)
-    except Exception as e:
-        print("Failed to log the error:", e, file=stderr)
+    """Log the exception being handled with its traceback"""
+    log.exception("unexpected error")
+
+
+# =========================
+# Outbound request governor
+# =========================
+INTERACTIVE = 0
+NORMAL = 1
+BACKGROUND = 2
+
+
+class _Host(object):
+    def __init__(self, rate):
+        self.active = 0
+        self.tokens = float(rate)
+        self.refilled = monotonic()
+        # heap of (priority, sequence) of the requests waiting for this host
+        self.waiting = []
+
+
+class Governor(object):
+    """
+    Every outbound request takes a slot of its host first: at most `limit`
+    run at once per host, started at no more than `rate` per second with
+    bursts of the same size. Waiting requests go by priority, then in order,
+    so a list opened on screen is not stuck behind background stream checks.
+    """
+
+    def __init__(self, limit=8, rate=20.0):
+        self.limit = limit
+        self.rate = rate
+        self.hosts = {}
+        self.lock = Condition()
+        self.sequence = 0
+        self.local = local()
+        # since enigma2 started, by priority: requests, requests that queued,
+        # seconds spent queueing and the longest wait
+        self.requests = [0, 0, 0]
+        self.queued = [0, 0, 0]
+        self.delay = [0.0, 0.0, 0.0]
+        self.max_delay = [0.0, 0.0, 0.0]
+
+    def _refill(self, host, now):
+        host.tokens = min(float(self.rate), host.tokens + (now - host.refilled) * self.rate)
+        host.refilled = now
+
+    def acquire(self, url, priority=None):
+        """Wait for a slot of the host of url, returns the host name for release()"""
+        if priority is None:
+            priority = self.current()
+        name = urlparse(url).netloc
+        started = monotonic()
+        with self.lock:
+            host = self.hosts.get(name)
+            if host is None:
+                host = self.hosts[name] = _Host(self.rate)
+            self.sequence += 1
+            ticket = (priority, self.sequence)
+            heappush(host.waiting, ticket)
+            while True:
+                now = monotonic()
+                self._refill(host, now)
+                if host.waiting[0] == ticket and host.active < self.limit and host.tokens >= 1:
+                    break
+                # woken by release(), or when the next token is due
+                self.lock.wait(max(0.01, (1 - host.tokens) / self.rate) if host.tokens < 1 else None)
+            heappop(host.waiting)
+            host.active += 1
+            host.tokens -= 1
+            waited = monotonic() - started
+            self.requests[priority] += 1
+            if waited > 0.001:
+                self.queued[priority] += 1
+                self.delay[priority] += waited
+                self.max_delay[priority] = max(self.max_delay[priority], waited)
+            # the next in line may fit too
+            self.lock.notify_all()
+        if waited > 0.001:
+            stats.count("governor_queued")
+            stats.count("governor_wait_ms", int(waited * 1000))
+        return name
+
+    def release(self, name):
+        with self.lock:
+            self.hosts[name].active -= 1
+            self.lock.notify_all()
+
+    @contextmanager
+    def slot(self, url, priority=None):
+        name = self.acquire(url, priority)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    def current(self):
+        """Priority of the requests made by the calling thread"""
+        return getattr(self.local, "priority", NORMAL)
+
+    @contextmanager
+    def priority(self, priority):
+        """Default priority of the requests made by the calling thread"""
+        previous = self.current()
+        self.local.priority = priority
+        try:
+            yield
+        finally:
+            self.local.priority = previous
+
+    def request(self, method, url, priority=None, **kwargs):
+        """http.request() through a slot; streamed bodies are read within the slot by the caller"""
+        with self.slot(url, priority):
+            return http.request(method, url, **kwargs)
+
+    def after_fork(self):
+        """
+        Fresh lock and hosts in a refresh child: the slots of parent threads
+        are never released there, and one of them may have held the lock
+        """
+        self.lock = Condition()
+        self.hosts = {}
+
+    def report(self):
+        """Lines for the statistics screen"""
+        lines = []
+        for priority, label in ((INTERACTIVE, "interactive"), (NORMAL, "normal"), (BACKGROUND, "background")):
+            if self.requests[priority]:
+                lines.append("    %-12s %6d requests %6d queued  wait %.2f s, max %.2f s" % (
+                    label, self.requests[priority], self.queued[priority],
+                    self.delay[priority], self.max_delay[priority]))
+        return lines
+
+
+governor = Governor()
+at_fork(governor.after_fork)
+
+# session of the plugin's requests: pooled connections, cached name lookups
+http = dns_session()
+cfg.dns_parallel.addNotifier(lambda element: setattr(dns, "parallel", element.value), initial_call=True)
 
 
 class AspectManager:
@@ -114,9 +257,9 @@ class AspectManager:
     def __init__(self):
         try:
             self.init_aspect = self.get_current_aspect()
-            print("[INFO] Initial aspect ratio:", self.init_aspect)
+            log.info("Initial aspect ratio: %s", self.init_aspect)
         except Exception as e:
-            print("[ERROR] Failed to initialize aspect manager:", str(e))
+            log.error("Failed to initialize aspect manager: %s", e)
             self.init_aspect = 0  # Fallback
 
     def get_current_aspect(self):
@@ -126,7 +269,7 @@ class AspectManager:
             # Assicurati che sia un intero valido
             return int(aspect) if aspect is not None else 0
         except (ValueError, TypeError, Exception) as e:
-            print("[ERROR] Failed to get aspect ratio:", str(e))
+            log.error("Failed to get aspect ratio: %s", e)
             return 0  # Default 4:3
 
     def set_aspect(self, aspect_ratio):
@@ -141,36 +284,45 @@ class AspectManager:
 
             if aspect_ratio in aspect_map:
                 new_aspect = aspect_map[aspect_ratio]
-                print("[INFO] Setting aspect ratio to:", aspect_ratio, "(", new_aspect, ")")
+                log.info("Setting aspect ratio to: %s (%s)", aspect_ratio, new_aspect)
                 AVSwitch().setAspectRatio(new_aspect)
                 return True
             else:
-                print("[ERROR] Unknown aspect ratio:", aspect_ratio)
+                log.error("Unknown aspect ratio: %s", aspect_ratio)
                 return False
 
         except Exception as e:
-            print("[ERROR] Failed to set aspect ratio:", str(e))
+            log.error("Failed to set aspect ratio: %s", e)
             return False
 
     def restore_aspect(self):
         """Restore original aspect ratio"""
         try:
             if hasattr(self, 'init_aspect') and self.init_aspect is not None:
-                print("[INFO] Restoring aspect ratio to:", self.init_aspect)
+                log.info("Restoring aspect ratio to: %s", self.init_aspect)
                 AVSwitch().setAspectRatio(self.init_aspect)
             else:
-                print("[WARNING] No initial aspect ratio to restore")
+                log.warning("No initial aspect ratio to restore")
         except Exception as e:
-            print("[ERROR] Failed to restore aspect ratio:", str(e))
+            log.error("Failed to restore aspect ratio: %s", e)
+
 
+_aspect_manager = None
+
+
+def get_aspect_manager():
+    """Create the AspectManager on first use (AVSwitch is not touched at import)"""
+    global _aspect_manager
+    if _aspect_manager is None:
+        _aspect_manager = AspectManager()
+    return _aspect_manager
 
-aspect_manager = AspectManager()
 
 class_types = (type,) if PYTHON_VER == 3 else (type, types.ClassType)
 text_type = six.text_type  # unicode in Py2, str in Py3
 binary_type = six.binary_type  # str in Py2, bytes in Py3
 MAXSIZE = maxsize
-_UNICODE_MAP = {k: unichr(v) for k, v in iteritems(html_entities.name2codepoint)}
+_UNICODE_MAP = {}
 _ESCAPE_RE = compile(r"[&<>\"']")
 _UNESCAPE_RE = compile(r"&\s*(#?)(\w+?)\s*;")
 _ESCAPE_DICT = {
@@ -207,6 +359,8 @@ def _convert_entity(m):
             return unichr(int(m.group(2)[1:], 16)) if m.group(2)[:1].lower() == "x" else unichr(int(m.group(2)))
         except ValueError:
             return "&#%s;" % m.group(2)
+    if not _UNICODE_MAP:
+        _UNICODE_MAP.update((k, unichr(v)) for k, v in iteritems(html_entities.name2codepoint))
     return _UNICODE_MAP.get(m.group(2), "&%s;" % m.group(2))
 
 
@@ -223,7 +377,7 @@ def b64decoder(data):
         decoded = base64.b64decode(data)
         return decoded.decode('utf-8') if PYTHON_VER == 3 else decoded
     except Exception as e:
-        print("Base64 decoding error: %s" % e)
+        log.warning("Base64 decoding error: %s", e)
         return ""
 
 
@@ -232,28 +386,46 @@ def getUrl(url):
     headers = {'User-Agent': RequestAgent()}
 
     try:
-        if PYTHON_VER == 3:
-            response = urlopen(Request(url, headers=headers), timeout=20, context=ssl_context)
-            return response.read().decode('utf-8', errors='ignore')
-        else:
-            response = urlopen(Request(url, headers=headers), timeout=20)
-            return response.read()
+        with governor.slot(url):
+            if PYTHON_VER == 3:
+                response = breaker(urlparse(url).netloc).call(urlopen, Request(url, headers=headers), timeout=20, context=ssl_context)
+                return response.read().decode('utf-8', errors='ignore')
+            else:
+                response = breaker(urlparse(url).netloc).call(urlopen, Request(url, headers=headers), timeout=20)
+                return response.read()
     except Exception as e:
-        print("URL fetch error: %s" % e)
+        log.warning("URL fetch error: %s", e)
         return ""
 
 
+# the external IP is looked up again after this many seconds, after a
+# failed lookup already after EXTERNAL_IP_RETRY
+EXTERNAL_IP_TTL = 1800
+EXTERNAL_IP_RETRY = 60
+# (time of the lookup, IP or None), per process
+_external_ip = (0, None)
+
+
 def get_external_ip():
+    """External IP of the box, None while unknown; looked up at most once per EXTERNAL_IP_TTL"""
+    global _external_ip
+    checked, ip = _external_ip
+    age = time() - checked
+    if 0 <= age < (EXTERNAL_IP_TTL if ip else EXTERNAL_IP_RETRY):
+        return ip
+    ip = _lookup_external_ip()
+    _external_ip = (time(), ip)
+    return ip
+
+
+def _lookup_external_ip():
     """Get external IP using multiple fallback services"""
-    import requests
-    from subprocess import Popen, PIPE
-
     services = [
-        lambda: Popen(['curl', '-s', 'ifconfig.me'], stdout=PIPE).communicate()[0].decode('utf-8').strip(),
-        lambda: requests.get('https://v4.ident.me', timeout=5).text.strip(),
-        lambda: requests.get('https://api.ipify.org', timeout=5).text.strip(),
-        lambda: requests.get('https://api.myip.com', timeout=5).json().get("ip", "").strip(),
-        lambda: requests.get('https://checkip.amazonaws.com', timeout=5).text.strip(),
+        lambda: governor.request("GET", 'https://ifconfig.me/ip', priority=BACKGROUND, timeout=5).text.strip(),
+        lambda: governor.request("GET", 'https://v4.ident.me', priority=BACKGROUND, timeout=5).text.strip(),
+        lambda: governor.request("GET", 'https://api.ipify.org', priority=BACKGROUND, timeout=5).text.strip(),
+        lambda: governor.request("GET", 'https://api.myip.com', priority=BACKGROUND, timeout=5).json().get("ip", "").strip(),
+        lambda: governor.request("GET", 'https://checkip.amazonaws.com', priority=BACKGROUND, timeout=5).text.strip(),
     ]
 
     for service in services:
@@ -267,10 +439,13 @@ def get_external_ip():
 
 
 def set_cache(key, data, timeout):
+    """Store data under key for timeout seconds, valid for the current external IP only"""
     file_path = join(PLUGIN_PATH, key + '.json')
     try:
         if not isinstance(data, dict):
             data = {"value": data}
+        # the fields _is_cache_valid() checks
+        data = dict(data, sigValidUntil=int(time()) + timeout, ip=get_external_ip() or "")
         if PYTHON_VER < 3:
             import io
             converted_data = convert_to_unicode(data)
@@ -280,7 +455,7 @@ def set_cache(key, data, timeout):
             with open(file_path, 'w', encoding='utf-8') as cache_file:
                 json.dump(data, cache_file, indent=4, ensure_ascii=False)
     except Exception as e:
-        print("Error saving cache:", e)
+        log.error("Error saving cache: %s", e)
 
 
 def convert_to_unicode(data):
@@ -308,7 +483,7 @@ def get_cache(key):
             _write_json_file(file_path, data)
 
         if not isinstance(data, dict):
-            print("Unexpected data format in {}: Expected a dict, got {}".format(file_path, type(data)))
+            log.warning("Unexpected data format in %s: expected a dict, got %s", file_path, type(data))
             remove(file_path)
             return None
 
@@ -316,9 +491,9 @@ def get_cache(key):
             return data.get('value')
 
     except ValueError as e:
-        print("Error decoding JSON from", file_path, ":", e)
+        log.warning("Error decoding JSON from %s: %s", file_path, e)
     except Exception as e:
-        print("Unexpected error reading cache file {}:".format(file_path), e)
+        log.error("Unexpected error reading cache file %s: %s", file_path, e)
         remove(file_path)
 
     return None
@@ -339,58 +514,218 @@ def _write_json_file(file_path, data):
         json.dump(data, f, indent=4, ensure_ascii=False)
 
 
+def get_snapshot(key):
+    """Last value stored under key, however old: the fallback while an endpoint is down"""
+    file_path = join(PLUGIN_PATH, key + '.json')
+    try:
+        data = _read_json_file(file_path)
+    except Exception:
+        return None
+    return data.get('value') if isinstance(data, dict) else None
+
+
 def _is_cache_valid(data):
-    return (
-        data.get('sigValidUntil', 0) > int(time())
-        and data.get('ip', "") == get_external_ip()
-    )
+    if data.get('sigValidUntil', 0) <= int(time()):
+        return False
+    # an IP that cannot be looked up right now does not void the entry
+    ip = data.get('ip') and get_external_ip()
+    return not ip or data['ip'] == ip
 
 
 def getAuthSignature():
+    with stats.stage("signature"):
+        return _getAuthSignature()
+
+
+def _getAuthSignature():
     signfile = get_cache('signfile')
     if signfile:
+        stats.count("signature_cache_hits")
         return signfile
 
-    veclist = get_cache("veclist")
+    stats.count("signature_fetches")
+    veclist = veclist_loader.get()
     if not veclist:
-        try:
-            if ssl_context:
-                req = Request("https://raw.githubusercontent.com/Belfagor2005/vavoo/refs/heads/main/data.json")
-                with urlopen(req, context=ssl_context) as r:
-                    veclist = json.load(r)
-            else:
-                response = requests.get("https://raw.githubusercontent.com/Belfagor2005/vavoo/refs/heads/main/data.json", verify=False)
-                veclist = response.json()
-        except Exception as e:
-            print("[vUtils] Failed to fetch veclist:", e)
-            return None
+        return _lastSignature()
 
-        set_cache("veclist", veclist, timeout=3600)
     sig = None
-    i = 0
-    while not sig and i < 50:
-        i += 1
-        vec = {"vec": choice(veclist)}
-        req = requests.post('https://www.vavoo.tv/api/box/ping2', data=vec).json()
+    ping = breaker("ping2")
+    # vectors that earned signatures before come first, see vavoo_vectors
+    scores = VectorScores(join(PLUGIN_PATH, "vectors.json"))
+    for vec in scores.ranked(veclist)[:50]:
+        stats.count("signature_attempts")
+        started = time()
+        try:
+            req = ping.call(_ping, {"vec": vec})
+        except CircuitOpen as e:
+            log.warning("%s", e)
+            break
+        except (requests.exceptions.RequestException, ValueError) as e:
+            # the network failed, not the vector
+            log.warning("ping2 failed: %s", e)
+            continue
         sig = req.get('signed') or req.get('data', {}).get('signed') or req.get('response', {}).get('signed')
+        scores.record(vec, bool(sig), time() - started)
+        if sig:
+            break
+    scores.save(veclist)
 
     if sig:
         set_cache('signfile', convert_to_unicode(sig), timeout=3600)
+        return sig
+    return _lastSignature()
+
+
+VECLIST_URL = "https://raw.githubusercontent.com/Belfagor2005/vavoo/main/data.json"
+VECLIST_MAX_AGE = 24 * 3600
+
+
+class VeclistLoader(object):
+    """
+    The veclist from a single cache file, veclist.json. It is parsed once
+    into a tuple and parsed again only when the file changes, e.g. after a
+    refresh in the background process. Refreshes are conditional requests
+    (ETag / Last-Modified), and concurrent callers share one request.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.vectors = ()
+        self.etag = None
+        self.modified = None
+        self.mtime = None
+        self.lock = Lock()
+        # Event of the request in flight, None when there is none
+        self.flight = None
+        self.background = None
+
+    def get(self):
+        """The vectors, empty when there are none; stale ones are refreshed in the background"""
+        self.read()
+        if not self.vectors:
+            try:
+                self.fetch()
+            except Exception as e:
+                log.error("Failed to fetch veclist: %s", e)
+        elif time() - self.mtime > VECLIST_MAX_AGE:
+            self.refreshLater()
+        return self.vectors
+
+    def read(self):
+        try:
+            mtime = getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self.mtime:
+            return
+        try:
+            data = _read_json_file(self.path)
+        except Exception as e:
+            log.warning("veclist cache unreadable: %s", e)
+            return
+        self.mtime = mtime
+        if isinstance(data, dict) and isinstance(data.get("value"), list):
+            self.vectors = tuple(data["value"])
+            self.etag = data.get("etag")
+            self.modified = data.get("last_modified")
+
+    def after_fork(self):
+        """A request in flight in the parent never completes in a refresh child"""
+        self.lock = Lock()
+        self.flight = None
+        self.background = None
+
+    def fetch(self):
+        """Download or revalidate the veclist; a caller arriving meanwhile waits for that request"""
+        with self.lock:
+            flight = self.flight
+            leader = flight is None
+            if leader:
+                flight = self.flight = Event()
+        if not leader:
+            stats.count("veclist_shared")
+            flight.wait(30)
+            self.read()
+            return self.vectors
+        try:
+            self._fetch()
+        finally:
+            with self.lock:
+                self.flight = None
+            flight.set()
+        return self.vectors
+
+    def _fetch(self):
+        headers = {}
+        if self.vectors and self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.vectors and self.modified:
+            headers["If-Modified-Since"] = self.modified
+        response = breaker("veclist").call(_getVeclist, headers)
+        if response.status_code == 304:
+            stats.count("veclist_not_modified")
+            # unchanged: restart the age only
+            utime(self.path, None)
+            self.mtime = getmtime(self.path)
+            return
+        vectors = response.json()
+        if not isinstance(vectors, list) or not vectors:
+            raise ValueError("unexpected veclist format")
+        stats.count("veclist_downloads")
+        data = {
+            "value": vectors,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        with open(self.path + ".new", "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        rename(self.path + ".new", self.path)
+        self.read()
+
+    def refreshLater(self):
+        if self.background is not None and self.background.is_alive():
+            return
+
+        def refresh():
+            try:
+                self.fetch()
+            except Exception as e:
+                log.warning("veclist refresh failed, keeping the stored one: %s", e)
+
+        self.background = Thread(target=refresh, name="vavoo-veclist")
+        self.background.daemon = True
+        self.background.start()
+
+
+def _getVeclist(headers):
+    # python 2 images often lack the certificates for github
+    response = governor.request("GET", VECLIST_URL, headers=headers, timeout=10, verify=ssl_context is not None)
+    if response.status_code != 304:
+        response.raise_for_status()
+    return response
+
+
+veclist_loader = VeclistLoader(join(PLUGIN_PATH, "veclist.json"))
+at_fork(veclist_loader.after_fork)
+
+
+def _ping(vec):
+    response = governor.request("POST", 'https://www.vavoo.tv/api/box/ping2', data=vec, timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+
+def _lastSignature():
+    sig = get_snapshot('signfile')
+    if sig:
+        log.warning("no new signature, using the last good one")
+        stats.count("signature_fallbacks")
     return sig
 
 
 def fetch_vec_list():
-    """Fetch vector list from GitHub"""
-    try:
-        vec_list = requests.get(
-            "https://raw.githubusercontent.com/Belfagor2005/vavoo/main/data.json",
-            timeout=10
-        ).json()
-        set_cache("vec_list", vec_list, 3600)
-        return vec_list
-    except Exception as e:
-        print("Vector list fetch error: " + str(e))
-        return None
+    """Vector list, see VeclistLoader"""
+    return list(veclist_loader.get()) or None
 
 
 def rimuovi_parentesi(text):
@@ -0,0 +1,135 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Plugin logging.
+
+One "vavoo" logger writes to the console and to /tmp/vavoomaker.log, which
+is rotated by size. Every message format gets its own rate limit, so a
+malformed playlist or a missing translation cannot flood a serial console
+or journald. Arguments are only formatted for messages that pass the level
+and the limit; hot loops should also test enabled() once up front, so a
+disabled level costs nothing per item.
+"""
+
+import logging
+from logging.handlers import RotatingFileHandler
+from sys import stdout
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+
+LOG_FILE = "/tmp/vavoomaker.log"
+MAX_BYTES = 256 * 1024
+BACKUPS = 2
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+# records emitted by level since enigma2 started, rate limited ones included
+counts = {}
+
+LEVELS = {
+    "debug": DEBUG,
+    "info": INFO,
+    "warning": WARNING,
+    "error": ERROR,
+}
+
+
+class RateLimitFilter(logging.Filter):
+    """Let at most `burst` records of one message format through per `interval` seconds"""
+
+    def __init__(self, burst=5, interval=60.0):
+        logging.Filter.__init__(self)
+        self.burst = burst
+        self.interval = interval
+        # format string -> [window start, records passed, records suppressed]
+        self.windows = {}
+
+    def filter(self, record):
+        counts[record.levelname] = counts.get(record.levelname, 0) + 1
+        now = monotonic()
+        key = (record.name, record.msg)
+        window = self.windows.get(key)
+        if window is None or now - window[0] >= self.interval:
+            suppressed = window[2] if window is not None else 0
+            self.windows[key] = [now, 1, 0]
+            if suppressed:
+                record.msg = "%s [%d similar suppressed]" % (record.msg, suppressed)
+            return True
+        if window[1] < self.burst:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+
+class _Formatter(logging.Formatter):
+    def format(self, record):
+        text = logging.Formatter.format(self, record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            text += " " + " ".join("%s=%s" % (k, fields[k]) for k in sorted(fields))
+        return text
+
+
+def _setup():
+    logger = logging.getLogger("vavoo")
+    logger.propagate = False
+    if logger.handlers:
+        return logger
+    # on the logger, so each record is counted once whatever the handlers
+    logger.addFilter(RateLimitFilter())
+
+    console = logging.StreamHandler(stdout)
+    console.setFormatter(_Formatter("[vavoo plugin] %(levelname)s %(module)s: %(message)s"))
+    logger.addHandler(console)
+
+    try:
+        logfile = RotatingFileHandler(LOG_FILE, maxBytes=MAX_BYTES, backupCount=BACKUPS)
+        logfile.setFormatter(_Formatter("%(asctime)s %(levelname)s %(module)s.%(funcName)s: %(message)s"))
+        logger.addHandler(logfile)
+    except (IOError, OSError) as error:
+        print("[vavoo plugin] log file not available:", error)
+
+    logger.setLevel(WARNING)
+    return logger
+
+
+log = _setup()
+
+
+def set_level(name):
+    log.setLevel(LEVELS.get(name, WARNING))
+
+
+def enabled(level):
+    return log.isEnabledFor(level)
+
+
+def fields(**values):
+    """Structured key=value pairs for a record: log.info("msg", extra=fields(n=1))"""
+    return {"fields": values}
+
+
+def after_fork():
+    """Fresh handler locks in a forked child, another thread may have held them"""
+    for handler in log.handlers:
+        handler.createLock()
+
+
+def _apply_config():
+    try:
+        from .vavoo_config import cfg
+        cfg.loglevel.addNotifier(lambda element: set_level(element.value), initial_call=True)
+    except Exception as error:
+        log.warning("log level not configurable: %s", error)
+
+
+_apply_config()
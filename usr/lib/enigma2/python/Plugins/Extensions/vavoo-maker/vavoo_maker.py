@@ -0,0 +1,2051 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+#########################################################
+#                                                       #
+#  Vavoo Maker Playlists Plugin                         #
+#  Version: 1.3                                         #
+#  Created by Lululla (https://github.com/Belfagor2005) #
+#  License: CC BY-NC-SA 4.0                             #
+#  https://creativecommons.org/licenses/by-nc-sa/4.0    #
+#  Last Modified: 20251119                              #
+#                                                       #
+#  Credits:                                             #
+#  - Original concept by Lululla                        #
+#  - Special thanks to @Warder for testing              #
+#  - Linuxsat-support.com & Corvoboys communities       #
+#                                                       #
+#  Usage of this code without proper attribution        #
+#  is strictly prohibited.                              #
+#  For modifications and redistribution,                #
+#  please maintain this credit header.                  #
+#########################################################
+"""
+
+__author__ = "Lululla"
+__version__ = "1.3"
+__license__ = "CC BY-NC-SA 4.0"
+__credits__ = ["Linuxsat-support.com", "Corvoboys Forum"]
+__maintainer__ = "Lululla"
+__email__ = "https://github.com/Belfagor2005"
+__status__ = "Production"
+
+# =========================
+# Standard library imports
+# =========================
+import json
+import codecs
+import time
+from hashlib import md5
+from sys import version_info
+from os import (
+    listdir as os_listdir,
+    makedirs as os_makedirs,
+    path as os_path,
+    remove as os_remove,
+    rename as os_rename,
+)
+
+from shutil import copyfile
+from threading import Thread
+
+# =========================
+# Third-party imports
+# =========================
+from requests import exceptions
+from six.moves.urllib.parse import urlparse
+
+# =========================
+# Enigma2 / Plugins imports
+# =========================
+from enigma import eTimer
+from Components.ActionMap import ActionMap, NumberActionMap
+from Components.Label import Label
+from Components.Sources.StaticText import StaticText
+from Components.ConfigList import ConfigListScreen
+from Components.config import (
+    getConfigListEntry,
+    configfile,
+    config,
+    ConfigSubsection
+)
+from Components.MenuList import MenuList
+from Components.ScrollLabel import ScrollLabel
+from Screens.MessageBox import MessageBox
+from Screens.Screen import Screen
+from Tools.Directories import SCOPE_PLUGINS, resolveFilename
+
+# =========================
+# Conditional imports
+# =========================
+if os_path.exists("/usr/bin/apt-get"):
+    from .SelDMList import SelectionList
+    base_class = Screen
+else:
+    from .SelList import SelectionList
+    from Screens.Screen import Screen, ScreenSummary
+    base_class = ScreenSummary
+
+# =========================
+# Local package imports
+# =========================
+from . import (
+    _,
+    group_titles,
+    reload_bouquet,
+    unquote,
+    pickle,
+)
+from .vavoo_lib import (
+    BACKGROUND,
+    INTERACTIVE,
+    dns,
+    governor,
+    sanitizeFilename,
+    getAuthSignature,
+    decodeHtml,
+    rimuovi_parentesi,
+    trace_error
+)
+from .vavoo_config import cfg, choices
+from .SelModel import SelectionModel
+from .vavoo_search import SearchIndex
+from .vavoo_coordinator import STARTED, coordinator
+from .vavoo_stats import format_record, stats
+from .vavoo_log import DEBUG, enabled as log_enabled, log
+from .vavoo_breaker import OPEN, CircuitOpen, breaker, report as breaker_report
+from .vavoo_mirrors import MirrorSet
+from .vavoo_probe import ProbeStore, StreamProber
+from .vavoo_vectors import VectorScores
+from .vavoo_profile import capture, consume as consume_profile, profile_run
+from .vavoo_watchdog import watch, watch_actions, watchdog
+
+
+PLUGIN_PATH = resolveFilename(SCOPE_PLUGINS, "Extensions/{}".format('vavoo-maker'))
+PYTHON_VER = version_info.major
+
+
+def get_screen_width():
+    """Get current screen width"""
+    try:
+        from enigma import getDesktop
+        desktop = getDesktop(0)
+        width = desktop.size().width()
+        log.debug("Screen width detected: %d", width)
+        return width
+    except Exception as e:
+        log.warning("Error getting screen width: %s", e)
+        return 1920  # Default FHD
+
+
+def get_favorite_file():
+    """Get the favorite file path in plugin directory"""
+    favorite_path = os_path.join(PLUGIN_PATH, 'Favorite.txt')
+    # Ensure plugin directory exists and is writable
+    if not os_path.exists(PLUGIN_PATH):
+        try:
+            os_makedirs(PLUGIN_PATH, 0o755)
+        except:
+            pass
+
+    return favorite_path
+
+
+def save_bouquets_to_favorite(enabled_bouquets, view_type):
+    """Save exported bouquets to Favorite.txt file"""
+    favorite_file = get_favorite_file()
+    try:
+        with open(favorite_file, 'w') as f:
+            for bouquet in enabled_bouquets:
+                line = "%s|%s|%d\n" % (bouquet, view_type, int(time.time()))
+                f.write(line)
+        log.info("Saved %d bouquets to Favorite.txt", len(enabled_bouquets))
+    except Exception as e:
+        log.error("Error saving to Favorite.txt: %s", e)
+
+
+def load_bouquets_from_favorite():
+    """Load saved bouquets from Favorite.txt"""
+    favorite_file = get_favorite_file()
+    bouquets = []
+
+    try:
+        if os_path.exists(favorite_file):
+            with open(favorite_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and '|' in line:
+                        parts = line.split('|')
+                        if len(parts) >= 2:
+                            bouquets.append({
+                                'name': parts[0],
+                                'view_type': parts[1],
+                                'timestamp': parts[2] if len(parts) > 2 else '0'
+                            })
+        log.info("Loaded %d bouquets from Favorite.txt", len(bouquets))
+    except Exception as e:
+        log.error("Error loading from Favorite.txt: %s", e)
+
+    return bouquets
+
+
+screen_width = get_screen_width()
+
+
+def channel_id(url):
+    """Channel id from a live2/play/<id>.ts stream url"""
+    cid = url.rsplit("/", 1)[-1]
+    return cid[:-3] if cid.endswith(".ts") else cid
+
+
+def add_bouquet_references(filenames):
+    """Reference bouquet files in bouquets.tv, skipping those already listed"""
+    with stats.stage("write"):
+        _add_bouquet_references(filenames)
+
+
+def _add_bouquet_references(filenames):
+    bouquets_file = "/etc/enigma2/bouquets.tv"
+    listed = ""
+    if os_path.exists(bouquets_file):
+        with open(bouquets_file, "r") as f:
+            listed = f.read()
+
+    for bouquet_filename in filenames:
+        bouquet_entry = '#SERVICE 1:7:1:0:0:0:0:0:0:0:FROM BOUQUET "%s" ORDER BY bouquet\n' % bouquet_filename
+        if bouquet_entry in listed:
+            continue
+        try:
+            with open(bouquets_file, "a") as f:
+                f.write(bouquet_entry)
+            listed += bouquet_entry
+        except Exception as e:
+            log.error("Error updating bouquets.tv: %s", e)
+
+
+def get_probes_file():
+    """Get the stream check results file path in plugin directory"""
+    return os_path.join(PLUGIN_PATH, 'Probes.json')
+
+
+def get_channels_file():
+    """Get the per-channel selection file path in plugin directory"""
+    return os_path.join(PLUGIN_PATH, 'Channels.json')
+
+
+def load_channel_selections():
+    """
+    Load per-group channel selections from Channels.json as
+    {group: SelectionModel}. Groups not listed export every channel.
+    """
+    selections = {}
+    channels_file = get_channels_file()
+    try:
+        if os_path.exists(channels_file):
+            with codecs.open(channels_file, "r", "utf-8") as f:
+                for group, text in json.load(f).items():
+                    selections[group] = SelectionModel.loads(text, inverted=True)
+    except Exception as e:
+        log.error("Error loading Channels.json: %s", e)
+    return selections
+
+
+def save_channel_selections(selections):
+    """Save per-group channel selections, dropping groups left at the default"""
+    data = {}
+    for group, model in selections.items():
+        if model.keys or not model.inverted:
+            data[group] = model.dumps()
+    try:
+        with codecs.open(get_channels_file(), "w", "utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    except Exception as e:
+        log.error("Error saving Channels.json: %s", e)
+
+
+class vavoo_maker_config(Screen, ConfigListScreen):
+    if screen_width >= 1920:
+        if os_path.exists("/usr/bin/apt-get"):
+            skin = '''
+            <screen name="vavoo_maker_config" position="center,center" size="1920,1080" title="SetupMaker" backgroundColor="transparent" flags="wfNoBorder">
+                <eLabel backgroundColor="#002d3d5b" cornerRadius="20" position="19,22" size="1255,711" zPosition="-99" />
+                <eLabel name="" position="31,30" size="1220,683" zPosition="-90" cornerRadius="18" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                <!-- /* time -->
+                <eLabel name="" position="30,34" size="700,52" backgroundColor="#00171a1c" halign="center" valign="center" transparent="0" font="Regular; 36" zPosition="1" text="VAVOO MAKER BY LULULLA" foregroundColor="#007fcfff" />
+                <widget backgroundColor="#00171a1c" font="Regular;34" halign="right" position="1107,40" render="Label" shadowColor="#00000000" shadowOffset="-2,-2" size="120,40" source="global.CurrentTime" transparent="1" zPosition="3">
+                    <convert type="ClockToText">Default</convert>
+                </widget>
+                <widget backgroundColor="#00171a1c" font="Regular;34" halign="right" position="731,38" render="Label" shadowColor="#00000000" shadowOffset="-2,-2" size="400,40" source="global.CurrentTime" transparent="1" zPosition="3">
+                    <convert type="ClockToText">Date</convert>
+                </widget>
+                <widget name="version" position="1136,327" size="100,30" zPosition="1" backgroundColor="#30000000" transparent="1" font="Regular; 20" halign="center" foregroundColor="#ffffff" />
+                <widget name="statusbar" position="44,649" size="830,40" font="Regular; 24" foregroundColor="yellow" backgroundColor="#101010" transparent="1" zPosition="3" />
+                <eLabel name="" position="22,30" size="1244,690" zPosition="-90" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                <eLabel backgroundColor="#001a2336" position="34,90" size="1220,3" zPosition="10" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_red.png" position="619,386" size="30,30" alphatest="blend" transparent="1" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_green.png" position="619,434" size="30,30" alphatest="blend" transparent="1" />
+                <widget backgroundColor="#9f1313" font="Regular;30" halign="left" position="660,380" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_red" transparent="1" valign="center" zPosition="3" />
+                <widget backgroundColor="#1f771f" font="Regular;30" halign="left" position="660,430" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_green" transparent="1" valign="center" zPosition="3" />
+                <widget name="config" position="40,100" size="550,524" itemHeight="35" enableWrapAround="1" transparent="0" zPosition="9" scrollbarMode="showOnDemand" />
+                <widget name="description" position="621,599" size="635,81" font="Regular; 32" halign="center" foregroundColor="#00ffffff" transparent="1" zPosition="3" />
+                <eLabel backgroundColor="#00fffffe" position="35,695" size="1200,3" zPosition="10" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/log.png" position="616,109" size="512,256" zPosition="5" />
+                <widget source="session.CurrentService" render="Label" position="915,561" size="350,34" font="Regular;26" borderWidth="1" backgroundColor="background" transparent="1" halign="center" foregroundColor="white" zPosition="30" valign="center" noWrap="1">
+                    <convert type="ServiceName">Name</convert>
+                </widget>
+                <widget source="session.VideoPicture" render="Pig" position="936,375" zPosition="20" size="300,180" backgroundColor="transparent" transparent="0" cornerRadius="14" />
+            </screen>'''
+
+        else:
+            skin = '''
+                <screen name="vavoo_maker_config" position="center,center" size="1920,1080" title="Setup Vavoo Maker" backgroundColor="transparent" flags="wfNoBorder" zPosition="-10">
+                    <eLabel backgroundColor="#002d3d5b" cornerRadius="20" position="19,22" size="1255,711" zPosition="-99" />
+                    <eLabel name="" position="31,30" size="1220,683" zPosition="-90" cornerRadius="18" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                    <!-- /* time -->
+                    <eLabel name="" position="30,34" size="700,52" backgroundColor="#00171a1c" halign="center" valign="center" transparent="0" font="Regular; 36" zPosition="1" text="VAVOO MAKER BY LULULLA" foregroundColor="#007fcfff" />
+                    <widget backgroundColor="#00171a1c" font="Regular;34" halign="right" position="1107,40" render="Label" shadowColor="#00000000" shadowOffset="-2,-2" size="120,40" source="global.CurrentTime" transparent="1" zPosition="3">
+                        <convert type="ClockToText">Default</convert>
+                    </widget>
+                    <widget backgroundColor="#00171a1c" font="Regular;34" halign="right" position="731,38" render="Label" shadowColor="#00000000" shadowOffset="-2,-2" size="400,40" source="global.CurrentTime" transparent="1" zPosition="3">
+                        <convert type="ClockToText">Date</convert>
+                    </widget>
+                    <widget name="version" position="973,180" size="100,30" zPosition="9" backgroundColor="#30000000" transparent="1" font="Regular; 20" halign="center" foregroundColor="#ffffff" />
+                    <widget name="statusbar" position="44,644" size="830,40" font="Regular; 24" foregroundColor="yellow" backgroundColor="#101010" transparent="1" zPosition="3" />
+                    <eLabel name="" position="22,30" size="1244,690" zPosition="-90" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                    <eLabel backgroundColor="#001a2336" position="34,90" size="1220,3" zPosition="10" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_red.png" position="643,466" size="30,30" alphatest="blend" transparent="1" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_green.png" position="644,512" size="30,30" alphatest="blend" transparent="1" />
+                    <widget backgroundColor="#9f1313" font="Regular;30" halign="left" position="676,461" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_red" transparent="1" valign="center" zPosition="3" />
+                    <widget backgroundColor="#1f771f" font="Regular;30" halign="left" position="676,506" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_green" transparent="1" valign="center" zPosition="3" />
+                    <widget name="config" position="30,100" size="606,524" itemHeight="32" font="Regular;34" enableWrapAround="1" transparent="0" zPosition="9" scrollbarMode="showOnDemand" />
+                    <widget name="description" position="621,599" size="635,81" font="Regular; 32" halign="center" foregroundColor="#00ffffff" transparent="1" zPosition="3" />
+                    <eLabel backgroundColor="#00fffffe" position="35,695" size="1200,3" zPosition="10" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/log.png" position="732,100" size="512,256" zPosition="5" />
+                    <widget source="session.CurrentService" render="Label" position="915,561" size="350,34" font="Regular;26" borderWidth="1" backgroundColor="background" transparent="1" halign="center" foregroundColor="white" zPosition="30" valign="center" noWrap="1">
+                        <convert type="ServiceName">Name</convert>
+                    </widget>
+                    <widget source="session.VideoPicture" render="Pig" position="936,375" zPosition="20" size="300,180" backgroundColor="transparent" transparent="0" cornerRadius="14" />
+                </screen>'''
+    else:
+        if os_path.exists("/usr/bin/apt-get"):
+            skin = '''
+                <screen name="vavoo_maker_config" position="center,center" size="1280,720" title="Setup Vavoo Maker" backgroundColor="transparent" flags="wfNoBorder" zPosition="-10">
+                    <eLabel backgroundColor="#002d3d5b" cornerRadius="20" position="0,0" size="1280,720" zPosition="-99" />
+                    <eLabel name="" position="11,10" size="1260,700" zPosition="-90" cornerRadius="18" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                    <!-- /* time -->
+                    <eLabel name="" position="30,24" size="700,52" backgroundColor="#00171a1c" halign="center" valign="center" transparent="0" font="Regular; 36" zPosition="1" text="VAVOO MAKER BY LULULLA" foregroundColor="#007fcfff" />
+                    <widget backgroundColor="#00171a1c" font="Regular;34" halign="right" position="1107,40" render="Label" shadowColor="#00000000" shadowOffset="-2,-2" size="120,40" source="global.CurrentTime" transparent="1" zPosition="3">
+                        <convert type="ClockToText">Default</convert>
+                    </widget>
+                    <widget backgroundColor="#00171a1c" font="Regular;34" halign="right" position="731,38" render="Label" shadowColor="#00000000" shadowOffset="-2,-2" size="400,40" source="global.CurrentTime" transparent="1" zPosition="3">
+                        <convert type="ClockToText">Date</convert>
+                    </widget>
+                    <widget name="version" position="1075,157" size="100,30" zPosition="9" backgroundColor="#30000000" transparent="1" font="Regular; 20" halign="center" foregroundColor="#ffffff" />
+                    <widget name="statusbar" position="34,644" size="830,40" font="Regular; 24" foregroundColor="yellow" backgroundColor="#101010" transparent="1" zPosition="3" />
+                    <eLabel name="" position="22,20" size="1244,670" zPosition="-90" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                    <eLabel backgroundColor="#001a2336" position="34,90" size="1220,3" zPosition="10" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_red.png" position="643,466" size="30,30" alphatest="blend" transparent="1" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_green.png" position="644,512" size="30,30" alphatest="blend" transparent="1" />
+                    <widget backgroundColor="#9f1313" font="Regular; 26" halign="left" position="676,461" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_red" transparent="1" valign="center" zPosition="3" />
+                    <widget backgroundColor="#1f771f" font="Regular; 26" halign="left" position="676,506" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_green" transparent="1" valign="center" zPosition="3" />
+                    <widget name="config" position="30,100" size="606,524" itemHeight="32" enableWrapAround="1" transparent="0" zPosition="9" scrollbarMode="showOnDemand" />
+                    <widget name="description" position="621,599" size="635,81" font="Regular; 28" halign="center" foregroundColor="#00ffffff" transparent="1" zPosition="3" />
+                    <eLabel backgroundColor="#00fffffe" position="35,695" size="1200,3" zPosition="10" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/log.png" position="732,100" size="512,256" zPosition="5" />
+                    <widget source="session.CurrentService" render="Label" position="915,561" size="350,34" font="Regular;26" borderWidth="1" backgroundColor="background" transparent="1" halign="center" foregroundColor="white" zPosition="30" valign="center" noWrap="1">
+                        <convert type="ServiceName">Name</convert>
+                    </widget>
+                    <widget source="session.VideoPicture" render="Pig" position="936,375" zPosition="20" size="300,180" backgroundColor="transparent" transparent="0" cornerRadius="14" />
+                </screen>'''
+        else:
+            skin = '''
+                <screen name="vavoo_maker_config" position="center,center" size="1280,720" title="Setup Vavoo Maker" backgroundColor="transparent" flags="wfNoBorder" zPosition="-10">
+                    <eLabel backgroundColor="#002d3d5b" cornerRadius="20" position="0,0" size="1280,720" zPosition="-99" />
+                    <eLabel name="" position="11,10" size="1260,700" zPosition="-90" cornerRadius="18" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                    <!-- /* time -->
+                    <eLabel name="" position="30,24" size="700,52" backgroundColor="#00171a1c" halign="center" valign="center" transparent="0" font="Regular; 36" zPosition="1" text="VAVOO MAKER BY LULULLA" foregroundColor="#007fcfff" />
+                    <widget backgroundColor="#00171a1c" font="Regular;34" halign="right" position="1107,40" render="Label" shadowColor="#00000000" shadowOffset="-2,-2" size="120,40" source="global.CurrentTime" transparent="1" zPosition="3">
+                        <convert type="ClockToText">Default</convert>
+                    </widget>
+                    <widget backgroundColor="#00171a1c" font="Regular;34" halign="right" position="731,38" render="Label" shadowColor="#00000000" shadowOffset="-2,-2" size="400,40" source="global.CurrentTime" transparent="1" zPosition="3">
+                        <convert type="ClockToText">Date</convert>
+                    </widget>
+                    <widget name="version" position="1075,157" size="100,30" zPosition="9" backgroundColor="#30000000" transparent="1" font="Regular; 20" halign="center" foregroundColor="#ffffff" />
+                    <widget name="statusbar" position="34,644" size="830,40" font="Regular; 24" foregroundColor="yellow" backgroundColor="#101010" transparent="1" zPosition="3" />
+                    <eLabel name="" position="22,20" size="1244,670" zPosition="-90" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                    <eLabel backgroundColor="#001a2336" position="34,90" size="1220,3" zPosition="10" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_red.png" position="643,466" size="30,30" alphatest="blend" transparent="1" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_green.png" position="644,512" size="30,30" alphatest="blend" transparent="1" />
+                    <widget backgroundColor="#9f1313" font="Regular; 26" halign="left" position="676,461" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_red" transparent="1" valign="center" zPosition="3" />
+                    <widget backgroundColor="#1f771f" font="Regular; 26" halign="left" position="676,506" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_green" transparent="1" valign="center" zPosition="3" />
+                    <widget name="config" position="30,100" size="606,524" itemHeight="32" font="Regular;34" enableWrapAround="1" transparent="0" zPosition="9" scrollbarMode="showOnDemand" />
+                    <widget name="description" position="621,599" size="635,81" font="Regular; 28" halign="center" foregroundColor="#00ffffff" transparent="1" zPosition="3" />
+                    <eLabel backgroundColor="#00fffffe" position="35,695" size="1200,3" zPosition="10" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/log.png" position="732,100" size="512,256" zPosition="5" />
+                    <widget source="session.CurrentService" render="Label" position="915,561" size="350,34" font="Regular;26" borderWidth="1" backgroundColor="background" transparent="1" halign="center" foregroundColor="white" zPosition="30" valign="center" noWrap="1">
+                        <convert type="ServiceName">Name</convert>
+                    </widget>
+                    <widget source="session.VideoPicture" render="Pig" position="936,375" zPosition="20" size="300,180" backgroundColor="transparent" transparent="0" cornerRadius="14" />
+                </screen>'''
+
+    def __init__(self, session):
+        Screen.__init__(self, session)
+        self.session = session
+        self.setup_title = ('Vavoo Maker Config')
+        self.list = []
+        self.onChangedEntry = []
+        self["version"] = Label()
+        self['statusbar'] = Label()
+        self["description"] = Label("")
+        self["red"] = Label(_("Back"))
+        self["green"] = Label(_("Save"))
+        self['actions'] = ActionMap(['OkCancelActions', 'ColorActions', 'DirectionActions'], watch_actions("vavoo_maker_config", {
+            "cancel": self.extnok,
+            "left": self.keyLeft,
+            "right": self.keyRight,
+            "up": self.keyUp,
+            "down": self.keyDown,
+            "red": self.extnok,
+            "green": self.save,
+            "ok": self.keyOK,
+        }), -1)
+        self.update_status()
+        startClock(self, "vavoo_maker_config.update_status", self.update_status)
+        ConfigListScreen.__init__(
+            self,
+            self.list,
+            session=self.session,
+            on_change=self.changedEntry)
+        self.createSetup()
+        self.showhide()
+        self.onLayoutFinish.append(self.layoutFinished)
+
+    def layoutFinished(self):
+        self.setTitle(self.setup_title)
+        self['version'].setText('V.' + __version__)
+
+    def keyOK(self):
+        pass
+
+    def update_status(self):
+        if cfg.autobouquetupdate:
+            status = _("Last channel update: %s") % cfg.last_update.value
+            if cfg.timetype.value == "adaptive":
+                from .vavoo_scheduler import RefreshScheduler
+                status += " - " + _("Learned interval: %d min - refreshes avoided: %d") % (
+                    RefreshScheduler().adaptive_interval(),
+                    cfg.refreshes_avoided.value)
+            running = coordinator.describe()
+            if running:
+                status += " - " + running
+            self['statusbar'].setText(status)
+
+    def createSetup(self):
+        self.list = []
+        indent = "- "
+        self.list.append(
+            getConfigListEntry(
+                _("Scheduled Bouquet Update:"),
+                cfg.autobouquetupdate,  # USA cfg.
+                _("Active Automatic Bouquet Update")))
+
+        if cfg.autobouquetupdate.value is True:  # USA cfg.
+            self.list.append(
+                getConfigListEntry(
+                    indent + _("Schedule type:"),
+                    cfg.timetype,  # USA cfg.
+                    _("At an interval of hours or at a fixed time")))
+            if cfg.timetype.value == "interval":  # USA cfg.
+                self.list.append(
+                    getConfigListEntry(
+                        2 * indent + _("Update interval (minutes):"),
+                        cfg.updateinterval,  # USA cfg.
+                        _("Configure every interval of minutes from now")))
+            if cfg.timetype.value == "fixed time":  # USA cfg.
+                self.list.append(
+                    getConfigListEntry(
+                        2 * indent + _("Time to start update:"),
+                        cfg.fixedtime,  # USA cfg.
+                        _("Configure at a fixed time")))
+                self.list.append(
+                    getConfigListEntry(
+                        2 * indent + _("Prepare in advance (minutes):"),
+                        cfg.prewarm,
+                        _("Download the channel list and signature this long before the fixed time (0 = off)")))
+            if cfg.timetype.value == "adaptive":
+                self.list.append(
+                    getConfigListEntry(
+                        2 * indent + _("Base interval (minutes):"),
+                        cfg.updateinterval,
+                        _("Starting interval, also the reference for the refreshes avoided")))
+                self.list.append(
+                    getConfigListEntry(
+                        2 * indent + _("Shortest interval (minutes):"),
+                        cfg.adaptive_min,
+                        _("Refresh at most this often when the channel list keeps changing")))
+                self.list.append(
+                    getConfigListEntry(
+                        2 * indent + _("Longest interval (minutes):"),
+                        cfg.adaptive_max,
+                        _("Refresh at least this often when the channel list does not change")))
+            self.list.append(
+                getConfigListEntry(
+                    indent + _("Random delay (seconds):"),
+                    cfg.jitter,
+                    _("Spread updates so many receivers do not hit the server at once")))
+            self.list.append(
+                getConfigListEntry(
+                    indent + _("Update in background process:"),
+                    cfg.worker,
+                    _("Run scheduled updates in a low priority process so playback is not disturbed")))
+            if cfg.worker.value is True:
+                self.list.append(
+                    getConfigListEntry(
+                        2 * indent + _("Memory limit (MB):"),
+                        cfg.worker_memory,
+                        _("Extra memory the background process may use")))
+            self.list.append(
+                getConfigListEntry(
+                    indent + _("Offline channels:"),
+                    cfg.probe,
+                    _("Check every stream during scheduled updates and mark or remove the ones not playing")))
+            if cfg.probe.value != "off":
+                self.list.append(
+                    getConfigListEntry(
+                        2 * indent + _("Parallel checks:"),
+                        cfg.probe_workers,
+                        _("Streams checked at the same time")))
+                self.list.append(
+                    getConfigListEntry(
+                        2 * indent + _("Check time limit (seconds):"),
+                        cfg.probe_deadline,
+                        _("Channels not checked within this time are kept as they are")))
+
+        self.list.append(
+            getConfigListEntry(
+                _("Channel list mirrors:"),
+                cfg.playlist_mirrors,
+                _("Channel list urls separated by spaces, the fastest one that answers is used")))
+        self.list.append(
+            getConfigListEntry(
+                indent + _("Retry slow downloads early:"),
+                cfg.hedge,
+                _("Send a second request when the channel list takes longer than usual, the faster one is used")))
+        self.list.append(
+            getConfigListEntry(
+                _("Parallel IPv4/IPv6 lookups:"),
+                cfg.dns_parallel,
+                _("Resolve both address types at once, faster on slow name servers")))
+        self.list.append(
+            getConfigListEntry(
+                _("Stream mirrors:"),
+                cfg.stream_mirrors,
+                _("Stream base urls separated by spaces, bouquets use the fastest one that answers")))
+        self.list.append(
+            getConfigListEntry(
+                _("Profile next run:"),
+                cfg.profile,
+                _("Write a timing and memory report of the next bouquet run to /tmp (also: touch /tmp/vavoo_profile)")))
+        self.list.append(
+            getConfigListEntry(
+                _("Metrics endpoint:"),
+                cfg.metrics,
+                _("Serve refresh metrics at http://<box>:<port>/metrics for monitoring")))
+        if cfg.metrics.value is True:
+            self.list.append(
+                getConfigListEntry(
+                    indent + _("Port:"),
+                    cfg.metrics_port,
+                    _("TCP port of the metrics endpoint")))
+            self.list.append(
+                getConfigListEntry(
+                    indent + _("Reachable from the LAN:"),
+                    cfg.metrics_lan,
+                    _("Off: only this receiver can read the metrics")))
+        self.list.append(
+            getConfigListEntry(
+                _("Stall warning (ms):"),
+                cfg.stall_ms,
+                _("Log the stack of plugin actions that block the receiver longer than this")))
+        self.list.append(
+            getConfigListEntry(
+                _("Log level:"),
+                cfg.loglevel,
+                _("Messages written to the console and /tmp/vavoomaker.log")))
+
+        self["config"].list = self.list
+        self["config"].l.setList(self.list)
+        self.setInfo()
+
+    def setInfo(self):
+        try:
+            sel = self['config'].getCurrent()[2]
+            if sel:
+                self['description'].setText(str(sel))
+            else:
+                self['description'].setText(_('SELECT YOUR CHOICE'))
+            return
+        except Exception:
+            trace_error()
+
+    def changedEntry(self):
+        self.item = self["config"].getCurrent()
+        for x in self.onChangedEntry:
+            x()
+        # self['green'].instance.setText(
+            # _('Save') if self['config'].isChanged() else '- - - -')
+
+    def getCurrentEntry(self):
+        return self["config"].getCurrent()[0]
+
+    def showhide(self):
+        pass
+
+    def getCurrentValue(self):
+        return str(self["config"].getCurrent()[1].getText())
+
+    def createSummary(self):
+        from Screens.Setup import SetupSummary
+        return SetupSummary
+
+    def keyLeft(self):
+        ConfigListScreen.keyLeft(self)
+        # sel = self["config"].getCurrent()[1]  # Keep for future debug
+        self.createSetup()
+        self.showhide()
+
+    def keyRight(self):
+        ConfigListScreen.keyRight(self)
+        # sel = self["config"].getCurrent()[1]  # Keep for future debug
+        self.createSetup()
+        self.showhide()
+
+    def keyDown(self):
+        self['config'].instance.moveSelection(self['config'].instance.moveDown)
+        self.createSetup()
+        self.showhide()
+
+    def keyUp(self):
+        self['config'].instance.moveSelection(self['config'].instance.moveUp)
+        self.createSetup()
+        self.showhide()
+
+    def save(self):
+        if self["config"].isChanged():
+            for x in self["config"].list:
+                x[1].save()
+
+            configfile.save()
+
+            try:
+                config.loadFromFile(configfile.CONFIG_FILE)
+            except:
+                pass
+
+            # RESTART timer
+            from .plugin import restart_auto_start_timer
+            restart_auto_start_timer(self.session)
+            from .vavoo_metrics import apply_config
+            apply_config()
+
+            self.session.open(
+                MessageBox,
+                _("Configuration saved successfully!"),
+                MessageBox.TYPE_INFO,
+                timeout=5
+            )
+
+            self.close()
+
+    def _safe_config_reload(self):
+        """Safe configuration reload"""
+        try:
+            if not hasattr(config.plugins, 'vavoomaker'):
+                config.plugins.vavoomaker = ConfigSubsection()
+                log.info("Recreated vavoo config section")
+
+            config.loadFromFile(configfile.CONFIG_FILE)
+        except Exception as e:
+            log.error("Safe config reload failed: %s", e)
+
+    def extnok(self, answer=None):
+        if answer is None:
+            if self['config'].isChanged():
+                self.session.openWithCallback(
+                    self.extnok, MessageBox, _("Really close without saving settings?"))
+            else:
+                self.close()
+        elif answer:
+            for x in self["config"].list:
+                x[1].cancel()
+            self.close()
+        else:
+            return
+
+
+# signatures are cached for an hour by vavoo_lib as well
+SIGNATURE_MAX_AGE = 3600
+TEMP_DIR = "/tmp/vavoo"
+
+
+class vavooFetcher():
+    def __init__(self, view_type=None, temp_dir=None):
+        # view type fixed at creation, so background runs do not depend on the UI state
+        self.current = view_type or config.plugins.vavoomaker.current.value
+
+        # a refresh child downloads into its own directory, the screens into TEMP_DIR
+        self.tempDir = temp_dir or TEMP_DIR
+        for path in (self.tempDir, TEMP_DIR):
+            if not os_path.exists(path):
+                os_makedirs(path)
+
+        # the parsed playlists are shared by every fetcher
+        self.cachefile = os_path.join(TEMP_DIR, "vavoo.cache")
+        self.playlists = {
+            "country": "https://vavoo.to/channels",
+            "countries": "https://vavoo.to/channels",
+            "categories": "https://vavoo.to/channels"
+        }
+        self.bouquetFilename = "userbouquet.vavoo.%s.tv"
+        self.bouquetName = _("vavoo")
+        self.playlists_processed = {key: {} for key in self.playlists.keys()}
+        self.cache_updated = False
+        # signature fetched in a thread while the playlist loads, see startSignature()
+        self.signature = None
+        self.signed = 0
+        self.signing = None
+        self.group_index = SearchIndex()
+        self.channel_index = SearchIndex()
+        if os_path.exists(self.cachefile):
+            try:
+                mtime = os_path.getmtime(self.cachefile)
+                if mtime < time.time() - 86400:  # if file is older than one day delete it
+                    os_remove(self.cachefile)
+                else:
+                    with open(self.cachefile, 'rb') as cache_input:
+                        if PYTHON_VER == 3:
+                            self.playlists_processed = pickle.load(cache_input, encoding='bytes')
+                        else:
+                            self.playlists_processed = pickle.load(cache_input)
+            except Exception as e:
+                log.warning("failed to open cache file: %s", e)
+
+    def downloadPage(self):
+        # fastest healthy mirror first, the next one when it fails
+        mirrors = MirrorSet("playlist")
+        mirrors.measure()
+        target = os_path.join(self.tempDir, self.current)
+        for link in mirrors.ranked():
+            try:
+                with stats.stage("download"):
+                    answered, content, first_byte, seconds = breaker(urlparse(link).netloc).call(mirrors.download, link)
+                    with open(target, "wb") as f:
+                        f.write(content)
+                stats.count("bytes_downloaded", len(content))
+                mirrors.succeeded(answered, first_byte=first_byte, size=len(content), seconds=seconds)
+                self.saveSnapshot(content)
+                break
+            except CircuitOpen as error:
+                log.info("%s", error)
+            except exceptions.RequestException as error:
+                stats.count("download_errors")
+                log.error("failed to download %s: %s", link, error)
+                mirrors.failed(link)
+        else:
+            if not os_path.exists(target) and os_path.exists(self.snapshotFile()):
+                log.warning("channel list not available, using the last good copy")
+                stats.count("playlist_fallbacks")
+                copyfile(self.snapshotFile(), target)
+        mirrors.save()
+
+    def snapshotFile(self):
+        """Last channel list downloaded, kept across reboots for outages"""
+        return os_path.join(PLUGIN_PATH, "snapshot.%s.json" % self.current)
+
+    def saveSnapshot(self, content):
+        path = self.snapshotFile()
+        try:
+            # flash storage: only written when the list changed
+            if os_path.exists(path) and os_path.getsize(path) == len(content):
+                with open(path, "rb") as f:
+                    if f.read() == content:
+                        return
+            with open(path + ".new", "wb") as f:
+                f.write(content)
+            os_rename(path + ".new", path)
+        except (IOError, OSError) as error:
+            log.warning("channel list snapshot not saved: %s", error)
+
+    def startSignature(self):
+        """
+        Fetch a signature in a thread, it does not depend on the playlist.
+        Only the create and refresh paths start it: browsing the lists in
+        SetupMaker must not cost ping2 requests.
+        """
+        if self.signing is not None or (self.signature and time.time() - self.signed < SIGNATURE_MAX_AGE):
+            return
+        run = stats.current()
+        priority = governor.current()
+
+        def sign():
+            stats.attach(run)
+            try:
+                with governor.priority(priority):
+                    self.signature = getAuthSignature()
+                self.signed = time.time()
+            except Exception as e:
+                log.error("signature failed: %s", e)
+
+        self.signing = Thread(target=sign, name="vavoo-signature")
+        self.signing.daemon = True
+        self.signing.start()
+
+    def waitSignature(self):
+        """Signature from startSignature(), fetched now when there is none or it is too old"""
+        if self.signing is not None:
+            with stats.stage("signature wait"):
+                self.signing.join()
+            self.signing = None
+        if not self.signature or time.time() - self.signed >= SIGNATURE_MAX_AGE:
+            self.signature = getAuthSignature()
+            self.signed = time.time()
+        return self.signature
+
+    def getPlaylist(self):
+        current = self.playlists_processed.get(self.current, {})
+        if not current:
+            stats.count("playlist_downloads")
+            self.downloadPage()
+        else:
+            stats.count("playlist_cache_hits")
+
+        known_urls = []
+        json_data = os_path.join(self.tempDir, self.current)
+
+        try:
+            if os_path.exists(json_data):
+                with stats.stage("parse"):
+                    with codecs.open(json_data, "r", "utf-8") as f:
+                        playlist = json.load(f)
+            else:
+                log.warning("File JSON not found: %s", json_data)
+                return
+
+        except Exception as e:
+            log.error("Error on parsing JSON: %s", e)
+            playlist = []
+
+        if isinstance(playlist, dict):
+            playlist = [playlist]
+
+        duplicates = skipped = 0
+        # tested once, the loop below runs for every channel
+        debug = log_enabled(DEBUG)
+        with stats.stage("normalise"):
+            for entry in playlist:
+                if not isinstance(entry, dict):
+                    skipped += 1
+                    if debug:
+                        log.debug("no valid format: %r", entry)
+                    continue
+
+                country = unquote(entry.get("country", "")).strip("\r\n")
+                name = unquote(entry.get("name", "")).strip("\r\n")
+                name = decodeHtml(name)
+                name = rimuovi_parentesi(name)
+                ids = str(entry.get("id", "")).replace(":", "").replace(" ", "").replace(",", "")
+
+                if not country or not name or not ids:
+                    skipped += 1
+                    if debug:
+                        log.debug("Missing data in entry: %r", entry)
+                    continue
+
+                url = "https://vavoo.to/live2/play/" + ids + ".ts"
+
+                if url not in known_urls:
+                    if country not in current:
+                        current[country] = []
+                    current[country].append((name, url))
+                    known_urls.append(url)
+                else:
+                    duplicates += 1
+        stats.count("entries_parsed", len(playlist))
+        stats.count("duplicates_dropped", duplicates)
+        stats.count("entries_skipped", skipped)
+        if skipped:
+            log.info("%d playlist entries skipped", skipped)
+
+        self.cache_updated = True
+
+    def prepare(self):
+        """Download and parse the playlist and fetch a signature, leaving only the rendering"""
+        # signing overlaps the download and parse
+        self.startSignature()
+        self.getPlaylist()
+        self.waitSignature()
+        return self
+
+    def playlistDigest(self, enabled):
+        """Digest of the channels of the enabled groups, used to detect upstream changes"""
+        current = self.playlists_processed.get(self.current, {})
+        digest = md5()
+        for group in sorted(enabled):
+            for name, url in sorted(current.get(group, ())):
+                digest.update(("%s|%s|%s\n" % (group, name, url)).encode("utf-8"))
+        return digest.hexdigest()
+
+    def buildSearchIndex(self):
+        """Index group and channel names of the current playlist for type-ahead search"""
+        self.group_index = SearchIndex()
+        self.channel_index = SearchIndex()
+        current = self.playlists_processed.get(self.current, {})
+        for group, channels in current.items():
+            self.group_index.add(group, group, group_titles.get(group, group))
+            for name, url in channels:
+                self.channel_index.add((group, channel_id(url)), name)
+        self.group_index.prepare()
+        self.channel_index.prepare()
+
+    def searchGroups(self, query):
+        """Groups whose name, or one of whose channels, matches query"""
+        groups = set(self.group_index.search(query))
+        groups.update(group for group, cid in self.channel_index.search(query))
+        return groups
+
+    def searchChannels(self, group, query):
+        """Channel ids of group matching query"""
+        return [cid for g, cid in self.channel_index.search(query) if g == group]
+
+    def createBouquet(self, enabled):
+        add_bouquet_references(self.renderBouquets(enabled))
+        reload_bouquet()
+
+    def probeChannels(self, urls, app):
+        """
+        {url: alive} for the stream urls, from the probe store where it is
+        recent enough and otherwise checked within cfg.probe_deadline.
+        """
+        # the part after '#' holds the enigma2 http headers
+        query, headers = app.split("#", 1)
+        headers = dict([headers.split("=", 1)])
+        store = ProbeStore(get_probes_file())
+        now = time.time()
+        alive = {}
+        targets = {}
+        for url in urls:
+            known = store.lookup(channel_id(url), now)
+            if known is None:
+                targets[url.strip() + query] = url
+            else:
+                alive[url] = known
+        # no verdicts while a stream host is known to be down
+        down = set(name for name, state, failures in breaker_report() if state == OPEN)
+        skipped = [target for target in targets if urlparse(target).netloc in down]
+        if skipped:
+            log.warning("stream host unavailable, %d streams not probed", len(skipped))
+            for target in skipped:
+                del targets[target]
+        prober = StreamProber(
+            workers=int(cfg.probe_workers.value),
+            deadline=int(cfg.probe_deadline.value),
+            headers=headers)
+        with stats.stage("probe"):
+            results = prober.run(list(targets)) if targets else {}
+        if results and not any(ok for ok, latency in results.values()):
+            # not one stream answered: upstream or the network is down, not every channel
+            log.warning("no stream of %d answered the probe, results discarded", len(results))
+            results = {}
+        for target, (ok, latency) in results.items():
+            if ok is None:
+                continue
+            url = targets[target]
+            alive[url] = ok
+            store.record(channel_id(url), ok, latency, now)
+        store.save(now)
+        dead = list(alive.values()).count(False)
+        stats.count("probe_cache_hits", store.hits)
+        stats.count("probe_cache_misses", store.misses)
+        stats.count("streams_probed", len(results))
+        stats.count("streams_dead", dead)
+        log.info("%d streams known, %d checked of %d due, %d offline", store.hits, len(results), store.misses, dead)
+        return alive
+
+    def renderBouquets(self, enabled, target_dir="/etc/enigma2", probe=False):
+        """
+        Write the bouquet files of the enabled groups into target_dir, return
+        their file names. With probe the streams are checked first and offline
+        channels marked or left out, as set in cfg.probe.
+        """
+        sig = self.waitSignature()
+        app = '?n=1&b=5&vavoo_auth=%s#User-Agent=VAVOO/2.6' % (str(sig))
+        current = self.playlists_processed[self.current]
+        channel_selections = load_channel_selections()
+        written = []
+
+        # the playlist keeps vavoo.to urls, bouquets point at the fastest stream mirror
+        mirrors = MirrorSet("stream")
+        mirrors.measure()
+        stream_base = mirrors.best()
+
+        groups = []
+        with stats.stage("render"):
+            for country in sorted([k for k in current.keys() if k in enabled], key=lambda x: group_titles.get(x, x).lower()):
+                channels = current[country]
+                selection = channel_selections.get(country)
+                if selection is not None:
+                    channels = [x for x in channels if selection.isSelected(channel_id(x[1]))]
+                # groups with every channel deselected get no bouquet
+                if channels:
+                    groups.append((country, sorted((name, stream_base + channel_id(url) + ".ts") for name, url in channels)))
+
+        alive = {}
+        if probe and cfg.probe.value != "off":
+            alive = self.probeChannels([url for country, channels in groups for name, url in channels], app)
+
+        for country, channels in groups:
+            bouquet_list = []
+            with stats.stage("render"):
+                for channelname, url in channels:
+                    if alive.get(url) is False:
+                        if cfg.probe.value == "drop":
+                            continue
+                        channelname = _("%s (offline)") % channelname
+                    clean_url = url.strip() + str(app)
+                    encoded_url = clean_url.replace(":", "%3a")
+                    bouquet_list.append("#SERVICE 4097:0:1:1:1:1:CCCC0000:0:0:0:%s:%s" % (encoded_url, channelname))
+
+            if not bouquet_list:
+                # every channel of the group is offline
+                continue
+            bouquet_list.insert(0, "#NAME %s" % group_titles.get(country, country))
+
+            bouquet_filename = "userbouquet.vavoo.%s.tv" % sanitizeFilename(country).replace(" ", "_").strip().lower()
+            bouquet_path = os_path.join(target_dir, bouquet_filename)
+
+            try:
+                content = "\n".join(bouquet_list)
+                with stats.stage("write"):
+                    with open(bouquet_path, "w") as f:
+                        if not PYTHON_VER == 3:
+                            f.write(content.encode('utf-8'))
+                        else:
+                            f.write(content)
+            except Exception as e:
+                log.error("Error writing bouquet: %s", e)
+                continue
+            written.append(bouquet_filename)
+            stats.count("bouquets_written")
+            stats.count("channels_written", len(bouquet_list) - 1)
+            stats.gauge("bouquet_channels", bouquet_filename, len(bouquet_list) - 1)
+
+        return written
+
+    def removeBouquetReference(self, bouquet_filename):
+        bouquets_file = "/etc/enigma2/bouquets.tv"
+
+        if os_path.exists(bouquets_file):
+            try:
+                with open(bouquets_file, "r") as f:
+                    lines = f.readlines()
+
+                with open(bouquets_file, "w") as f:
+                    for line in lines:
+                        if bouquet_filename.lower() not in line.lower():
+                            f.write(line)
+
+                log.info("Bouquet entry removed from bouquets.tv: %s", bouquet_filename)
+            except Exception as e:
+                log.error("Error updating bouquets.tv: %s", e)
+
+    def removeBouquet(self, enabled):
+        current = self.playlists_processed[self.current]
+        for country in sorted([k for k in current.keys() if k in enabled], key=lambda x: group_titles.get(x, x).lower()):
+            if current[country]:
+                bouquet_filename = sanitizeFilename(country).replace(" ", "_").strip().lower()
+                bouquet_name = "userbouquet.vavoo.%s.tv" % bouquet_filename
+                bouquet_path = os_path.join("/etc/enigma2", bouquet_name)
+
+                if os_path.exists(bouquet_path):
+                    log.info("Removing bouquet: %s", bouquet_name)
+                    try:
+                        os_remove(bouquet_path)  # Directly remove the bouquet file
+                        self.removeBouquetReference(bouquet_name)
+                        log.info("Bouquet removed: %s", bouquet_name)
+                    except Exception as e:
+                        log.error("Error removing bouquet %s: %s", bouquet_name, e)
+                else:
+                    log.info("Bouquet does not exist: %s", bouquet_name)
+
+        reload_bouquet()
+
+    def removeAllVavooBouquets(self):
+        """
+        Clean up routine to remove any previously made changes
+        """
+        bouquet_dir = "/etc/enigma2"
+        bouquets_file = os_path.join(bouquet_dir, "bouquets.tv")
+        removed_bouquets = []
+
+        for file in os_listdir(bouquet_dir):
+            if file.startswith("userbouquet.vavoo") and file.endswith(".tv"):
+                bouquet_path = os_path.join(bouquet_dir, file)
+                removed_bouquets.append(file)
+
+                if os_path.exists(bouquet_path):
+                    log.info("Removing bouquet: %s", file)
+                    try:
+                        os_remove(bouquet_path)
+                        log.info("Bouquet removed: %s", file)
+                    except Exception as e:
+                        log.error("Error removing bouquet %s: %s", file, e)
+                else:
+                    log.info("Bouquet does not exist: %s", file)
+
+        if os_path.exists(bouquets_file) and removed_bouquets:
+            try:
+                with open(bouquets_file, "r") as f:
+                    lines = f.readlines()
+
+                with open(bouquets_file, "w") as f:
+                    for line in lines:
+                        if not any(bouquet.lower() in line.lower() for bouquet in removed_bouquets):
+                            f.write(line)
+                log.info("Removed references from bouquets.tv")
+            except Exception as e:
+                log.error("Error updating bouquets.tv: %s", e)
+
+        reload_bouquet()
+
+    def cleanup(self):
+        """Remove this fetcher's download; other fetchers and a refresh child may still use the directory"""
+        playlist = os_path.join(self.tempDir, self.current)
+        if os_path.exists(playlist):
+            os_remove(playlist)
+        if self.cache_updated:
+            # written aside and renamed, a fetcher loading it never sees half a file
+            with open(self.cachefile + ".new", 'wb') as cache_output:
+                pickle.dump(self.playlists_processed, cache_output, pickle.HIGHEST_PROTOCOL)
+            os_rename(self.cachefile + ".new", self.cachefile)
+
+
+class TypeAheadInput:
+    """Multi-tap number key input building a search query"""
+
+    def __init__(self, onChange):
+        from Tools.NumericalTextInput import NumericalTextInput
+        self.onChange = onChange
+        self.query = ""
+        self.lastKey = None
+        self.input = NumericalTextInput(nextFunc=self.nextChar)
+
+    def nextChar(self):
+        self.lastKey = None
+
+    def keyNumber(self, number):
+        char = self.input.getKey(number)
+        if number == self.lastKey and self.query:
+            # same key pressed again: cycle the last character
+            self.query = self.query[:-1] + char
+        else:
+            self.query += char
+        self.lastKey = number
+        self.onChange(self.query)
+
+    def deleteBackward(self):
+        self.lastKey = None
+        self.query = self.query[:-1]
+        self.onChange(self.query)
+
+    def clear(self):
+        self.lastKey = None
+        self.query = ""
+        self.onChange(self.query)
+
+
+def numberActions(keyNumber):
+    return dict((str(x), keyNumber) for x in range(10))
+
+
+def startClock(screen, name, callback):
+    """
+    Call callback once a second while a pipeline run is in progress and
+    once more when it ends, so the elapsed time shown keeps counting.
+    """
+    state = {"running": False}
+
+    def tick():
+        running = coordinator.running is not None
+        if running or state["running"]:
+            callback()
+        state["running"] = running
+
+    screen.clock = eTimer()
+    if hasattr(screen.clock, "callback"):
+        screen.clock.callback.append(watch(name, tick))
+    else:
+        screen.clock_conn = screen.clock.timeout.connect(watch(name, tick))
+    screen.clock.start(1000, False)
+    screen.onClose.append(screen.clock.stop)
+
+
+class SetupMaker(Screen):
+    if screen_width >= 1920:
+
+        if os_path.exists("/usr/bin/apt-get"):
+            skin = '''
+                <screen name="SetupMaker" position="center,center" size="1920,1080" title="SetupMaker" backgroundColor="transparent" flags="wfNoBorder">
+                    <eLabel backgroundColor="#002d3d5b" cornerRadius="20" position="19,22" size="1255,711" zPosition="-99" />
+                    <eLabel name="" position="26,30" size="1240,697" zPosition="-90" cornerRadius="18" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                    <!-- /* time -->
+                    <eLabel name="" position="30,34" size="700,52" backgroundColor="#00171a1c" halign="center" valign="center" transparent="0" font="Regular; 36" zPosition="1" text="VAVOO MAKER BY LULULLA" foregroundColor="#007fcfff" />
+                    <widget backgroundColor="#00171a1c" font="Regular;34" halign="right" position="1107,40" render="Label" shadowColor="#00000000" shadowOffset="-2,-2" size="120,40" source="global.CurrentTime" transparent="1" zPosition="3">
+                        <convert type="ClockToText">Default</convert>
+                    </widget>
+                    <widget backgroundColor="#00171a1c" font="Regular;34" halign="right" position="731,41" render="Label" shadowColor="#00000000" shadowOffset="-2,-2" size="400,40" source="global.CurrentTime" transparent="1" zPosition="3">
+                        <convert type="ClockToText">Date</convert>
+                    </widget>
+                    <eLabel name="" position="33,36" size="1230,663" zPosition="-90" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                    <eLabel backgroundColor="#001a2336" position="34,90" size="1220,3" zPosition="10" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_red.png" position="619,386" size="30,30" alphatest="blend" transparent="1" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_green.png" position="619,434" size="30,30" alphatest="blend" transparent="1" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_yellow.png" position="620,486" size="30,30" alphatest="blend" transparent="1" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_blue.png" position="620,534" size="30,30" alphatest="blend" transparent="1" />
+                    <widget backgroundColor="#9f1313" font="Regular;30" halign="left" position="660,380" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_red" transparent="1" valign="center" zPosition="3" />
+                    <widget backgroundColor="#1f771f" font="Regular;30" halign="left" position="660,430" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_green" transparent="1" valign="center" zPosition="3" />
+                    <widget backgroundColor="#a08500" font="Regular;30" halign="left" position="660,480" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_yellow" transparent="1" valign="center" zPosition="3" />
+                    <widget backgroundColor="#18188b" font="Regular;30" halign="left" position="661,530" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_blue" transparent="1" valign="center" zPosition="3" />
+                    <widget name="config" position="40,100" size="550,585" itemHeight="35" enableWrapAround="1" transparent="0" zPosition="9" scrollbarMode="showOnDemand" />
+                    <widget name="description" position="610,604" size="635,81" font="Regular; 32" halign="center" foregroundColor="#00ffffff" transparent="1" zPosition="3" />
+                    <eLabel backgroundColor="#00fffffe" position="35,695" size="1200,3" zPosition="10" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/log.png" position="616,109" size="512,256" zPosition="5" />
+                    <widget source="session.CurrentService" render="Label" position="915,561" size="350,34" font="Regular;26" borderWidth="1" backgroundColor="background" transparent="1" halign="center" foregroundColor="white" zPosition="30" valign="center" noWrap="1">
+                        <convert type="ServiceName">Name</convert>
+                    </widget>
+                    <widget source="session.VideoPicture" render="Pig" position="936,375" zPosition="20" size="300,180" backgroundColor="transparent" transparent="0" cornerRadius="14" />
+                </screen>
+                '''
+
+        else:
+            skin = '''
+                <screen name="SetupMaker" position="center,center" size="1920,1080" title="SetupMaker" backgroundColor="transparent" flags="wfNoBorder">
+                    <eLabel backgroundColor="#002d3d5b" cornerRadius="20" position="19,22" size="1255,711" zPosition="-99" />
+                    <eLabel name="" position="26,30" size="1240,697" zPosition="-90" cornerRadius="18" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                    <!-- /* time -->
+                    <eLabel name="" position="30,34" size="700,52" backgroundColor="#00171a1c" halign="center" valign="center" transparent="0" font="Regular; 36" zPosition="1" text="VAVOO MAKER BY LULULLA" foregroundColor="#007fcfff" />
+                    <widget backgroundColor="#00171a1c" font="Regular;34" halign="right" position="1107,40" render="Label" shadowColor="#00000000" shadowOffset="-2,-2" size="120,40" source="global.CurrentTime" transparent="1" zPosition="3">
+                        <convert type="ClockToText">Default</convert>
+                    </widget>
+                    <widget backgroundColor="#00171a1c" font="Regular;34" halign="right" position="731,41" render="Label" shadowColor="#00000000" shadowOffset="-2,-2" size="400,40" source="global.CurrentTime" transparent="1" zPosition="3">
+                        <convert type="ClockToText">Date</convert>
+                    </widget>
+                    <eLabel name="" position="33,36" size="1230,663" zPosition="-90" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                    <eLabel backgroundColor="#001a2336" position="34,90" size="1220,3" zPosition="10" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_red.png" position="619,386" size="30,30" alphatest="blend" transparent="1" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_green.png" position="619,434" size="30,30" alphatest="blend" transparent="1" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_yellow.png" position="620,486" size="30,30" alphatest="blend" transparent="1" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_blue.png" position="620,534" size="30,30" alphatest="blend" transparent="1" />
+                    <widget backgroundColor="#9f1313" font="Regular;30" halign="left" position="660,380" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_red" transparent="1" valign="center" zPosition="3" />
+                    <widget backgroundColor="#1f771f" font="Regular;30" halign="left" position="660,430" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_green" transparent="1" valign="center" zPosition="3" />
+                    <widget backgroundColor="#a08500" font="Regular;30" halign="left" position="660,480" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_yellow" transparent="1" valign="center" zPosition="3" />
+                    <widget backgroundColor="#18188b" font="Regular;30" halign="left" position="661,530" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_blue" transparent="1" valign="center" zPosition="3" />
+                    <widget name="config" position="40,100" size="550,585" itemHeight="35" font="Regular; 30" enableWrapAround="1" transparent="0" zPosition="9" scrollbarMode="showOnDemand" />
+                    <widget name="description" position="610,604" size="635,81" font="Regular; 32" halign="center" foregroundColor="#00ffffff" transparent="1" zPosition="3" />
+                    <eLabel backgroundColor="#00fffffe" position="35,695" size="1200,3" zPosition="10" />
+                    <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/log.png" position="616,109" size="512,256" zPosition="5" />
+                    <widget source="session.CurrentService" render="Label" position="915,561" size="350,34" font="Regular;26" borderWidth="1" backgroundColor="background" transparent="1" halign="center" foregroundColor="white" zPosition="30" valign="center" noWrap="1">
+                        <convert type="ServiceName">Name</convert>
+                    </widget>
+                    <widget source="session.VideoPicture" render="Pig" position="936,375" zPosition="20" size="300,180" backgroundColor="transparent" transparent="0" cornerRadius="14" />
+                </screen>
+                '''
+    else:
+        if os_path.exists("/usr/bin/apt-get"):
+            skin = '''
+            <screen name="SetupMaker" position="center,center" size="1280,720" title="SetupMaker" backgroundColor="transparent" flags="wfNoBorder">
+                <eLabel backgroundColor="#002d3d5b" cornerRadius="20" position="0,0" size="1280,720" zPosition="-99" />
+                <eLabel name="" position="10,10" size="1263,701" zPosition="-90" cornerRadius="18" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                <!-- /* time -->
+                <eLabel name="" position="30,34" size="700,52" backgroundColor="#00171a1c" halign="center" valign="center" transparent="0" font="Regular; 36" zPosition="1" text="VAVOO MAKER BY LULULLA" foregroundColor="#007fcfff" />
+                <widget backgroundColor="#00171a1c" font="Regular; 30" halign="right" position="1107,35" render="Label" shadowColor="#00000000" shadowOffset="-2,-2" size="120,40" source="global.CurrentTime" transparent="1" zPosition="3">
+                    <convert type="ClockToText">Default</convert>
+                </widget>
+                <widget backgroundColor="#00171a1c" font="Regular; 30" halign="right" position="736,35" render="Label" shadowColor="#00000000" shadowOffset="-2,-2" size="400,40" source="global.CurrentTime" transparent="1" zPosition="3">
+                    <convert type="ClockToText">Date</convert>
+                </widget>
+                <eLabel name="" position="20,16" size="1245,689" zPosition="-90" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                <eLabel backgroundColor="#001a2336" position="34,90" size="1220,3" zPosition="10" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_red.png" position="619,386" size="30,30" alphatest="blend" transparent="1" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_green.png" position="619,434" size="30,30" alphatest="blend" transparent="1" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_yellow.png" position="620,486" size="30,30" alphatest="blend" transparent="1" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_blue.png" position="620,534" size="30,30" alphatest="blend" transparent="1" />
+                <widget backgroundColor="#9f1313" font="Regular; 24" halign="left" position="660,380" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_red" transparent="1" valign="center" zPosition="3" />
+                <widget backgroundColor="#1f771f" font="Regular; 24" halign="left" position="660,430" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_green" transparent="1" valign="center" zPosition="3" />
+                <widget backgroundColor="#a08500" font="Regular; 24" halign="left" position="660,480" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_yellow" transparent="1" valign="center" zPosition="3" />
+                <widget backgroundColor="#18188b" font="Regular; 24" halign="left" position="661,530" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_blue" transparent="1" valign="center" zPosition="3" />
+                <widget name="config" position="40,100" size="550,585" itemHeight="35" enableWrapAround="1" transparent="0" zPosition="9" scrollbarMode="showOnDemand" />
+                <widget name="description" position="610,604" size="635,81" font="Regular; 26" halign="center" foregroundColor="#00ffffff" transparent="1" zPosition="3" />
+                <eLabel backgroundColor="#00fffffe" position="35,695" size="1200,3" zPosition="10" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/log.png" position="616,109" size="512,256" zPosition="5" />
+                <widget source="session.CurrentService" render="Label" position="915,561" size="350,34" font="Regular; 20" borderWidth="1" backgroundColor="background" transparent="1" halign="center" foregroundColor="white" zPosition="30" valign="center" noWrap="1">
+                    <convert type="ServiceName">Name</convert>
+                </widget>
+                <widget source="session.VideoPicture" render="Pig" position="936,375" zPosition="20" size="300,180" backgroundColor="transparent" transparent="0" cornerRadius="14" />
+            </screen>'''
+        else:
+            skin = '''
+            <screen name="SetupMaker" position="center,center" size="1280,720" title="SetupMaker" backgroundColor="transparent" flags="wfNoBorder">
+                <eLabel backgroundColor="#002d3d5b" cornerRadius="20" position="0,0" size="1280,720" zPosition="-99" />
+                <eLabel name="" position="10,10" size="1263,701" zPosition="-90" cornerRadius="18" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                <!-- /* time -->
+                <eLabel name="" position="30,34" size="700,52" backgroundColor="#00171a1c" halign="center" valign="center" transparent="0" font="Regular; 36" zPosition="1" text="VAVOO MAKER BY LULULLA" foregroundColor="#007fcfff" />
+                <widget backgroundColor="#00171a1c" font="Regular; 30" halign="right" position="1107,35" render="Label" shadowColor="#00000000" shadowOffset="-2,-2" size="120,40" source="global.CurrentTime" transparent="1" zPosition="3">
+                    <convert type="ClockToText">Default</convert>
+                </widget>
+                <widget backgroundColor="#00171a1c" font="Regular; 30" halign="right" position="736,35" render="Label" shadowColor="#00000000" shadowOffset="-2,-2" size="400,40" source="global.CurrentTime" transparent="1" zPosition="3">
+                    <convert type="ClockToText">Date</convert>
+                </widget>
+                <eLabel name="" position="20,16" size="1245,689" zPosition="-90" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                <eLabel backgroundColor="#001a2336" position="34,90" size="1220,3" zPosition="10" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_red.png" position="619,386" size="30,30" alphatest="blend" transparent="1" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_green.png" position="619,434" size="30,30" alphatest="blend" transparent="1" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_yellow.png" position="620,486" size="30,30" alphatest="blend" transparent="1" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_blue.png" position="620,534" size="30,30" alphatest="blend" transparent="1" />
+                <widget backgroundColor="#9f1313" font="Regular; 24" halign="left" position="660,380" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_red" transparent="1" valign="center" zPosition="3" />
+                <widget backgroundColor="#1f771f" font="Regular; 24" halign="left" position="660,430" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_green" transparent="1" valign="center" zPosition="3" />
+                <widget backgroundColor="#a08500" font="Regular; 24" halign="left" position="660,480" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_yellow" transparent="1" valign="center" zPosition="3" />
+                <widget backgroundColor="#18188b" font="Regular; 24" halign="left" position="661,530" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_blue" transparent="1" valign="center" zPosition="3" />
+                <widget name="config" position="40,100" size="550,585" itemHeight="35" font="Regular; 30" enableWrapAround="1" transparent="0" zPosition="9" scrollbarMode="showOnDemand" />
+                <widget name="description" position="610,604" size="635,81" font="Regular; 26" halign="center" foregroundColor="#00ffffff" transparent="1" zPosition="3" />
+                <eLabel backgroundColor="#00fffffe" position="35,695" size="1200,3" zPosition="10" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/log.png" position="616,109" size="512,256" zPosition="5" />
+                <widget source="session.CurrentService" render="Label" position="915,561" size="350,34" font="Regular; 20" borderWidth="1" backgroundColor="background" transparent="1" halign="center" foregroundColor="white" zPosition="30" valign="center" noWrap="1">
+                    <convert type="ServiceName">Name</convert>
+                </widget>
+                <widget source="session.VideoPicture" render="Pig" position="936,375" zPosition="20" size="300,180" backgroundColor="transparent" transparent="0" cornerRadius="14" />
+            </screen>'''
+
+    def __init__(self, session, view_type=None):
+        Screen.__init__(self, session)
+        # self.skin = ctrlSkin('SetupMaker', SetupMaker.skin)
+        self.view_type = view_type or config.plugins.vavoomaker.current.value
+
+        self.title = _("vavoo playlists") + " - " + choices.get(self.view_type, self.view_type).title()
+        self.enabled = []
+        self.process_build = []
+        self.creating = False
+        self.vavooFetcher = vavooFetcher(self.view_type)
+        self["description"] = StaticText(_("Downloading playlist - Please wait!"))
+        self["config"] = SelectionList([], enableWrapAround=True)
+        self["key_red"] = StaticText(_("Cancel"))
+        self["key_green"] = StaticText()
+        self["key_yellow"] = StaticText()
+        self["key_blue"] = StaticText(_("Remove"))
+        self["actions"] = ActionMap(
+            [
+                "SetupActions",
+                "ColorActions",
+                "OkCancelActions",
+                "MenuActions"
+            ],
+            watch_actions("SetupMaker", {
+                "ok": self["config"].toggleSelection,
+                "menu": self.openChannelSelector,
+                "green": self.makeBouquets,
+                "save": self.makeBouquets,
+                "cancel": self.backCancel,
+                "red":  self.backCancel,
+                "yellow": self["config"].toggleAllSelection,
+                "blue": self.deleteBouquets,
+                "deleteBackward": self.keyDeleteBackward,
+            }),
+            -2
+        )
+        self.search = TypeAheadInput(self.onSearch)
+        self["searchactions"] = NumberActionMap(["NumberActions"], numberActions(watch("SetupMaker.keyNumber", self.search.keyNumber)), -2)
+
+        self.timer = eTimer()
+        if hasattr(self.timer, "callback"):
+            self.timer.callback.append(watch("SetupMaker.buildList", self.buildList))
+        else:
+            if os_path.exists("/usr/bin/apt-get"):
+                self.timer_conn = self.timer.timeout.connect(watch("SetupMaker.buildList", self.buildList))
+            log.error("eTimer does not support callback.append()")
+        self.timer.start(10, 1)
+
+        coordinator.onChange.append(self.showRunState)
+        startClock(self, "SetupMaker.showRunState", self.showRunState)
+        self.onClose.append(self.__onClose)
+
+    def __onClose(self):
+        coordinator.onChange.remove(self.showRunState)
+        # a queued creation is dropped with its screen, a queued removal still runs
+        coordinator.withdraw(self.onCreated)
+        try:
+            self.vavooFetcher.cleanup()
+        except Exception as e:
+            log.warning("Error clean: %s", e)
+            pass
+
+    def buildList(self):
+        self["actions"].setEnabled(False)
+        run = stats.begin("load")
+        # the user is waiting for this list, it goes before background requests
+        with governor.priority(INTERACTIVE):
+            # browsing leaves a profile request to the next bouquet run
+            self.vavooFetcher.getPlaylist()
+        stats.end(run)
+        all_items = list(self.vavooFetcher.playlists_processed[config.plugins.vavoomaker.current.value].keys())
+        if self.view_type == "countries":
+            self.process_build = [x for x in all_items if "➾" not in x and "⟾" not in x and "->" not in x]
+        elif self.view_type == "categories":
+            self.process_build = [x for x in all_items if "➾" in x or "⟾" in x or "->" in x]
+        else:
+            self.process_build = all_items
+
+        self.process_build = sorted(self.process_build, key=lambda x: group_titles.get(x, x).lower())
+        saved = set(getattr(config.plugins.vavoomaker, config.plugins.vavoomaker.current.value).value.split("|"))
+        self.enabled = [x for x in self.process_build if x in saved]
+        self["config"].setSelections((group_titles.get(x, x), x, "", x in saved) for x in self.process_build)
+        self.vavooFetcher.buildSearchIndex()
+        self["actions"].setEnabled(True)
+        self["key_green"].setText(_("Create bouquets"))
+        self["key_yellow"].setText(_("Toggle all"))
+        self.setHelpText()
+
+    def setHelpText(self):
+        self["description"].setText(_("Select Items for Export") + "\n" + _("MENU: choose channels, 0-9: search"))
+
+    def showRunState(self):
+        running = coordinator.describe()
+        if running:
+            self["description"].setText(running)
+        elif not self.creating and self.process_build:
+            self.setHelpText()
+
+    def onSearch(self, query):
+        if not query:
+            self["config"].filterSelections()
+            self.setHelpText()
+            return
+        groups = self.vavooFetcher.searchGroups(query)
+        self["config"].filterSelections(groups)
+        self["description"].setText(_("Search: %s (%d)") % (query, len(self["config"].list)))
+
+    def keyDeleteBackward(self):
+        if self.search.query:
+            self.search.deleteBackward()
+
+    def openChannelSelector(self):
+        current = self["config"].getCurrent()
+        if not current:
+            return
+        group = current[0][1]
+        channels = self.vavooFetcher.playlists_processed[config.plugins.vavoomaker.current.value].get(group)
+        if channels:
+            self.session.open(ChannelSelector, group, channels, self.vavooFetcher)
+
+    def readList(self):
+        self.enabled = self["config"].getSelectedValues()
+        getattr(config.plugins.vavoomaker, config.plugins.vavoomaker.current.value).value = "|".join(self.enabled)
+
+    def makeBouquets(self):
+
+        def onConfirm(answer):
+            if answer:
+                self.readList()
+                if self.enabled:
+                    # self["actions"].setEnabled(False)
+                    self.title += " - " + _("Creating bouquets")
+                    self["description"].text = _("Creating bouquets. This may take some time. Please be patient.")
+                    self["key_red"].text = ""
+                    self["key_green"].text = ""
+                    self["key_yellow"].text = ""
+                    self["key_blue"].text = ""
+                    self["config"].setList([])
+                    self["searchactions"].setEnabled(False)
+                    config.plugins.vavoomaker.current.save()
+                    for ch in choices:
+                        getattr(config.plugins.vavoomaker, ch).save()
+                    configfile.save()
+                    self.runtimer = eTimer()
+                    if hasattr(self.runtimer, "callback"):
+                        self.runtimer.callback.append(watch("SetupMaker.doRun", self.doRun))
+                    else:
+                        if os_path.exists("/usr/bin/apt-get"):
+                            self.runtimer_conn = self.runtimer.timeout.connect(watch("SetupMaker.doRun", self.doRun))
+                        log.error("eTimer does not support callback.append()")
+                    self.runtimer.start(10, 1)
+                else:
+                    self.session.open(MessageBox, _("Please select the bouquets you wish to create."), MessageBox.TYPE_INFO, timeout=5)
+
+        self.session.openWithCallback(
+            onConfirm,
+            MessageBox,
+            _("Do you want to create the bouquets?"),
+            MessageBox.TYPE_YESNO,
+            timeout=10,
+            default=True
+        )
+
+    def doRun(self):
+        # one pipeline run at a time, a running update finishes first
+        self.creating = True
+        key = (self.view_type, tuple(sorted(self.enabled)))
+        coordinator.submit("create", self.startCreate, self.onCreated, key)
+
+    def startCreate(self, done):
+        run = stats.begin("create")
+        try:
+            with governor.priority(INTERACTIVE):
+                profile_run("create", self.vavooFetcher.createBouquet, self.enabled)
+        except Exception:
+            stats.end(run, False)
+            raise
+        stats.end(run)
+        done(True)
+
+    def onCreated(self, result):
+        if result is False:
+            self.session.open(MessageBox, _("Error creating bouquets."), MessageBox.TYPE_ERROR, timeout=5)
+            self.cancelConfirm(True)
+            return
+
+        # DEBUG: Check what we're saving
+        log.debug("Saving bouquets to favorite: %s (view type %s)", self.enabled, self.view_type)
+
+        save_bouquets_to_favorite(self.enabled, self.view_type)
+
+        # Close the screen
+        self.cancelConfirm(True)
+
+    def backCancel(self):
+        if self.search.query:
+            self.search.clear()
+            return
+        self.readList()
+        if any([getattr(config.plugins.vavoomaker, choice).isChanged() for choice in choices]):
+            self.session.openWithCallback(self.cancelConfirm, MessageBox, _("Really close without saving settings?"))
+        else:
+            self.cancelConfirm(True)
+
+    def deleteBouquets(self):
+
+        def onConfirm(answer):
+            if answer:
+                if coordinator.submit("remove", self.startRemove, self.onRemoved) != STARTED:
+                    self.session.open(MessageBox, _("Bouquets will be removed when the running task finishes."), MessageBox.TYPE_INFO, timeout=5)
+            else:
+                self.session.open(MessageBox, _("Operation cancelled."), MessageBox.TYPE_INFO, timeout=5)
+
+        self.session.openWithCallback(
+            onConfirm,
+            MessageBox,
+            _("Remove all Vavoo Favorite Bouquets?"),
+            MessageBox.TYPE_YESNO,
+            timeout=5,
+            default=True
+        )
+
+    def startRemove(self, done):
+        self.vavooFetcher.removeAllVavooBouquets()
+        done(True)
+
+    def onRemoved(self, result):
+        if result is False:
+            self.session.open(MessageBox, _("Error removing bouquets."), MessageBox.TYPE_ERROR, timeout=5)
+        else:
+            self.session.open(MessageBox, _("Reloading Bouquets and Services...\n\nAll Vavoo Favorite Bouquets removed."), MessageBox.TYPE_INFO, timeout=5)
+
+    def cancelConfirm(self, result):
+        if not result:
+            return
+        config.plugins.vavoomaker.current.cancel()
+        for ch in choices:
+            getattr(config.plugins.vavoomaker, ch).cancel()
+        self.close()
+
+
+class ChannelSelector(Screen):
+    skin = SetupMaker.skin
+
+    def __init__(self, session, group, channels, fetcher):
+        Screen.__init__(self, session)
+        self.group = group
+        self.fetcher = fetcher
+        self.title = _("vavoo playlists") + " - " + group_titles.get(group, group)
+        self.selections = load_channel_selections()
+        self["description"] = StaticText(_("Select channels for export") + "\n" + _("0-9: search"))
+        self["config"] = SelectionList([], enableWrapAround=True)
+        # rows are built on screen only when visible, so big groups open at once
+        self["config"].setSelections((name, channel_id(url), "", False) for name, url in sorted(channels))
+        self["config"].selection = self.selections.get(group) or SelectionModel(inverted=True)
+        self["key_red"] = StaticText(_("Cancel"))
+        self["key_green"] = StaticText(_("Save"))
+        self["key_yellow"] = StaticText(_("Toggle all"))
+        self["key_blue"] = StaticText()
+        self["actions"] = ActionMap(
+            [
+                "SetupActions",
+                "ColorActions",
+                "OkCancelActions"
+            ],
+            watch_actions("ChannelSelector", {
+                "ok": self["config"].toggleSelection,
+                "green": self.keySave,
+                "save": self.keySave,
+                "cancel": self.keyCancel,
+                "red": self.close,
+                "yellow": self["config"].toggleAllSelection,
+                "deleteBackward": self.keyDeleteBackward,
+            }),
+            -2
+        )
+        self.search = TypeAheadInput(self.onSearch)
+        self["searchactions"] = NumberActionMap(["NumberActions"], numberActions(watch("ChannelSelector.keyNumber", self.search.keyNumber)), -2)
+
+    def onSearch(self, query):
+        if not query:
+            self["config"].filterSelections()
+            self["description"].setText(_("Select channels for export") + "\n" + _("0-9: search"))
+            return
+        self["config"].filterSelections(self.fetcher.searchChannels(self.group, query))
+        self["description"].setText(_("Search: %s (%d)") % (query, len(self["config"].list)))
+
+    def keyDeleteBackward(self):
+        if self.search.query:
+            self.search.deleteBackward()
+
+    def keyCancel(self):
+        if self.search.query:
+            self.search.clear()
+        else:
+            self.close()
+
+    def keySave(self):
+        self.selections[self.group] = self["config"].selection
+        save_channel_selections(self.selections)
+        self.close()
+
+
+class StatsScreen(Screen):
+    if screen_width >= 1920:
+        skin = """
+            <screen position="center,center" size="1600,900" title="Vavoo Statistics" flags="wfNoBorder">
+                <eLabel backgroundColor="#002d3d5b" cornerRadius="20" position="0,0" size="1600,900" zPosition="-99" />
+                <eLabel name="" position="10,10" size="1580,880" zPosition="-90" cornerRadius="18" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                <eLabel name="" position="30,25" size="900,50" backgroundColor="#00171a1c" halign="left" valign="center" transparent="0" font="Regular; 36" zPosition="1" text="VAVOO MAKER STATISTICS" foregroundColor="#007fcfff" />
+                <eLabel backgroundColor="#001a2336" position="30,85" size="1540,3" zPosition="10" />
+                <widget name="text" position="30,100" size="1540,690" font="Regular; 28" zPosition="3" />
+                <eLabel backgroundColor="#001a2336" position="30,800" size="1540,3" zPosition="10" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_red.png" position="40,830" size="30,30" alphatest="blend" transparent="1" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_green.png" position="440,830" size="30,30" alphatest="blend" transparent="1" />
+                <widget backgroundColor="#9f1313" font="Regular;30" halign="left" position="80,825" size="300,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_red" transparent="1" valign="center" zPosition="3" />
+                <widget backgroundColor="#1f771f" font="Regular;30" halign="left" position="480,825" size="400,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_green" transparent="1" valign="center" zPosition="3" />
+                <widget source="status" render="Label" position="900,825" size="670,40" font="Regular; 26" halign="right" valign="center" transparent="1" zPosition="3" />
+            </screen>"""
+    else:
+        skin = """
+            <screen position="center,center" size="1200,650" title="Vavoo Statistics" flags="wfNoBorder">
+                <eLabel backgroundColor="#002d3d5b" cornerRadius="20" position="0,0" size="1200,650" zPosition="-99" />
+                <eLabel name="" position="8,8" size="1184,634" zPosition="-90" cornerRadius="18" backgroundColor="#00171a1c" foregroundColor="#00171a1c" />
+                <eLabel name="" position="20,15" size="700,40" backgroundColor="#00171a1c" halign="left" valign="center" transparent="0" font="Regular; 28" zPosition="1" text="VAVOO MAKER STATISTICS" foregroundColor="#007fcfff" />
+                <eLabel backgroundColor="#001a2336" position="20,62" size="1160,3" zPosition="10" />
+                <widget name="text" position="20,75" size="1160,490" font="Regular; 20" zPosition="3" />
+                <eLabel backgroundColor="#001a2336" position="20,575" size="1160,3" zPosition="10" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_red.png" position="29,597" size="30,30" alphatest="blend" transparent="1" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_green.png" position="330,597" size="30,30" alphatest="blend" transparent="1" />
+                <widget backgroundColor="#9f1313" font="Regular;24" halign="left" position="65,592" size="250,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_red" transparent="1" valign="center" zPosition="3" />
+                <widget backgroundColor="#1f771f" font="Regular;24" halign="left" position="366,592" size="300,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_green" transparent="1" valign="center" zPosition="3" />
+                <widget source="status" render="Label" position="680,592" size="500,40" font="Regular; 20" halign="right" valign="center" transparent="1" zPosition="3" />
+            </screen>
+        """
+
+    EXPORT_FILE = "/tmp/vavoo_stats.json"
+
+    def __init__(self, session):
+        Screen.__init__(self, session)
+        self.title = _("Vavoo Statistics")
+        self["text"] = ScrollLabel()
+        self["status"] = StaticText()
+        self["key_red"] = StaticText(_("Close"))
+        self["key_green"] = StaticText(_("Export JSON"))
+        self["actions"] = ActionMap(["OkCancelActions", "ColorActions", "DirectionActions"], watch_actions("StatsScreen", {
+            "ok": self.close,
+            "cancel": self.close,
+            "red": self.close,
+            "green": self.export,
+            "up": self["text"].pageUp,
+            "down": self["text"].pageDown,
+            "left": self["text"].pageUp,
+            "right": self["text"].pageDown,
+        }), -1)
+        self.onLayoutFinish.append(self.showStats)
+        startClock(self, "StatsScreen.tick", self.tick)
+
+    def tick(self):
+        if coordinator.running is None:
+            # the run has ended, show its record
+            self.showStats()
+        else:
+            self.showStatus()
+
+    def showStatus(self):
+        status = _("Last %d runs, times in seconds") % len(stats.records())
+        running = coordinator.describe()
+        if running:
+            status += " - " + running
+        self["status"].setText(status)
+
+    def showStats(self):
+        records = stats.records()
+        lines = [] if records else [_("No runs recorded since enigma2 started."), ""]
+        for record in records:
+            lines.extend(format_record(record))
+            lines.append("")
+        lines.extend(self.signatureReport())
+        lines.extend(self.probeReport())
+        lines.extend(self.mirrorReport())
+        lines.extend(self.breakerReport())
+        lines.extend(self.governorReport())
+        lines.extend(self.dnsReport())
+        lines.extend(watchdog.report())
+        lines.extend(self.startupReport())
+        self["text"].setText("\n".join(lines))
+        self.showStatus()
+
+    def startupReport(self):
+        from .plugin import startup_report
+        return [""] + startup_report()
+
+    def dnsReport(self):
+        rows = dns.report()
+        if not rows:
+            return []
+        return [_("Name lookups")] + rows + [""]
+
+    def governorReport(self):
+        rows = governor.report()
+        if not rows:
+            return []
+        return [_("Outbound requests")] + rows + [""]
+
+    def breakerReport(self):
+        rows = breaker_report()
+        if not rows:
+            return []
+        lines = [_("Endpoints with failures")]
+        for name, state, failures in rows:
+            lines.append("    %-30s %-10s %d" % (name, state, failures))
+        lines.append("")
+        return lines
+
+    def mirrorReport(self):
+        lines = []
+        for kind, title in (("playlist", _("Channel list mirrors")), ("stream", _("Stream mirrors"))):
+            mirrors = MirrorSet(kind)
+            if len(mirrors.urls) > 1:
+                lines.append(title)
+                lines.extend(mirrors.report())
+                lines.append("")
+        return lines
+
+    def signatureReport(self):
+        path = os_path.join(PLUGIN_PATH, "vectors.json")
+        if not os_path.exists(path):
+            return []
+        tried, good, resting = VectorScores(path).summary()
+        lines = [_("Signature vectors: %d tried, %d working, %d resting") % (tried, good, resting)]
+        fetches = stats.totals.get("signature_fetches", 0)
+        if fetches:
+            lines.append("    " + _("%.1f ping2 requests per signature") % (float(stats.totals.get("signature_attempts", 0)) / fetches))
+        lines.append("")
+        return lines
+
+    def probeReport(self):
+        if not os_path.exists(get_probes_file()):
+            return []
+        known, dead, latency = ProbeStore(get_probes_file()).summary()
+        hits = stats.totals.get("probe_cache_hits", 0)
+        misses = stats.totals.get("probe_cache_misses", 0)
+        lines = [_("Stream checks: %d channels known, %d offline") % (known, dead)]
+        if latency is not None:
+            lines.append("    " + _("mean time to first byte %.2f s") % latency)
+        if hits + misses:
+            lines.append("    " + _("answered from the store %d, due for a check %d (%d%% hits)") % (hits, misses, 100 * hits // (hits + misses)))
+        lines.append("")
+        return lines
+
+    def export(self):
+        try:
+            stats.export(self.EXPORT_FILE, callbacks=dict(watchdog.records()))
+            self["status"].setText(_("Exported to %s") % self.EXPORT_FILE)
+        except Exception as e:
+            self["status"].setText(_("Export failed: %s") % str(e))
+
+
+class CategorySelector(Screen):
+    if screen_width >= 1920:
+        skin = """
+            <screen position="center,center" size="1280,720" title="Vavoo Main" flags="wfNoBorder">
+                <widget name="list" position="310,70" size="250,185" scrollbarMode="showNever" itemHeight="35" />
+                <eLabel name="" position="167,19" size="500,40" backgroundColor="#ff000000" halign="center" valign="center" transparent="1" cornerRadius="26" font="Regular; 28" zPosition="1" text="Select Cowntry for Export" foregroundColor="#fe00" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/kofi.png" position="74,263" size="250,250" zPosition="5" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/paypal.png" position="463,262" size="250,250" zPosition="5" />
+                <eLabel name="" position="161,528" size="500,40" backgroundColor="#ff000000" halign="center" valign="center" transparent="1" cornerRadius="26" font="Regular; 28" zPosition="1" text="Offer Coffe" foregroundColor="#fe00" />
+                <eLabel backgroundColor="#001a2336" position="22,577" size="718,5" zPosition="10" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_red.png" position="29,595" size="30,30" alphatest="blend" transparent="1" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_green.png" position="403,595" size="30,30" alphatest="blend" transparent="1" />
+                <widget backgroundColor="#9f1313" font="Regular;30" halign="left" position="65,590" size="300,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_red" transparent="1" valign="center" zPosition="3" />
+                <widget backgroundColor="#1f771f" font="Regular;30" halign="left" position="440,590" size="300,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_green" transparent="1" valign="center" zPosition="3" />
+                <widget source="session.VideoPicture" render="Pig" position="733,62" zPosition="19" size="520,308" backgroundColor="transparent" transparent="0" cornerRadius="14" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/log.png" position="742,397" size="512,256" zPosition="5" />
+            </screen>"""
+    else:
+        skin = """
+            <screen position="center,center" size="800,650" title="Vavoo Main" flags="wfNoBorder">
+                <widget name="list" position="310,70" size="250,185" scrollbarMode="showNever" itemHeight="35" />
+                <eLabel name="" position="167,19" size="500,40" backgroundColor="#ff000000" halign="center" valign="center" transparent="1" cornerRadius="26" font="Regular; 28" zPosition="1" text="Select Cowntry for Export" foregroundColor="#fe00" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/kofi.png" position="40,270" size="250,250" zPosition="5" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/paypal.png" position="520,270" size="250,250" zPosition="5" />
+                <eLabel name="" position="161,528" size="500,40" backgroundColor="#ff000000" halign="center" valign="center" transparent="1" cornerRadius="26" font="Regular; 28" zPosition="1" text="Offer Coffe" foregroundColor="#fe00" />
+                <eLabel backgroundColor="#001a2336" position="7,578" size="777,4" zPosition="10" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_red.png" position="29,595" size="30,30" alphatest="blend" transparent="1" />
+                <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/vavoo-maker/icons/key_green.png" position="428,595" size="30,30" alphatest="blend" transparent="1" />
+                <widget backgroundColor="#9f1313" font="Regular;30" halign="left" position="65,590" size="300,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_red" transparent="1" valign="center" zPosition="3" />
+                <widget backgroundColor="#1f771f" font="Regular;30" halign="left" position="465,590" size="300,40" render="Label" shadowColor="black" shadowOffset="-2,-2" source="key_green" transparent="1" valign="center" zPosition="3" />
+            </screen>
+        """
+
+    def __init__(self, session):
+        Screen.__init__(self, session)
+        self.session = session
+        self.title = _("Select View Type")
+
+        self.list = []
+        self["list"] = MenuList(self.list)
+        self["key_red"] = StaticText(_("Cancel"))
+        self["key_green"] = StaticText(_("OK"))
+        self["actions"] = ActionMap(["OkCancelActions", "ColorActions"], watch_actions("CategorySelector", {
+            "ok": self.ok,
+            "cancel": self.cancel,
+            "green": self.ok,
+            "red": self.cancel
+        }), -1)
+
+        self.list.append((_("View by Countries"), "countries"))
+        self.list.append((_("View by Categories"), "categories"))
+        self.list.append((_("Setup"), "setup"))
+        self.list.append((_("Statistics"), "stats"))
+        self.list.append((_("Plugin Info"), "info"))
+        self["list"].setList(self.list)
+
+    def ok(self):
+        selection = self["list"].getCurrent()
+        if selection:
+            view_type = selection[1]
+            if view_type == "info":
+                self.show_about()
+                return
+            elif view_type == "setup":
+                self.go_vavoo_maker_config()
+                return
+            elif view_type == "stats":
+                self.session.open(StatsScreen)
+                return
+            else:
+                self.close(view_type)
+        else:
+            self.close(None)
+
+    def cancel(self):
+        self.close(None)
+
+    def get_plugin_info(self):
+        return {
+            "name": "Vavoo Maker Playlists",
+            "version": __version__,
+            "author": __author__,
+            "license": __license__,
+            "credits": __credits__
+        }
+
+    def go_vavoo_maker_config(self):
+        self.session.open(vavoo_maker_config)
+
+    def show_about(self):
+        info = self.get_plugin_info()
+        about_text = _(
+            "Vavoo Maker Playlists v%s\n\n"
+            "Author: %s\n"
+            "License: %s\n"
+            "Credits: %s\n\n"
+            "Community: Linuxsat-support.com\n"
+            "           Corvoboys.org"
+        ) % (info["version"], info["author"], info["license"], ", ".join(info["credits"]))
+
+        self.session.open(MessageBox, about_text, MessageBox.TYPE_INFO)
+
+
+def PluginMain(session, **kwargs):
+    session.openWithCallback(
+        lambda view_type: onViewTypeSelected(session, view_type),
+        CategorySelector
+    )
+
+
+def onViewTypeSelected(session, view_type):
+    """Manages selection from the main menu"""
+    if view_type in ["countries", "categories"]:
+        cfg.current.value = view_type
+        return session.open(SetupMaker, view_type=view_type)
+    elif view_type == "setup":
+        return None
+    elif view_type == "info":
+        return None
+    else:
+        return None
+
+
+def favoritesByViewType(bouquets):
+    """Group Favorite.txt entries by view type, keeping their order"""
+    grouped = {}
+    for bouquet_info in bouquets:
+        grouped.setdefault(bouquet_info['view_type'], []).append(bouquet_info['name'])
+    return grouped
+
+
+def prewarmFavoriteBouquets():
+    """
+    Fetch and parse the playlists and a signature for Favorite.txt ahead of
+    a fixed-time update. Returns {view_type: fetcher}, empty when there is
+    nothing to update.
+    """
+    warm = {}
+    if not os_path.exists(get_favorite_file()):
+        return warm
+    run = stats.begin("prewarm")
+    try:
+        for view_type in favoritesByViewType(load_bouquets_from_favorite()):
+            start = time.time()
+            with governor.priority(BACKGROUND):
+                warm[view_type] = vavooFetcher(view_type).prepare()
+            log.info("pre-warmed %s in %.1f s", view_type, time.time() - start)
+    except Exception:
+        stats.end(run, False)
+        raise
+    stats.end(run)
+    return warm
+
+
+def renderFavoriteBouquets(target_dir="/etc/enigma2", warm=None, temp_dir=None):
+    """
+    Fetch and render the bouquets saved in Favorite.txt into target_dir.
+    warm holds fetchers from prewarmFavoriteBouquets(), so only rendering is left;
+    other playlists are downloaded into temp_dir, TEMP_DIR by default.
+    Returns None when there is nothing to update, otherwise a summary with the
+    written files and the playlist digest.
+    """
+    favorite_file = get_favorite_file()
+
+    if not os_path.exists(favorite_file):
+        log.info("Favorite.txt not found - no bouquets to update")
+        return
+
+    bouquets_to_update = load_bouquets_from_favorite()
+
+    if not bouquets_to_update:
+        log.info("No bouquets found in Favorite.txt")
+        return
+
+    log.info("Scheduled update for %d bouquets", len(bouquets_to_update))
+    digest = md5()
+    files = []
+    warm = warm or {}
+
+    grouped = favoritesByViewType(bouquets_to_update)
+    for view_type in sorted(grouped):
+        enabled_list = grouped[view_type]
+        log.info("Updating bouquets: %s (type: %s)", ", ".join(enabled_list), view_type)
+
+        fetcher = warm.get(view_type)
+        if fetcher is None:
+            fetcher = vavooFetcher(view_type, temp_dir)
+            # signing overlaps the download and parse
+            fetcher.startSignature()
+            fetcher.getPlaylist()
+        else:
+            log.info("Using pre-warmed playlist and signature")
+
+        files.extend(fetcher.renderBouquets(enabled_list, target_dir, probe=True))
+        digest.update(fetcher.playlistDigest(enabled_list).encode("ascii"))
+
+        log.info("Successfully updated: %s", ", ".join(enabled_list))
+
+    return {"bouquets": len(bouquets_to_update), "digest": digest.hexdigest(), "files": files}
+
+
+def installFavoriteBouquets(result, staging=None):
+    """Move bouquet files rendered in staging into place, reference them and reload"""
+    if staging is not None:
+        with stats.stage("install"):
+            for bouquet_filename in result["files"]:
+                target = os_path.join("/etc/enigma2", bouquet_filename)
+                # copy next to the target first, so the rename is atomic even across filesystems
+                copyfile(os_path.join(staging, bouquet_filename), target + ".new")
+                os_rename(target + ".new", target)
+    add_bouquet_references(result["files"])
+    reload_bouquet()
+
+
+def showUpdateResult(session, error=None):
+    if session is None:
+        return
+    if error is None:
+        session.open(
+            MessageBox,
+            _("Bouquets updated successfully!"),
+            MessageBox.TYPE_INFO,
+            timeout=5
+        )
+    else:
+        session.open(
+            MessageBox,
+            _("Error during bouquet update: %s") % str(error),
+            MessageBox.TYPE_ERROR,
+            timeout=5
+        )
+
+
+def updateFavoriteBouquets(session=None, warm=None, profile=None):
+    """
+    Update all bouquets saved in Favorite.txt.
+    Returns False on failure, otherwise a summary with the playlist digest.
+    profile: run under the profilers, None to follow a pending request.
+    """
+    if session is None:
+        log.info("No session available, running in background")
+
+    run = stats.begin("refresh")
+    try:
+        if profile is None:
+            profile = consume_profile()
+        if profile:
+            result = capture("refresh", renderFavoriteBouquets, warm=warm)
+        else:
+            result = renderFavoriteBouquets(warm=warm)
+        if result is None:
+            stats.end(run)
+            return
+        installFavoriteBouquets(result)
+        stats.end(run)
+        log.info("All bouquets updated successfully")
+        showUpdateResult(session)
+        return result
+
+    except Exception as e:
+        stats.end(run, False)
+        log.exception("Error during scheduled update: %s", e)
+        showUpdateResult(session, e)
+        return False
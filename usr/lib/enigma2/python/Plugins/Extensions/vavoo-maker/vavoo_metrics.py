@@ -0,0 +1,215 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Opt-in, read-only metrics endpoint.
+
+With cfg.metrics enabled a small HTTP server answers GET /metrics in the
+Prometheus text format, on localhost or, with cfg.metrics_lan, on every
+interface. Values come from the scheduler bookkeeping in cfg, the pipeline
+statistics and the log counters; nothing can be changed through it.
+"""
+
+import time
+from os.path import getmtime, join
+from threading import Thread
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+from .vavoo_breaker import OPEN, report as breaker_report
+from .vavoo_config import cfg
+from .vavoo_log import counts as log_counts, log
+from .vavoo_stats import stats
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_server = None
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metrics(object):
+    def __init__(self):
+        self.lines = []
+        self.declared = set()
+
+    def add(self, metric, value, help_text, metric_type="gauge", **labels):
+        metric = "vavoo_" + metric
+        if metric not in self.declared:
+            self.declared.add(metric)
+            self.lines.append("# HELP %s %s" % (metric, help_text))
+            self.lines.append("# TYPE %s %s" % (metric, metric_type))
+        if labels:
+            metric += "{%s}" % ",".join('%s="%s"' % (k, _escape(labels[k])) for k in sorted(labels))
+        self.lines.append("%s %s" % (metric, value))
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+
+def signature_age():
+    """Seconds since the cached signature was written, -1 when there is none"""
+    from .vavoo_lib import PLUGIN_PATH
+    try:
+        return int(time.time() - getmtime(join(PLUGIN_PATH, "signfile.json")))
+    except OSError:
+        return -1
+
+
+def render():
+    # vavoo_lib and the mirrors load with the first scrape, not at boot
+    from .plugin import refresh_scheduler
+    from .vavoo_lib import dns, governor
+    from .vavoo_mirrors import MirrorSet
+    from .vavoo_watchdog import watchdog
+
+    m = _Metrics()
+    m.add("up", 1, "Metrics endpoint is serving")
+    m.add("last_run_timestamp_seconds", int(cfg.last_run.value), "Last successful scheduled refresh")
+    m.add("last_attempt_timestamp_seconds", int(cfg.last_attempt.value), "Last scheduled refresh attempt")
+    m.add("consecutive_failures", int(cfg.failures.value), "Scheduled refreshes failed in a row")
+    scheduler = refresh_scheduler()
+    m.add("next_run_timestamp_seconds", scheduler.next_run(), "Next scheduled refresh, -1 when disabled")
+    m.add("refreshes_avoided_total", int(cfg.refreshes_avoided.value), "Runs saved by the adaptive schedule", "counter")
+    if cfg.timetype.value == "adaptive":
+        m.add("adaptive_interval_minutes", scheduler.adaptive_interval(), "Learned refresh interval")
+    m.add("signature_age_seconds", signature_age(), "Age of the cached signature, -1 when missing")
+
+    # served from another thread: work on a copy of the ring buffer
+    last = {}
+    for record in list(stats.runs):
+        last[record["kind"]] = record
+    for kind, record in sorted(last.items()):
+        m.add("run_timestamp_seconds", record["time"], "Start of the last run", kind=kind)
+        m.add("run_duration_seconds", record["total"], "Duration of the last run", kind=kind)
+        m.add("run_success", 1 if record["ok"] else 0, "Outcome of the last run", kind=kind)
+        for stage, seconds in sorted(record["stages"].items()):
+            m.add("stage_duration_seconds", seconds, "Stage durations of the last run", kind=kind, stage=stage)
+
+    for (kind, outcome), value in sorted(stats.outcomes.items()):
+        m.add("runs_total", value, "Pipeline runs since enigma2 started", "counter", kind=kind, result=outcome)
+    for name, value in sorted(stats.totals.items()):
+        m.add("pipeline_events_total", value, "Pipeline counters since enigma2 started", "counter", name=name)
+
+    for cache, hits, misses in (
+            ("signature", "signature_cache_hits", "signature_fetches"),
+            ("playlist", "playlist_cache_hits", "playlist_downloads"),
+            ("probe", "probe_cache_hits", "probe_cache_misses")):
+        hits = stats.totals.get(hits, 0)
+        misses = stats.totals.get(misses, 0)
+        if hits + misses:
+            m.add("cache_hit_ratio", round(float(hits) / (hits + misses), 4), "Lookups served from cache", cache=cache)
+
+    for key, value in sorted(stats.gauges.items()):
+        name, label = key.split("|", 1)
+        if name == "bouquet_channels":
+            m.add("bouquet_channels", value, "Channels written to each bouquet", bouquet=label)
+
+    now = time.time()
+    for kind in ("playlist", "stream"):
+        mirrors = MirrorSet(kind)
+        for url in mirrors.urls:
+            entry = mirrors.entry(url)
+            m.add("mirror_healthy", 1 if entry["down_until"] <= now else 0, "Mirror not skipped after failures", kind=kind, mirror=url)
+            if entry["rtt"] is not None:
+                m.add("mirror_rtt_seconds", entry["rtt"], "Smoothed mirror round trip time", kind=kind, mirror=url)
+
+    for name, state, failures in breaker_report():
+        m.add("breaker_open", 1 if state == OPEN else 0, "Endpoint short-circuited after failures", endpoint=name)
+        m.add("breaker_failures", failures, "Failures in a row per endpoint", endpoint=name)
+
+    m.add("dns_cache_hits_total", dns.hits, "Name lookups answered from the cache", "counter")
+    m.add("dns_cache_misses_total", dns.misses, "Name lookups sent to the resolver", "counter")
+    m.add("dns_seconds_saved_total", round(dns.saved, 3), "Resolver time saved by the cache", "counter")
+    for priority, label in enumerate(("interactive", "normal", "background")):
+        m.add("outbound_requests_total", governor.requests[priority], "Outbound requests by priority", "counter", priority=label)
+        m.add("outbound_queued_total", governor.queued[priority], "Outbound requests that waited for a slot", "counter", priority=label)
+        m.add("outbound_queue_seconds_total", round(governor.delay[priority], 3), "Time spent waiting for a slot", "counter", priority=label)
+
+    for level, value in sorted(log_counts.items()):
+        m.add("log_messages_total", value, "Log records by level", "counter", level=level.lower())
+    m.add("main_loop_stalls_total", watchdog.stalls, "Callbacks that exceeded the stall threshold", "counter")
+    return m.text()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        try:
+            body = render().encode("utf-8")
+        except Exception as error:
+            log.error("metrics failed: %s", error)
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug("metrics %s - %s", self.address_string(), format % args)
+
+
+def start():
+    global _server
+    if _server is not None:
+        return
+    address = ("" if cfg.metrics_lan.value else "127.0.0.1", int(cfg.metrics_port.value))
+    try:
+        _server = HTTPServer(address, _Handler)
+    except Exception as error:
+        log.error("metrics endpoint not started on %s:%d: %s", address[0] or "*", address[1], error)
+        return
+    thread = Thread(target=_server.serve_forever, name="vavoo-metrics")
+    thread.daemon = True
+    thread.start()
+    log.info("metrics endpoint on %s:%d", address[0] or "*", address[1])
+
+
+def _close(server):
+    server.shutdown()
+    server.server_close()
+
+
+def _restart(closing):
+    closing.join()
+    start()
+
+
+def stop():
+    """
+    Stop the endpoint without waiting for it: shutdown() blocks until
+    serve_forever() polls again, so it runs in a thread of its own.
+    Returns that thread, None when the endpoint was not running.
+    """
+    global _server
+    server, _server = _server, None
+    if server is None:
+        return None
+    thread = Thread(target=_close, args=(server,), name="vavoo-metrics-stop")
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def apply_config():
+    """Start, stop or rebind the endpoint after a configuration change"""
+    closing = stop()
+    if not cfg.metrics.value:
+        return
+    if closing is None:
+        start()
+    else:
+        # the port is free again once the old server is closed
+        thread = Thread(target=_restart, args=(closing,), name="vavoo-metrics-restart")
+        thread.daemon = True
+        thread.start()
@@ -0,0 +1,279 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Mirror selection for the channel list and the stream base url.
+
+Each kind has a configurable list of mirrors (cfg.playlist_mirrors and
+cfg.stream_mirrors). Round trip time and download throughput are kept per
+mirror as moving averages in a small state file, refreshed every few hours
+with a cheap request. Mirrors are used fastest first; one that times out
+is skipped for a while, longer on every failure in a row, and the next one
+takes over. With a single mirror nothing is measured.
+
+Downloads also keep the last time-to-first-byte and total times per
+mirror: connect and read timeouts follow their 95th percentile, and with
+cfg.hedge a second request is started when the first takes longer than
+the usual 95th percentile download, the faster one wins.
+"""
+
+import json
+import os
+import time
+from threading import Event, Thread
+
+try:
+    from queue import Queue, Empty
+except ImportError:
+    from Queue import Queue, Empty
+
+from requests import exceptions
+from six.moves.urllib.parse import urlparse
+
+from .vavoo_config import cfg
+from .vavoo_lib import dns, governor, http
+from .vavoo_log import log
+from .vavoo_stats import stats
+
+
+STATE_FILE = "/tmp/vavoo_mirrors.json"
+MEASURE_INTERVAL = 6 * 3600
+MEASURE_TIMEOUT = 2.5
+# failover: a failing mirror is skipped for 60 s, doubling up to an hour
+DOWN_FIRST = 60
+DOWN_MAX = 3600
+# weight of a new sample in the moving averages
+SMOOTHING = 0.3
+# download times kept per mirror for the percentiles
+SAMPLES = 20
+MIN_SAMPLES = 5
+# (floor, default, ceiling) in seconds
+CONNECT_TIMEOUT = (1.5, 2.5, 10.0)
+READ_TIMEOUT = (2.5, 5.0, 30.0)
+# never hedge sooner, fast lines would double every request over jitter
+HEDGE_FLOOR = 0.5
+CHUNK = 64 * 1024
+
+DEFAULTS = {
+    "playlist": "https://vavoo.to/channels",
+    "stream": "https://vavoo.to/live2/play/",
+}
+
+
+def _average(old, sample):
+    return sample if old is None else old + SMOOTHING * (sample - old)
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile, None without samples"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _clamp(value, limits):
+    return max(limits[0], min(limits[2], value))
+
+
+def _download(url, timeout, cancelled, priority):
+    """(content, seconds to the first byte, total seconds), None once cancelled"""
+    with governor.slot(url, priority):
+        # timed from the slot, queueing is not the mirror's fault
+        started = time.time()
+        response = http.get(url, timeout=timeout, stream=True)
+        try:
+            response.raise_for_status()
+            first_byte = time.time() - started
+            chunks = []
+            for chunk in response.iter_content(CHUNK):
+                if cancelled.is_set():
+                    return None
+                chunks.append(chunk)
+            return b"".join(chunks), first_byte, time.time() - started
+        finally:
+            response.close()
+
+
+class MirrorSet(object):
+    """Ranking and health of the mirrors of one kind, "playlist" or "stream" """
+
+    def __init__(self, kind):
+        self.kind = kind
+        value = getattr(cfg, kind + "_mirrors").value
+        self.urls = [x.strip() for x in value.replace(",", " ").split() if x.strip()] or [DEFAULTS[kind]]
+        if kind == "stream":
+            # a stream mirror is a base the channel path is appended to
+            self.urls = [url.rstrip("/") + "/" for url in self.urls]
+        dns.add_hosts(urlparse(url).netloc for url in self.urls)
+        # url -> {rtt, throughput, failures, down_until, measured}
+        self.state = {}
+        try:
+            with open(STATE_FILE) as f:
+                self.state = json.load(f).get(kind, {})
+        except (IOError, OSError, ValueError):
+            pass
+
+    def entry(self, url):
+        entry = self.state.get(url)
+        if entry is None:
+            entry = self.state[url] = {"rtt": None, "throughput": None, "failures": 0, "down_until": 0, "measured": 0}
+        return entry
+
+    def save(self):
+        try:
+            with open(STATE_FILE) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            data = {}
+        # mirrors removed from the configuration are forgotten
+        data[self.kind] = dict((url, self.entry(url)) for url in self.urls)
+        try:
+            with open(STATE_FILE + ".new", "w") as f:
+                json.dump(data, f)
+            os.rename(STATE_FILE + ".new", STATE_FILE)
+        except (IOError, OSError) as error:
+            log.warning("mirror state not saved: %s", error)
+
+    def ranked(self, now=None):
+        """Mirrors in the order to try: healthy ones fastest first, then those skipped"""
+        now = now or time.time()
+        healthy = [url for url in self.urls if self.entry(url)["down_until"] <= now]
+        down = [url for url in self.urls if url not in healthy]
+        # unmeasured mirrors keep their configured order after the measured ones
+        healthy.sort(key=lambda url: (self.entry(url)["rtt"] is None, self.entry(url)["rtt"] or 0))
+        down.sort(key=lambda url: self.entry(url)["down_until"])
+        return healthy + down
+
+    def best(self):
+        return self.ranked()[0]
+
+    def succeeded(self, url, rtt=None, first_byte=None, size=0, seconds=0):
+        """
+        Record an answer from url: rtt of a measuring request, which ranks
+        the mirrors, or first_byte, size and seconds of a download, which
+        set its timeouts. A large download must not rank its mirror down.
+        """
+        entry = self.entry(url)
+        entry["failures"] = 0
+        entry["down_until"] = 0
+        if rtt is not None:
+            entry["rtt"] = round(_average(entry["rtt"], rtt), 4)
+        if first_byte is not None:
+            entry["first_byte"] = (entry.get("first_byte", []) + [round(first_byte, 3)])[-SAMPLES:]
+        if size and seconds > 0:
+            entry["throughput"] = int(_average(entry["throughput"], size / seconds))
+            entry["total"] = (entry.get("total", []) + [round(seconds, 3)])[-SAMPLES:]
+
+    def failed(self, url, now=None):
+        entry = self.entry(url)
+        entry["failures"] += 1
+        pause = min(DOWN_FIRST * 2 ** (entry["failures"] - 1), DOWN_MAX)
+        entry["down_until"] = int((now or time.time()) + pause)
+        log.warning("%s mirror %s failing, skipped for %d s", self.kind, url, pause)
+
+    def timeouts(self, url):
+        """(connect, read) timeouts for url from its recent download times"""
+        entry = self.entry(url)
+        samples = entry.get("first_byte", [])
+        if len(samples) < MIN_SAMPLES:
+            return CONNECT_TIMEOUT[1], READ_TIMEOUT[1]
+        p95 = percentile(samples, 0.95)
+        return _clamp(2 * p95, CONNECT_TIMEOUT), _clamp(3 * p95, READ_TIMEOUT)
+
+    def hedge_after(self, url):
+        """Seconds after which a second request is sent, None when not hedging"""
+        samples = self.entry(url).get("total", [])
+        if not cfg.hedge.value or len(samples) < MIN_SAMPLES:
+            return None
+        return max(HEDGE_FLOOR, percentile(samples, 0.95))
+
+    def download(self, url):
+        """
+        Fetch url with its learned timeouts, hedged on the next healthy mirror
+        (or url itself) when slower than usual. Returns (url answering,
+        content, seconds to the first byte, total seconds).
+        """
+        timeout = self.timeouts(url)
+        after = self.hedge_after(url)
+        alternates = [x for x in self.ranked() if x != url and self.entry(x)["down_until"] <= time.time()]
+        results = Queue()
+        cancelled = Event()
+        # the download threads keep the priority of the caller
+        priority = governor.current()
+
+        def attempt(target, hedge):
+            try:
+                results.put((target, hedge, _download(target, timeout, cancelled, priority), None))
+            except Exception as error:
+                results.put((target, hedge, None, error))
+
+        def launch(target, hedge=False):
+            thread = Thread(target=attempt, args=(target, hedge), name="vavoo-download")
+            thread.daemon = True
+            thread.start()
+
+        launch(url)
+        pending = 1
+        hedged = False
+        error = None
+        while pending:
+            try:
+                target, hedge, result, failure = results.get(timeout=after if after is not None and not hedged else None)
+            except Empty:
+                hedged = True
+                spare = alternates[0] if alternates else url
+                log.info("%s slower than %.1f s, hedging on %s", url, after, spare)
+                stats.count("hedged_requests")
+                launch(spare, True)
+                pending += 1
+                continue
+            pending -= 1
+            if result is not None:
+                cancelled.set()
+                if hedge:
+                    stats.count("hedge_wins")
+                return (target,) + result
+            error = error or failure
+        raise error
+
+    def measure(self, force=False):
+        """Refresh the round trip times when they are older than MEASURE_INTERVAL"""
+        if len(self.urls) < 2:
+            return
+        now = time.time()
+        stale = [url for url in self.urls if force or now - self.entry(url)["measured"] >= MEASURE_INTERVAL]
+        if not stale:
+            return
+        for url in stale:
+            try:
+                with governor.slot(url):
+                    started = time.time()
+                    # a 4xx still counts, the stream base url itself is not a resource
+                    response = http.head(url, timeout=MEASURE_TIMEOUT, allow_redirects=False)
+                    rtt = time.time() - started
+                if response.status_code >= 500:
+                    raise exceptions.HTTPError("HTTP %d" % response.status_code, response=response)
+            except exceptions.RequestException as error:
+                log.info("%s mirror %s unreachable: %s", self.kind, url, error)
+                self.failed(url, now)
+            else:
+                self.succeeded(url, rtt)
+            self.entry(url)["measured"] = int(now)
+        self.save()
+
+    def report(self):
+        """Lines for the statistics screen"""
+        lines = []
+        now = time.time()
+        for url in self.ranked(now):
+            entry = self.entry(url)
+            text = "    %s" % url
+            if entry["rtt"] is not None:
+                text += "  rtt %.0f ms" % (entry["rtt"] * 1000)
+            if entry["throughput"]:
+                text += "  %d kB/s" % (entry["throughput"] // 1024)
+            if entry["down_until"] > now:
+                text += "  skipped %d s" % (entry["down_until"] - now)
+            lines.append(text)
+        return lines
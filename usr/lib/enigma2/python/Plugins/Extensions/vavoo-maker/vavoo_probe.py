@@ -0,0 +1,202 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Stream liveness probing.
+
+A channel is alive when a short ranged GET of its stream returns MPEG-TS,
+that is data starting with the 0x47 sync byte, repeated one packet later.
+StreamProber checks many urls at once from a bounded pool of threads, with
+a deadline per probe and one for the whole batch; channels not reached in
+time are left out of the result and treated as unknown by the caller, as
+are those whose probe failed in transport (timeout, refused connection):
+that says more about the network than about the channel.
+
+ProbeStore keeps the outcome per channel across refreshes, so only the
+channels that are due get probed again: live ones after a long TTL, dead
+ones on an exponential schedule.
+"""
+
+import json
+import os
+import time
+from threading import Thread
+
+try:
+    from queue import Queue, Empty
+except ImportError:
+    from Queue import Queue, Empty
+
+from requests import exceptions
+
+from .vavoo_lib import BACKGROUND, governor, http
+from .vavoo_log import log
+
+
+TS_PACKET = 188
+TS_SYNC = 0x47
+# two packets are enough to tell a transport stream from an error page
+PROBE_BYTES = 2 * TS_PACKET
+PROBE_TIMEOUT = 4.0
+TOTAL_DEADLINE = 60.0
+
+# re-check schedule in seconds
+ALIVE_TTL = 24 * 3600
+DEAD_RECHECK = 15 * 60
+DEAD_RECHECK_MAX = 24 * 3600
+# entries not checked for this long belong to channels gone from the playlist
+STORE_MAX_AGE = 30 * 24 * 3600
+
+
+def is_transport_stream(data):
+    """True when data starts on an MPEG-TS packet boundary"""
+    data = bytearray(data)
+    if not data or data[0] != TS_SYNC:
+        return False
+    return len(data) <= TS_PACKET or data[TS_PACKET] == TS_SYNC
+
+
+class StreamProber(object):
+    """Check stream urls concurrently, see run()"""
+
+    def __init__(self, workers=8, timeout=PROBE_TIMEOUT, deadline=TOTAL_DEADLINE, headers=None):
+        self.workers = workers
+        self.timeout = timeout
+        self.deadline = deadline
+        self.headers = dict(headers or {})
+        self.headers["Range"] = "bytes=0-%d" % (PROBE_BYTES - 1)
+
+    def probe(self, url):
+        """(alive, seconds to the first byte) for one url, alive is None when unknown"""
+        # stream checks give way to everything else going to the same host
+        with governor.slot(url, BACKGROUND):
+            return self._probe(url)
+
+    def _probe(self, url):
+        started = time.time()
+        response = None
+        try:
+            response = http.get(url, headers=self.headers, timeout=self.timeout, stream=True)
+            if response.status_code not in (200, 206):
+                return False, None
+            data = b""
+            latency = None
+            # servers ignoring Range send the whole stream, stop reading on time
+            for chunk in response.iter_content(PROBE_BYTES):
+                if latency is None:
+                    latency = time.time() - started
+                data += chunk
+                if len(data) >= PROBE_BYTES or time.time() - started > self.timeout:
+                    break
+            return is_transport_stream(data[:PROBE_BYTES]), latency
+        except exceptions.RequestException as error:
+            log.debug("probe %s failed: %s", url, error)
+            return None, None
+        finally:
+            if response is not None:
+                response.close()
+
+    def run(self, urls):
+        """
+        Probe urls, at most `workers` at a time. Returns {url: (alive, latency)}
+        for the urls checked before the deadline, see probe().
+        """
+        pending = Queue()
+        for url in urls:
+            pending.put(url)
+        results = {}
+        stop_at = time.time() + self.deadline
+
+        def work():
+            while time.time() < stop_at:
+                try:
+                    url = pending.get_nowait()
+                except Empty:
+                    return
+                results[url] = self.probe(url)
+
+        threads = []
+        for i in range(min(self.workers, len(urls))):
+            thread = Thread(target=work, name="vavoo-probe-%d" % i)
+            # a probe stuck past the deadline must not hold enigma2 on shutdown
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join(max(0, stop_at + self.timeout - time.time()))
+
+        # late probes may still land in results, hand out a snapshot
+        results = dict(results)
+        if len(results) < len(urls):
+            log.warning("probe deadline reached, %d of %d streams not checked", len(urls) - len(results), len(urls))
+        return results
+
+
+class ProbeStore(object):
+    """
+    Probe outcomes by channel id, persisted as JSON. An entry holds
+    alive, latency (seconds to the first byte), checked (epoch seconds)
+    and failures, the number of dead results in a row.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        # lookups answered from the store and lookups that need a probe
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (IOError, OSError):
+            pass
+        except ValueError as error:
+            log.warning("probe store %s unreadable, starting over: %s", self.path, error)
+
+    def save(self, now=None):
+        now = now or time.time()
+        entries = dict((cid, entry) for cid, entry in self.entries.items()
+                       if now - entry["checked"] < STORE_MAX_AGE)
+        try:
+            with open(self.path + ".new", "w") as f:
+                json.dump(entries, f, separators=(",", ":"))
+            os.rename(self.path + ".new", self.path)
+        except (IOError, OSError) as error:
+            log.error("probe store not saved: %s", error)
+        self.entries = entries
+
+    @staticmethod
+    def recheck_after(entry):
+        """Seconds after entry["checked"] at which the channel is probed again"""
+        if entry["alive"]:
+            return ALIVE_TTL
+        return min(DEAD_RECHECK * 2 ** max(entry["failures"] - 1, 0), DEAD_RECHECK_MAX)
+
+    def lookup(self, cid, now=None):
+        """Stored alive flag of cid, None when the channel is due for a probe"""
+        entry = self.entries.get(cid)
+        now = now or time.time()
+        if entry is None or now - entry["checked"] >= self.recheck_after(entry):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["alive"]
+
+    def record(self, cid, alive, latency, now=None):
+        entry = self.entries.get(cid)
+        failures = 0 if alive else (entry["failures"] + 1 if entry is not None else 1)
+        self.entries[cid] = {
+            "alive": bool(alive),
+            "latency": round(latency, 3) if latency is not None else None,
+            "checked": int(now or time.time()),
+            "failures": failures,
+        }
+
+    def summary(self):
+        """(channels known, offline, mean latency in seconds or None)"""
+        latencies = [e["latency"] for e in self.entries.values() if e["alive"] and e["latency"] is not None]
+        dead = sum(1 for e in self.entries.values() if not e["alive"])
+        return len(self.entries), dead, (sum(latencies) / len(latencies) if latencies else None)
@@ -0,0 +1,198 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+On-demand profiling of one pipeline run.
+
+When cfg.profile is set, or the trigger file /tmp/vavoo_profile exists, the
+next pipeline run is executed under cProfile and tracemalloc and a report
+is written to /tmp for the user to share. The request is consumed by that
+run. When nothing is requested a run costs one config read and one stat.
+"""
+
+import json
+import os
+import time
+from threading import Event, Thread
+
+from .vavoo_config import cfg
+from .vavoo_log import log
+
+
+TRIGGER_FILE = "/tmp/vavoo_profile"
+REPORT_DIR = "/tmp"
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 20
+# traced memory is sampled this often, a new snapshot is taken once it
+# has grown by PEAK_GROWTH over the last one
+PEAK_SAMPLE = 0.25
+PEAK_GROWTH = 1.05
+
+
+def armed():
+    return cfg.profile.value is True or os.path.exists(TRIGGER_FILE)
+
+
+def disarm():
+    if cfg.profile.value:
+        cfg.profile.value = False
+        cfg.profile.save()
+    try:
+        os.remove(TRIGGER_FILE)
+    except OSError:
+        pass
+
+
+def peak_rss_kb():
+    """High water mark of the resident set, in kB"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except Exception:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except Exception:
+        return 0
+
+
+def consume():
+    """True when a capture was requested, which is cleared on the way"""
+    if not armed():
+        return False
+    disarm()
+    return True
+
+
+def profile_run(kind, func, *args, **kwargs):
+    """Call func, under the profilers when a capture was requested"""
+    if not consume():
+        return func(*args, **kwargs)
+    return capture(kind, func, *args, **kwargs)
+
+
+class PeakSnapshot(Thread):
+    """
+    The tracemalloc snapshot taken closest to the traced peak. A snapshot
+    at the end of a run shows what it kept, not what made it large.
+    """
+
+    def __init__(self, tracemalloc, interval=PEAK_SAMPLE):
+        Thread.__init__(self, name="vavoo-profile-peak")
+        self.daemon = True
+        self.tracemalloc = tracemalloc
+        self.interval = interval
+        self.stopped = Event()
+        self.snapshot = None
+        # traced bytes when the snapshot was taken
+        self.size = 0
+
+    def sample(self):
+        current = self.tracemalloc.get_traced_memory()[0]
+        if self.snapshot is None or current > self.size * PEAK_GROWTH:
+            self.snapshot = self.tracemalloc.take_snapshot()
+            self.size = current
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def finish(self):
+        """(snapshot, traced bytes at that time), the end of the run counts as one more sample"""
+        self.stopped.set()
+        self.join()
+        self.sample()
+        return self.snapshot, self.size
+
+
+def capture(kind, func, *args, **kwargs):
+    """
+    Call func under the profilers and write the report. For runs in a
+    forked child: the parent consume()s the request, so it is cleared in
+    the process that keeps the configuration.
+    """
+    import cProfile
+    try:
+        import tracemalloc
+    except ImportError:
+        # python 2 images: time profile only
+        tracemalloc = None
+
+    log.warning("profiling %s run", kind)
+    rss_before = peak_rss_kb()
+    started = time.time()
+    profiler = cProfile.Profile()
+    tracing = tracemalloc is not None and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start(10)
+        peak_snapshot = PeakSnapshot(tracemalloc)
+        peak_snapshot.start()
+    profiler.enable()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profiler.disable()
+        report = {
+            "kind": kind,
+            "time": int(started),
+            "duration": round(time.time() - started, 3),
+            "peak_rss_kb_before": rss_before,
+            "peak_rss_kb_after": peak_rss_kb(),
+        }
+        if tracing:
+            snapshot, size = peak_snapshot.finish()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            report["traced_peak_kb"] = peak // 1024
+            report["traced_current_kb"] = current // 1024
+            report["traced_snapshot_kb"] = size // 1024
+            report["allocations"] = [
+                {"where": str(stat.traceback[0]), "kb": stat.size // 1024, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+            ]
+        try:
+            write_report(report, profiler)
+        except Exception as error:
+            log.error("profile report failed: %s", error)
+
+
+def write_report(report, profiler):
+    import pstats
+    try:
+        # pstats writes byte strings on python 2
+        from cStringIO import StringIO
+    except ImportError:
+        from io import StringIO
+    text = StringIO()
+
+    stats = pstats.Stats(profiler, stream=text)
+    stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    functions = []
+    for (filename, line, name), row in stats.stats.items():
+        functions.append({
+            "function": "%s:%d(%s)" % (os.path.basename(filename), line, name),
+            "calls": row[1],
+            "total": round(row[2], 4),
+            "cumulative": round(row[3], 4),
+        })
+    functions.sort(key=lambda x: x["cumulative"], reverse=True)
+    report["functions"] = functions[:TOP_FUNCTIONS]
+
+    base = os.path.join(REPORT_DIR, "vavoo_profile_%s_%s" % (
+        report["kind"], time.strftime("%Y%m%d_%H%M%S", time.localtime(report["time"]))))
+    with open(base + ".json", "w") as f:
+        json.dump(report, f, indent=2)
+    with open(base + ".txt", "w") as f:
+        f.write("%s run, %.2f s, peak RSS %d kB (before %d kB)\n" % (
+            report["kind"], report["duration"], report["peak_rss_kb_after"], report["peak_rss_kb_before"]))
+        if "allocations" in report:
+            f.write("\ntraced memory peak %d kB, top allocation sites at %d kB, the highest sample:\n" % (
+                report["traced_peak_kb"], report["traced_snapshot_kb"]))
+            for row in report["allocations"]:
+                f.write("%8d kB %7d  %s\n" % (row["kb"], row["count"], row["where"]))
+        f.write("\n")
+        f.write(text.getvalue())
+    log.warning("profile written to %s.txt and %s.json", base, base)
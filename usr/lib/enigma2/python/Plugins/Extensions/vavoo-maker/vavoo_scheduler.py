@@ -0,0 +1,367 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Scheduled bouquet refresh.
+
+RefreshScheduler only computes times from the configuration and the last
+run bookkeeping, so plugin.py can answer deep-standby wakeup requests
+without creating timers. AutoStartTimer drives it with an eTimer.
+"""
+
+import time
+from threading import Thread
+from random import Random
+from shutil import rmtree
+from tempfile import mkdtemp
+from uuid import getnode
+
+from enigma import eTimer
+
+from .vavoo_config import cfg
+from .vavoo_coordinator import STARTED, coordinator
+from .vavoo_log import log
+from .vavoo_profile import capture, consume
+from .vavoo_stats import stats
+from .vavoo_watchdog import watch
+from .vavoo_worker import ChildJob
+
+
+DAY = 86400
+
+
+class RefreshScheduler(object):
+    """Next run times for bouquet refreshes, computed without side effects"""
+
+    # first retry after a failure, doubled on each further failure
+    RETRY_BASE = 60
+    RETRY_MAX = 6 * 3600
+    # per-box seed, so a fleet spreads its jitter instead of sharing it;
+    # getnode() may run ifconfig, so it is read on the first jitter only
+    SEED = None
+
+    def __init__(self, settings=cfg, started=None):
+        self.settings = settings
+        # first run of a box that never refreshed: one period after this
+        self.started = int(time.time() if started is None else started)
+
+    def enabled(self):
+        return self.settings.autobouquetupdate.value is True
+
+    def period(self):
+        if self.settings.timetype.value == "fixed time":
+            return DAY
+        if self.settings.timetype.value == "adaptive":
+            return self.adaptive_interval() * 60
+        return int(self.settings.updateinterval.value) * 60
+
+    def adaptive_bounds(self):
+        low = int(self.settings.adaptive_min.value)
+        return low, max(low, int(self.settings.adaptive_max.value))
+
+    def adaptive_interval(self):
+        """Learned interval in minutes, within the configured bounds"""
+        low, high = self.adaptive_bounds()
+        learned = int(self.settings.adaptive_interval.value) or int(self.settings.updateinterval.value)
+        return min(max(learned, low), high)
+
+    def learn(self, changed, now):
+        """
+        Halve the adaptive interval when upstream changed since the last
+        run, stretch it by half when it did not, and count the runs a
+        fixed interval schedule would have made meanwhile.
+        """
+        low, high = self.adaptive_bounds()
+        interval = self.adaptive_interval()
+        last_run = int(self.settings.last_run.value)
+        if last_run:
+            base = int(self.settings.updateinterval.value) * 60
+            avoided = int((now - last_run) // base) - 1
+            if avoided > 0:
+                self.settings.refreshes_avoided.value = int(self.settings.refreshes_avoided.value) + avoided
+                self.settings.refreshes_avoided.save()
+        if changed:
+            interval = max(low, interval // 2)
+        else:
+            interval = min(high, interval + interval // 2)
+        self.settings.adaptive_interval.value = interval
+        self.settings.adaptive_interval.save()
+        log.info("Adaptive interval: %d minutes (upstream %s)", interval, "changed" if changed else "unchanged")
+
+    def fixed_slot(self, now, days=0):
+        """Configured fixed time on the day of now, shifted by days"""
+        ftc = self.settings.fixedtime.value
+        lt = time.localtime(now + days * DAY)
+        return int(time.mktime((lt.tm_year, lt.tm_mon, lt.tm_mday, ftc[0], ftc[1], 0, lt.tm_wday, lt.tm_yday, -1)))
+
+    def scheduled_time(self, now):
+        """Regular run time, in the past when a run was missed and must be caught up"""
+        last_run = int(self.settings.last_run.value)
+        if self.settings.timetype.value == "fixed time":
+            slot = self.fixed_slot(now)
+            if slot > now:
+                slot = self.fixed_slot(now, -1)
+            if last_run and last_run < slot:
+                # the box was off or busy at the last fixed time
+                return slot
+            slot = self.fixed_slot(now)
+            return slot if slot > now else self.fixed_slot(now, 1)
+        if not last_run:
+            # anchored to fixed times, so the jitter seed does not move between polls
+            attempt = int(self.settings.last_attempt.value)
+            if attempt:
+                # a first run failed, retries are timed from it
+                return attempt
+            if now < self.started:
+                # the clock was set back, e.g. by NTP after boot
+                self.started = int(now)
+            return self.started + self.period()
+        return last_run + self.period()
+
+    def jitter(self, slot):
+        """Stable random delay in seconds for the run planned at slot"""
+        spread = int(self.settings.jitter.value)
+        if spread <= 0:
+            return 0
+        if RefreshScheduler.SEED is None:
+            RefreshScheduler.SEED = getnode()
+        return Random(self.SEED ^ int(slot)).randint(0, spread)
+
+    def backoff(self, failures):
+        if failures <= 0:
+            return 0
+        return min(self.RETRY_BASE * 2 ** (failures - 1), self.RETRY_MAX)
+
+    def next_run(self, now=None):
+        """Epoch time of the next refresh, or -1 when updates are disabled"""
+        if not self.enabled():
+            return -1
+        if now is None:
+            now = time.time()
+        slot = self.scheduled_time(now)
+        wake = slot + self.jitter(slot)
+        failures = int(self.settings.failures.value)
+        if failures:
+            retry = int(self.settings.last_attempt.value) + self.backoff(failures)
+            if retry > wake:
+                wake = retry
+        return wake
+
+    def prewarm_time(self, now=None):
+        """When to prepare the next fixed-time run, or -1 when there is no pre-warm"""
+        if self.settings.timetype.value != "fixed time":
+            return -1
+        lead = int(self.settings.prewarm.value) * 60
+        wake = self.next_run(now)
+        if wake < 0 or lead <= 0:
+            return -1
+        return wake - lead
+
+    def is_due(self, now=None):
+        wake = self.next_run(now)
+        return wake >= 0 and (time.time() if now is None else now) >= wake
+
+    def next_wakeup(self, now=None):
+        """Next run for a deep standby wakeup; overdue runs wake the box shortly"""
+        if now is None:
+            now = time.time()
+        wake = self.next_run(now)
+        if wake < 0:
+            return -1
+        return max(int(wake), int(now) + 60)
+
+    def record_attempt(self, now=None):
+        self.settings.last_attempt.value = int(time.time() if now is None else now)
+        self.settings.last_attempt.save()
+
+    def record_result(self, success, now=None, digest=None):
+        """Store the outcome of a run; digest identifies the playlist it found"""
+        if now is None:
+            now = time.time()
+        if success and digest is not None:
+            if self.settings.timetype.value == "adaptive":
+                self.learn(digest != self.settings.playlist_digest.value, now)
+            self.settings.playlist_digest.value = digest
+            self.settings.playlist_digest.save()
+        if success:
+            self.settings.last_run.value = int(now)
+            self.settings.last_run.save()
+            self.settings.failures.value = 0
+            self.settings.last_update.value = time.asctime(time.localtime(now))
+            self.settings.last_update.save()
+        else:
+            self.settings.failures.value = int(self.settings.failures.value) + 1
+        self.settings.failures.save()
+
+
+class AutoStartTimer:
+    # wake at least hourly so clock changes (NTP after boot) are picked up
+    MAX_SLEEP = 3600
+
+    def __init__(self, session):
+        log.debug("AutoStartTimer init")
+
+        self.session = session
+        self.scheduler = RefreshScheduler()
+        # (run time, {view_type: fetcher}) filled by the pre-warm thread
+        self.warm = None
+        self.warming = None
+        # ChildJob of a refresh running in a separate process
+        self.job = None
+        # set from the submission of a run until its result is recorded
+        self.busy = False
+        self.timer = eTimer()
+        try:
+            self.timer.callback.append(watch("AutoStartTimer.on_timer", self.on_timer))
+        except BaseException:
+            self.timer_conn = self.timer.timeout.connect(watch("AutoStartTimer.on_timer", self.on_timer))
+        self.update()
+
+    def update(self):
+        self.timer.stop()
+        if self.busy:
+            # rescheduled once the run reports back
+            return 0
+        nowt = time.time()
+        wake = self.scheduler.next_run(nowt)
+
+        if wake < 0:
+            log.info("Timer disabled")
+            return -1
+
+        target = wake
+        prewarm = self.scheduler.prewarm_time(nowt)
+        if prewarm > nowt and not self.is_warm(wake):
+            target = prewarm
+        next_time = min(max(int(target - nowt), 1), self.MAX_SLEEP)
+        log.info("Next run at %s in %d seconds, timer set for %d seconds", wake, int(wake - nowt), next_time)
+        self.timer.startLongTimer(next_time)
+        return wake
+
+    def is_warm(self, wake):
+        return self.warm is not None and self.warm[0] == wake
+
+    def recording(self):
+        try:
+            return self.session.nav.RecordTimer.isRecording()
+        except Exception:
+            return False
+
+    def start_prewarm(self, wake):
+        """Fetch playlists and signature in a thread, keeping the fixed-time run short"""
+        if self.warming is not None and self.warming.is_alive():
+            return
+        if self.recording():
+            log.info("Pre-warm postponed, recording in progress")
+            return
+        from .plugin import load_maker
+        maker = load_maker()
+
+        def run():
+            try:
+                self.warm = (wake, maker.prewarmFavoriteBouquets())
+            except Exception as error:
+                # do not retry before the run, which then fetches everything itself
+                log.error("Pre-warm failed: %s", error)
+                self.warm = (wake, {})
+
+        log.info("Pre-warming for the run at %s", time.asctime(time.localtime(wake)))
+        self.warm = None
+        self.warming = Thread(target=run)
+        self.warming.daemon = True
+        self.warming.start()
+
+    def on_timer(self):
+        self.timer.stop()
+        if self.busy:
+            return
+        now = time.time()
+        if self.scheduler.is_due(now):
+            wake = self.scheduler.next_run(now)
+            warm = self.warm[1] if self.is_warm(wake) else None
+            self.warm = None
+            self.scheduler.record_attempt(now)
+            self.busy = True
+            state = coordinator.submit("refresh", lambda done: self.startMain(warm, done), self.finish_run)
+            if state != STARTED:
+                log.info("Scheduled update %s", state)
+            return
+        wake = self.scheduler.next_run(now)
+        prewarm = self.scheduler.prewarm_time(now)
+        if 0 <= prewarm <= now and not self.is_warm(wake):
+            self.start_prewarm(wake)
+            if not self.is_warm(wake):
+                # poll again shortly until warm or the fixed time arrives
+                self.timer.startLongTimer(max(1, min(60, int(wake - now))))
+                return
+        self.update()
+
+    def finish_run(self, result):
+        self.busy = False
+        success = result is not False
+        digest = result.get("digest") if isinstance(result, dict) else None
+        self.scheduler.record_result(success, digest=digest)
+        if not success:
+            log.warning(
+                "Update failed %d time(s), retry in %d seconds",
+                self.scheduler.settings.failures.value,
+                self.scheduler.backoff(self.scheduler.settings.failures.value))
+        self.update()
+
+    def startMain(self, warm, done):
+        """Update all bouquets saved in Favorite.txt, done(result) is called when finished"""
+        from .plugin import load_maker
+        maker = load_maker()
+        settings = self.scheduler.settings
+        # taken here, a child's copy of cfg.profile would be reset in vain
+        profile = consume()
+        if settings.worker.value:
+            # the child's own directory: screens clean up /tmp/vavoo when they close
+            staging = mkdtemp(prefix="vavoo-refresh-")
+
+            def render(staging):
+                run = stats.begin("refresh")
+                try:
+                    if profile:
+                        result = capture("refresh", maker.renderFavoriteBouquets, staging, warm, staging)
+                    else:
+                        result = maker.renderFavoriteBouquets(staging, warm, staging)
+                except Exception:
+                    stats.end(run, False)
+                    raise
+                record = stats.end(run)
+                if result is not None:
+                    # the child's ring buffer is lost with it, hand the record back
+                    result["stats"] = record
+                return result
+
+            def installed(result):
+                if isinstance(result, dict):
+                    run = stats.begin("refresh")
+                    run.merge(result.pop("stats", {}))
+                    try:
+                        maker.installFavoriteBouquets(result, staging)
+                        stats.end(run)
+                        maker.showUpdateResult(self.session)
+                    except Exception as error:
+                        stats.end(run, False)
+                        log.error("Error installing bouquets: %s", error)
+                        maker.showUpdateResult(self.session, error)
+                        result = False
+                rmtree(staging, ignore_errors=True)
+                done(result)
+
+            # signature, downloads, hedges and name lookups, plus the probe pool
+            threads = 8 + (int(settings.probe_workers.value) if settings.probe.value != "off" else 0)
+            if profile:
+                # the profiler's peak sampler
+                threads += 1
+            self.job = ChildJob(render, installed, staging, memory_mb=int(settings.worker_memory.value), threads=threads)
+            try:
+                self.job.start()
+                return
+            except OSError as error:
+                log.warning("Child process not available, refreshing in place: %s", error)
+                self.job = None
+                rmtree(staging, ignore_errors=True)
+        done(maker.updateFavoriteBouquets(self.session, warm, profile))
@@ -0,0 +1,110 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Type-ahead search over group and channel names.
+
+SearchIndex keeps every normalised word in a sorted list, so a query is a
+couple of bisects per typed word. A query that extends the previous one is
+answered by filtering the previous result, which keeps each key press cheap
+on slow receivers even with tens of thousands of channels.
+"""
+
+from bisect import bisect_left
+from re import compile
+from unicodedata import normalize
+
+try:
+    unicode
+except NameError:
+    unicode = str
+
+
+_NON_WORD_RE = compile(r"[^a-z0-9]+")
+
+
+def normalize_name(text):
+    """Lower case ascii words of a name, used for indexing and for queries"""
+    if not isinstance(text, unicode):
+        try:
+            text = text.decode("utf-8", "ignore")
+        except AttributeError:
+            text = unicode(text)
+    text = normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    return _NON_WORD_RE.sub(" ", text).strip()
+
+
+class SearchIndex(object):
+    """Word prefix index mapping queries to the keys that were added"""
+
+    def __init__(self):
+        self.keys = []
+        self.docwords = []
+        self.words = []
+        self.worddocs = []
+        self.pending = []
+        self.lastQuery = None
+        self.lastDocs = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, key, *texts):
+        doc = len(self.keys)
+        words = []
+        for text in texts:
+            words.extend(normalize_name(text).split())
+        words = tuple(set(words))
+        self.keys.append(key)
+        self.docwords.append(words)
+        self.pending.extend((word, doc) for word in words)
+
+    def prepare(self):
+        """Merge words added since the last search into the sorted word list"""
+        if self.pending:
+            pairs = sorted(list(zip(self.words, self.worddocs)) + self.pending)
+            self.words = [x[0] for x in pairs]
+            self.worddocs = [x[1] for x in pairs]
+            self.pending = []
+            self.lastQuery = self.lastDocs = None
+
+    def prefixDocs(self, prefix):
+        lo = bisect_left(self.words, prefix)
+        hi = bisect_left(self.words, prefix + u"\uffff", lo)
+        return set(self.worddocs[lo:hi])
+
+    def matches(self, doc, tokens):
+        words = self.docwords[doc]
+        for token in tokens:
+            for word in words:
+                if word.startswith(token):
+                    break
+            else:
+                return False
+        return True
+
+    def search(self, query):
+        """Keys whose words start with every word of query, in insertion order"""
+        self.prepare()
+        query = normalize_name(query)
+        tokens = query.split()
+        if not tokens:
+            self.lastQuery = self.lastDocs = None
+            return list(self.keys)
+
+        if self.lastQuery is not None and query.startswith(self.lastQuery):
+            # the new query can only narrow the previous result
+            docs = [doc for doc in self.lastDocs if self.matches(doc, tokens)]
+        else:
+            found = None
+            for token in sorted(set(tokens), key=len, reverse=True):
+                candidates = self.prefixDocs(token)
+                found = candidates if found is None else found & candidates
+                if not found:
+                    break
+            docs = sorted(found)
+
+        self.lastQuery = query
+        self.lastDocs = docs
+        keys = self.keys
+        return [keys[doc] for doc in docs]
@@ -0,0 +1,189 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Per-stage timing and counters for pipeline runs.
+
+A run is opened with stats.begin(kind) and closed with stats.end(run); the
+code in between reports with stats.stage(name) and stats.count(name, n),
+which go to the run of the calling thread, or nowhere when there is none.
+Finished runs are kept in a small ring buffer for the statistics screen.
+"""
+
+import json
+import time
+from collections import deque
+from threading import local
+
+from .vavoo_log import DEBUG, enabled, fields, log
+
+try:
+    monotonic = time.monotonic
+except AttributeError:
+    # python 2 has no monotonic clock in the standard library
+    monotonic = time.time
+
+
+# stage order on the statistics screen, other stages follow by name
+STAGES = ("download", "parse", "normalise", "signature", "signature wait", "probe", "render", "write", "install", "reload")
+RING_SIZE = 20
+
+
+def _field(name):
+    return name.replace(" ", "_")
+
+
+class _Stage(object):
+    def __init__(self, run, name):
+        self.run = run
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        if self.run is not None:
+            seconds = monotonic() - self.start
+            self.run.add_time(self.name, seconds)
+            if enabled(DEBUG):
+                # the stage in the message, so each stage has its own rate limit
+                log.debug("stage %s done" % self.name, extra=fields(
+                    kind=self.run.kind, seconds="%.3f" % seconds, failed=exc[0] is not None))
+        return False
+
+
+class Run(object):
+    def __init__(self, kind):
+        self.kind = kind
+        self.wall = time.time()
+        self.start = monotonic()
+        self.total = 0.0
+        self.ok = None
+        self.stages = {}
+        self.counters = {}
+        # last value per (name, label), e.g. channels per bouquet
+        self.gauges = {}
+
+    def add_time(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name, label, value):
+        self.gauges["%s|%s" % (name, label)] = value
+
+    def merge(self, record):
+        """Add the duration, stages and counters of a record made elsewhere, e.g. in a child process"""
+        self.start -= record.get("total", 0)
+        for name, seconds in record.get("stages", {}).items():
+            self.add_time(name, seconds)
+        for name, value in record.get("counters", {}).items():
+            self.count(name, value)
+        self.gauges.update(record.get("gauges", {}))
+
+    def as_dict(self):
+        return {
+            "kind": self.kind,
+            "time": int(self.wall),
+            "ok": self.ok,
+            "total": round(self.total, 4),
+            "stages": dict((k, round(v, 4)) for k, v in self.stages.items()),
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+        }
+
+
+class Stats(object):
+    def __init__(self, size=RING_SIZE):
+        self.runs = deque(maxlen=size)
+        self.local = local()
+        # since enigma2 started: counters summed over all runs, runs by kind and
+        # outcome, and the latest gauges; read by the metrics endpoint
+        self.totals = {}
+        self.outcomes = {}
+        self.gauges = {}
+
+    def current(self):
+        return getattr(self.local, "run", None)
+
+    def attach(self, run):
+        """Report from a helper thread into run, the run of the thread that started it"""
+        self.local.run = run
+
+    def begin(self, kind):
+        run = Run(kind)
+        self.local.run = run
+        return run
+
+    def end(self, run, ok=True):
+        """Close run, store it in the ring buffer and return its record"""
+        run.total = monotonic() - run.start
+        run.ok = bool(ok)
+        if self.current() is run:
+            self.local.run = None
+        record = run.as_dict()
+        self.runs.append(record)
+        for name, value in run.counters.items():
+            self.totals[name] = self.totals.get(name, 0) + value
+        key = (run.kind, "ok" if run.ok else "failed")
+        self.outcomes[key] = self.outcomes.get(key, 0) + 1
+        self.gauges.update(run.gauges)
+        values = dict((_field(k), "%.3f" % v) for k, v in record["stages"].items())
+        values.update((_field(k), v) for k, v in run.counters.items())
+        log.info("%s run %s in %.2f s", run.kind, "done" if run.ok else "failed", run.total, extra=fields(**values))
+        return record
+
+    def stage(self, name):
+        return _Stage(self.current(), name)
+
+    def count(self, name, value=1):
+        run = self.current()
+        if run is not None:
+            run.count(name, value)
+
+    def gauge(self, name, label, value):
+        run = self.current()
+        if run is not None:
+            run.gauge(name, label, value)
+
+    def last(self, kind=None):
+        """Newest record, of the given kind when set"""
+        for record in reversed(self.runs):
+            if kind is None or record["kind"] == kind:
+                return record
+        return None
+
+    def records(self):
+        """Finished runs, newest first"""
+        return list(reversed(self.runs))
+
+    def export(self, path, **sections):
+        """Write the runs, and any extra sections, as JSON"""
+        data = {"runs": self.records()}
+        data.update(sections)
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        return path
+
+
+def format_record(record):
+    """Lines describing one run for the statistics screen"""
+    lines = ["%s  %s  %.2f s%s" % (
+        time.strftime("%d/%m %H:%M:%S", time.localtime(record["time"])),
+        record["kind"],
+        record["total"],
+        "" if record["ok"] else "  FAILED")]
+    stages = record["stages"]
+    names = [x for x in STAGES if x in stages] + sorted(x for x in stages if x not in STAGES)
+    if names:
+        lines.append("    " + "  ".join("%s %.2f" % (x, stages[x]) for x in names))
+    counters = record["counters"]
+    if counters:
+        lines.append("    " + "  ".join("%s %d" % (x, counters[x]) for x in sorted(counters)))
+    return lines
+
+
+stats = Stats()
@@ -0,0 +1,113 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Success statistics of the ping2 vectors.
+
+Many vectors of the veclist no longer earn a signature. VectorScores keeps,
+per vector, the successes and failures (decaying with a one week half-life),
+the failures in a row and a moving average of the ping2 latency, so
+getAuthSignature() tries the vectors that worked before first and usually
+needs a single round trip. Vectors failing repeatedly rest for a day or
+more, and entries of vectors gone from the veclist are dropped.
+"""
+
+import json
+import os
+import random
+import time
+from hashlib import md5
+
+from .vavoo_log import log
+
+
+HALF_LIFE = 7 * 24 * 3600
+# failures in a row before a vector rests, and for how long at first
+REST_AFTER = 3
+REST_FIRST = 24 * 3600
+REST_MAX = 7 * 24 * 3600
+SMOOTHING = 0.3
+
+
+def vector_key(vec):
+    return md5(vec.encode("utf-8") if not isinstance(vec, bytes) else vec).hexdigest()[:16]
+
+
+class VectorScores(object):
+    def __init__(self, path):
+        self.path = path
+        # key -> {ok, failed, streak, latency, updated}
+        self.entries = {}
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (IOError, OSError):
+            pass
+        except ValueError as error:
+            log.warning("vector scores %s unreadable, starting over: %s", path, error)
+
+    def _decay(self, entry, now):
+        factor = 0.5 ** (max(0, now - entry["updated"]) / float(HALF_LIFE))
+        entry["ok"] *= factor
+        entry["failed"] *= factor
+        entry["updated"] = now
+
+    def score(self, entry):
+        """Expected success rate, 0.5 for a vector never tried"""
+        if entry is None:
+            return 0.5
+        return (entry["ok"] + 1) / (entry["ok"] + entry["failed"] + 2)
+
+    def resting(self, entry, now):
+        if entry is None or entry["streak"] < REST_AFTER:
+            return False
+        rest = min(REST_FIRST * 2 ** (entry["streak"] - REST_AFTER), REST_MAX)
+        return now - entry["updated"] < rest
+
+    def ranked(self, veclist, now=None):
+        """veclist in the order to try: best first, resting vectors last"""
+        now = now or time.time()
+        vectors = list(veclist)
+        # equal scores, e.g. vectors never tried, in random order
+        random.shuffle(vectors)
+        keyed = [(vec, self.entries.get(vector_key(vec))) for vec in vectors]
+        ready = [x for x in keyed if not self.resting(x[1], now)]
+        resting = [x for x in keyed if self.resting(x[1], now)]
+        ready.sort(key=lambda x: (-self.score(x[1]), x[1]["latency"] if x[1] and x[1]["latency"] is not None else 10.0))
+        return [vec for vec, entry in ready + resting]
+
+    def record(self, vec, ok, latency=None, now=None):
+        now = now or time.time()
+        key = vector_key(vec)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = {"ok": 0.0, "failed": 0.0, "streak": 0, "latency": None, "updated": now}
+        self._decay(entry, now)
+        if ok:
+            entry["ok"] += 1
+            entry["streak"] = 0
+        else:
+            entry["failed"] += 1
+            entry["streak"] += 1
+        if latency is not None:
+            old = entry["latency"]
+            entry["latency"] = round(latency if old is None else old + SMOOTHING * (latency - old), 3)
+
+    def save(self, veclist=None):
+        """Write the scores, dropping vectors no longer in veclist"""
+        if veclist is not None:
+            keys = set(vector_key(vec) for vec in veclist)
+            self.entries = dict((k, v) for k, v in self.entries.items() if k in keys)
+        try:
+            with open(self.path + ".new", "w") as f:
+                json.dump(self.entries, f, separators=(",", ":"))
+            os.rename(self.path + ".new", self.path)
+        except (IOError, OSError) as error:
+            log.warning("vector scores not saved: %s", error)
+
+    def summary(self):
+        """(vectors tried, vectors that earned a signature, resting vectors)"""
+        now = time.time()
+        good = sum(1 for e in self.entries.values() if e["ok"] > e["failed"])
+        resting = sum(1 for e in self.entries.values() if self.resting(e, now))
+        return len(self.entries), good, resting
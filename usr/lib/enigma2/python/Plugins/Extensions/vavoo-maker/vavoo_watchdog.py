@@ -0,0 +1,142 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Stall detector for plugin callbacks run by the enigma2 main loop.
+
+watch() wraps an eTimer or ActionMap callback: each call is timed into a
+per-callback histogram, and a daemon thread logs the main thread's stack
+while a call is still running past cfg.stall_ms, so the report shows where
+the remote froze rather than just how long. The thread only polls while a
+watched callback is running and sleeps on an Event otherwise.
+"""
+
+import sys
+import traceback
+from threading import Event, Thread, current_thread
+
+from .vavoo_config import cfg
+from .vavoo_log import log
+from .vavoo_stats import monotonic
+
+
+# upper bounds of the histogram buckets in milliseconds, the last one is open
+BUCKETS = (10, 50, 100, 250, 500, 1000, 2500)
+CHECK_INTERVAL = 0.1
+
+
+class Histogram(object):
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        for i, bound in enumerate(BUCKETS):
+            if ms < bound:
+                break
+        else:
+            i = len(BUCKETS)
+        self.counts[i] += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def count(self):
+        return sum(self.counts)
+
+    def as_dict(self):
+        return {
+            "count": self.count(),
+            "total_ms": round(self.total, 1),
+            "max_ms": round(self.max, 1),
+            "buckets": dict(zip([str(x) for x in BUCKETS] + ["inf"], self.counts)),
+        }
+
+
+class Watchdog(object):
+    def __init__(self):
+        self.histograms = {}
+        # (name, start, thread ident, reported) of the callback running now
+        self.active = None
+        self.thread = None
+        # set while a watched callback is running, the poller waits on it otherwise
+        self.busy = Event()
+        self.stalls = 0
+
+    def threshold(self):
+        return int(cfg.stall_ms.value) / 1000.0
+
+    def watch(self, name, func):
+        """Wrap func so each call is timed and stalls are reported under name"""
+        def watched(*args, **kwargs):
+            outer = self.active
+            call = [name, monotonic(), current_thread().ident, False]
+            self.active = call
+            self.start()
+            self.busy.set()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = (monotonic() - call[1]) * 1000.0
+                self.active = outer
+                if outer is None:
+                    self.busy.clear()
+                histogram = self.histograms.get(name)
+                if histogram is None:
+                    histogram = self.histograms[name] = Histogram()
+                histogram.add(elapsed)
+                if call[3]:
+                    log.warning("%s blocked the main loop for %.0f ms", name, elapsed)
+        watched.__name__ = getattr(func, "__name__", "watched")
+        return watched
+
+    def watch_actions(self, prefix, actions):
+        """Wrapped copy of an ActionMap dictionary"""
+        return dict((key, self.watch("%s.%s" % (prefix, key), func)) for key, func in actions.items())
+
+    def start(self):
+        if self.thread is None:
+            self.thread = Thread(target=self.run, name="vavoo-watchdog")
+            self.thread.daemon = True
+            self.thread.start()
+
+    def run(self):
+        from time import sleep
+        while True:
+            self.busy.wait()
+            sleep(CHECK_INTERVAL)
+            call = self.active
+            if call is None or call[3] or monotonic() - call[1] < self.threshold():
+                continue
+            call[3] = True
+            self.stalls += 1
+            frame = sys._current_frames().get(call[2])
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "(no stack)\n"
+            log.warning("%s running for more than %d ms, main loop stack:\n%s",
+                        call[0], int(cfg.stall_ms.value), stack.rstrip())
+
+    def records(self):
+        """Histograms by callback, slowest first"""
+        rows = [(name, h.as_dict()) for name, h in self.histograms.items()]
+        rows.sort(key=lambda x: x[1]["max_ms"], reverse=True)
+        return rows
+
+    def report(self):
+        """Lines for the statistics screen"""
+        if not self.histograms:
+            return []
+        lines = [
+            "Main loop callbacks, ms (stalls above %d ms: %d)" % (int(cfg.stall_ms.value), self.stalls),
+            "    %-34s %6s %8s  %s" % ("callback", "calls", "max", " ".join("<%s" % x for x in BUCKETS) + " more"),
+        ]
+        for name, row in self.records():
+            lines.append("    %-34s %6d %8.0f  %s" % (
+                name[-34:], row["count"], row["max_ms"],
+                " ".join(str(x) for x in self.histograms[name].counts)))
+        return lines
+
+
+watchdog = Watchdog()
+watch = watchdog.watch
+watch_actions = watchdog.watch_actions
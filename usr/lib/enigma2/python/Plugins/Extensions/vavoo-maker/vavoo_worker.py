@@ -0,0 +1,180 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Low priority child process for scheduled refreshes.
+
+The fetch, parse and render pipeline runs in a forked copy of enigma2 with
+a raised nice value, idle io priority and an address space ceiling. The
+child only writes the rendered bouquet files and a JSON summary into a
+staging directory; the parent polls it from an eTimer and swaps the files
+in, so decoding and EPG in the main process never wait for the refresh.
+
+Threads of the parent do not survive the fork, but the locks they held do:
+modules register with at_fork() what the child must renew before the job.
+The child's threads get small stacks, and the ceiling leaves room for them.
+"""
+
+import json
+import os
+import threading
+import time
+
+from enigma import eTimer
+
+from .vavoo_log import after_fork, log
+from .vavoo_watchdog import watch
+
+
+RESULT_FILE = "result.json"
+# stack of each thread the child starts; the 8 MB default would take a full
+# probe pool past the ceiling
+THREAD_STACK = 512 * 1024
+# address space a thread costs against the ceiling: stack, guard page, malloc arena
+THREAD_RESERVE = 2 * 1024 * 1024
+
+# run in a forked child before the job, see at_fork()
+_fork_handlers = [after_fork]
+
+
+def at_fork(func):
+    """Have func renew, in a forked child, the locks and state parent threads may hold"""
+    _fork_handlers.append(func)
+
+
+def memory_in_use():
+    """Virtual size of this process in bytes, 0 when /proc is not readable"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmSize:"):
+                    return int(line.split()[1]) * 1024
+    except Exception:
+        pass
+    return 0
+
+
+def lower_priority(niceness, memory_mb, threads=0):
+    """Nice, idle io class and memory ceiling for the current process, which will start threads threads"""
+    try:
+        os.nice(niceness)
+    except OSError as error:
+        log.warning("nice failed: %s", error)
+    # no portable python api for ioprio_set, the busybox/util-linux tool does it
+    os.system("ionice -c 3 -p %d >/dev/null 2>&1" % os.getpid())
+    try:
+        import resource
+        # the fork shares enigma2's mappings, so the ceiling is on top of them
+        limit = memory_in_use() + memory_mb * 1024 * 1024 + threads * THREAD_RESERVE
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except Exception as error:
+        log.warning("memory limit failed: %s", error)
+
+
+class ChildJob(object):
+    """
+    Run job(staging) in a forked child and hand its result to callback.
+
+    job must return a JSON serialisable value. callback receives that value,
+    or False when the child failed, was killed or timed out. staging belongs
+    to the caller, who removes it once the callback is done with the files.
+    """
+
+    POLL = 1000  # ms
+
+    def __init__(self, job, callback, staging, niceness=10, memory_mb=96, threads=0, timeout=900):
+        self.job = job
+        self.callback = callback
+        self.staging = staging
+        self.niceness = niceness
+        self.memory_mb = memory_mb
+        # threads the job may run at once, for the memory ceiling
+        self.threads = threads
+        self.timeout = timeout
+        self.pid = None
+        self.started = 0
+        self.timer = eTimer()
+        try:
+            self.timer.callback.append(watch("ChildJob.poll", self.poll))
+        except BaseException:
+            self.timer_conn = self.timer.timeout.connect(watch("ChildJob.poll", self.poll))
+
+    def running(self):
+        return self.pid is not None
+
+    def start(self):
+        """Fork the child; raises OSError when the process cannot be created"""
+        if not os.path.isdir(self.staging):
+            os.makedirs(self.staging)
+        # a result left from an earlier run must not be taken for this one's
+        try:
+            os.remove(os.path.join(self.staging, RESULT_FILE))
+        except OSError:
+            pass
+
+        pid = os.fork()
+        if pid == 0:
+            self.child()
+        self.pid = pid
+        self.started = time.time()
+        log.info("refresh started in child process %d", pid)
+        self.timer.start(self.POLL, False)
+
+    def child(self):
+        # never return into the enigma2 main loop from here
+        status = 1
+        try:
+            for handler in _fork_handlers:
+                handler()
+            try:
+                threading.stack_size(THREAD_STACK)
+            except (ValueError, threading.ThreadError) as error:
+                log.warning("thread stack size not set: %s", error)
+            lower_priority(self.niceness, self.memory_mb, self.threads)
+            try:
+                result = {"result": self.job(self.staging)}
+                status = 0
+            except MemoryError:
+                result = {"error": "memory limit of %d MB reached" % self.memory_mb}
+            except Exception as error:
+                result = {"error": str(error)}
+            with open(os.path.join(self.staging, RESULT_FILE), "w") as f:
+                json.dump(result, f)
+        except BaseException:
+            status = 1
+        finally:
+            os._exit(status)
+
+    def poll(self):
+        try:
+            pid, status = os.waitpid(self.pid, os.WNOHANG)
+        except OSError as error:
+            log.error("lost refresh child: %s", error)
+            return self.finish(False)
+
+        if pid == 0:
+            if time.time() - self.started > self.timeout:
+                log.error("refresh child timed out, killing %d", self.pid)
+                try:
+                    os.kill(self.pid, 9)
+                except OSError:
+                    pass
+            return
+
+        result = False
+        try:
+            with open(os.path.join(self.staging, RESULT_FILE)) as f:
+                data = json.load(f)
+            if "error" in data:
+                log.error("refresh child failed: %s", data["error"])
+            else:
+                result = data["result"]
+        except Exception as error:
+            log.error("refresh child exited with status %d: %s", status, error)
+        log.info("refresh child done in %.1f s", time.time() - self.started)
+        self.finish(result)
+
+    def finish(self, result):
+        self.timer.stop()
+        self.pid = None
+        self.callback(result)